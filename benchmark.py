@@ -0,0 +1,766 @@
+#!/usr/bin/python
+"""
+Benchmarks for imageMe's performance-sensitive code paths.
+
+Run from the top level of the repository, for example:
+
+    python benchmark.py thumbnails --count 10 --megapixels 40
+    python benchmark.py crawl --depth 3 --images-per-dir 50
+    python benchmark.py serve --clients 8 --requests 500
+    python benchmark.py all --output results.json
+
+The crawl, thumbnail-src and serve benchmarks run against a synthetic tree of
+images, generated with the given number of directories, images, sizes and
+formats, or against an existing directory given with --images. Results can be
+written out as JSON with --output, to compare between releases.
+
+Each configuration of the thumbnails benchmark is measured in its own
+subprocess, so that peak RSS figures aren't skewed by whatever ran before them.
+"""
+
+# Dependencies
+import argparse, contextlib, httplib, io, json, multiprocessing, os, platform
+import re, resource, shutil, socket, struct, subprocess, sys, tempfile
+import threading, time
+import PIL
+from PIL import Image
+import imageme
+
+# Constants / configuration
+## File extension synthetic images are saved with, for each image format
+FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'TIFF': 'tif', 'GIF': 'gif'}
+## Image formats synthetic trees are made up of unless configured otherwise
+IMAGE_FORMATS = ['JPEG', 'PNG', 'TIFF', 'GIF']
+## Kinds of request the serve benchmark measures, in the order they're made
+REQUEST_KINDS = ['index', 'thumbnail', 'image']
+## Thumbnailing configurations compared by the thumbnails benchmark. 'legacy'
+## is imageMe's original implementation: a plain thumbnail() with NEAREST
+THUMBNAIL_MODES = ['legacy', 'fast', 'balanced', 'best']
+
+def _fetch_all(port, paths, clients):
+    """
+    Request each of the given paths from the server, spread across a number of
+    concurrent keep-alive clients.
+
+    @param {Integer} port - The port the server is listening on, on localhost
+
+    @param {[String]} paths - The URL paths to request
+
+    @param {Integer} clients - The number of concurrent clients
+
+    @return {Dict} The latencies of the requests and the total time taken, plus
+        the number of responses other than 200 OK.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    def _client(client_paths):
+        connection = httplib.HTTPConnection('127.0.0.1', port)
+        for path in client_paths:
+            start = time.time()
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            latency = time.time() - start
+            with lock:
+                latencies.append(latency)
+                if response.status != 200:
+                    errors[0] += 1
+        connection.close()
+    threads = [
+        threading.Thread(target=_client, args=(paths[i::clients],))
+        for i in range(clients)
+    ]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'latencies': latencies,
+        'seconds': time.time() - start,
+        'errors': errors[0]
+    }
+
+def _get_exif_with_thumbnail(thumbnail_data):
+    """
+    Build EXIF data containing just an embedded JPEG thumbnail, as cameras
+    write it.
+
+    @param {String} thumbnail_data - The encoded JPEG thumbnail
+
+    @return {String} The raw EXIF data, suitable for Image.save's exif option.
+    """
+    # TIFF header, then an empty IFD0 pointing on to IFD1, which holds the
+    # JPEGInterchangeFormat (offset) and JPEGInterchangeFormatLength tags
+    ifd1_offset = 8 + 6
+    thumbnail_offset = ifd1_offset + 2 + 2 * 12 + 4
+    tiff = b'II*\x00' + struct.pack('<I', 8)
+    tiff += struct.pack('<HI', 0, ifd1_offset)
+    tiff += struct.pack('<H', 2)
+    tiff += struct.pack('<HHII', 0x0201, 4, 1, thumbnail_offset)
+    tiff += struct.pack('<HHII', 0x0202, 4, 1, len(thumbnail_data))
+    tiff += struct.pack('<I', 0)
+    return b'Exif\x00\x00' + tiff + thumbnail_data
+
+def _get_free_port():
+    """
+    Find a port on localhost that nothing is listening on.
+
+    @return {Integer} The port number.
+    """
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    probe.bind(('127.0.0.1', 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    return port
+
+def _get_legacy_thumbnail_image(dir_path, image_file):
+    """
+    Thumbnail an image the way imageMe originally did, for comparison.
+
+    @param {String} dir_path - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within dir_path
+
+    @return {PIL.Image} The thumbnail image.
+    """
+    img = Image.open(os.path.join(dir_path, image_file))
+    img_width, img_height = img.size
+    target_height = int(imageme.THUMBNAIL_WIDTH / float(img_width) * img_height)
+    img.thumbnail((imageme.THUMBNAIL_WIDTH, target_height), Image.NEAREST)
+    return img
+
+def _get_noise_image(width, height):
+    """
+    Generate an image of noise. Noise compresses (and so decodes) far more like
+    a photo than a flat colour does.
+
+    @param {Integer} width - The width of the image
+
+    @param {Integer} height - The height of the image
+
+    @return {PIL.Image} The RGB image.
+    """
+    # Generate a tile and repeat it, since noise is slow to make
+    tile = Image.effect_noise((512, 512), 64).convert('RGB')
+    img = Image.new('RGB', (width, height))
+    for x in range(0, width, 512):
+        for y in range(0, height, 512):
+            img.paste(tile, (x, y))
+    return img
+
+def _get_tree_paths(root_dir):
+    """
+    Get the URL paths of everything in a served tree, by kind of request: index
+    pages, thumbnails and original images. Index files must have been created
+    with thumbnails in them already.
+
+    @param {String} root_dir - The root directory of the tree
+
+    @return {Dict} Lists of URL paths, by kind of request.
+    """
+    paths = {'index': [], 'thumbnail': set(), 'image': []}
+    for here, _, image_files in imageme._walk_image_dirs(root_dir):
+        url_dir = '/' + os.path.relpath(here, root_dir).replace(os.sep, '/')
+        url_dir = '/' if url_dir == '/.' else url_dir + '/'
+        page_count = imageme._get_page_count(len(image_files))
+        for page in range(1, page_count + 1):
+            paths['index'].append(url_dir + imageme._get_index_file_name(page))
+            # Only thumbnails referenced by URL can be requested separately
+            html = open(imageme._get_index_file_path(here, page)).read()
+            paths['thumbnail'].update(re.findall(
+                'src="(%s[^"]+)"' % re.escape(imageme.THUMBNAIL_URL_PREFIX),
+                html
+            ))
+        paths['image'] += [url_dir + image_file for image_file in image_files]
+    paths['thumbnail'] = sorted(paths['thumbnail'])
+    return paths
+
+def _make_jpegs(dir_path, count, megapixels, exif_thumbnail_width):
+    """
+    Generate synthetic JPEG photos to benchmark against.
+
+    @param {String} dir_path - The directory to create the images in
+
+    @param {Integer} count - The number of images to create
+
+    @param {Float} megapixels - The size of each image, at a 3:2 aspect ratio
+
+    @param {Integer} exif_thumbnail_width - If non-zero, embed an EXIF
+        thumbnail of this width in each image.
+
+    @return {[String]} The image filenames.
+    """
+    width = int((megapixels * 1000000 * 1.5) ** 0.5)
+    height = int(width / 1.5)
+    img = _get_noise_image(width, height)
+    save_options = {'quality': 90}
+    if exif_thumbnail_width:
+        thumbnail = img.resize(
+            (exif_thumbnail_width, int(exif_thumbnail_width / 1.5)),
+            Image.BILINEAR
+        )
+        # EXIF data has to fit in a single 64KB JPEG segment
+        thumbnail_bytes = io.BytesIO()
+        thumbnail.save(thumbnail_bytes, 'JPEG', quality=30)
+        save_options['exif'] = _get_exif_with_thumbnail(
+            thumbnail_bytes.getvalue()
+        )
+    image_files = []
+    for i in range(count):
+        image_file = 'image%04d.jpg' % i
+        img.save(os.path.join(dir_path, image_file), 'JPEG', **save_options)
+        image_files.append(image_file)
+    return image_files
+
+def _make_tree(
+        root_dir, depth=2, dirs_per_dir=2, images_per_dir=20, megapixels=2.0,
+        formats=IMAGE_FORMATS):
+    """
+    Generate a synthetic tree of image directories to benchmark against. Every
+    directory holds the same number of images, cycling through the formats.
+
+    @param {String} root_dir - The directory to create the tree in
+
+    @param {Integer=2} depth - The number of levels of subdirectories below
+        root_dir
+
+    @param {Integer=2} dirs_per_dir - The number of subdirectories in each
+        directory above the bottom level
+
+    @param {Integer=20} images_per_dir - The number of images in each directory
+
+    @param {Float=2.0} megapixels - The size of each image, at a 3:2 aspect
+        ratio
+
+    @param {[String]=IMAGE_FORMATS} formats - The PIL formats of the images
+
+    @return {Dict} The number of directories and images created.
+    """
+    width = int((megapixels * 1000000 * 1.5) ** 0.5)
+    height = int(width / 1.5)
+    img = _get_noise_image(width, height)
+    # Encode one image of each format, then copy it about - encoding is far
+    # slower than copying, and the contents don't need to differ
+    sources = {}
+    for image_format in formats:
+        source = os.path.join(
+            root_dir, 'source.%s' % FORMAT_EXTENSIONS[image_format]
+        )
+        if image_format == 'GIF':
+            img.convert('P').save(source, image_format)
+        else:
+            img.save(source, image_format)
+        sources[image_format] = source
+    directories = [root_dir]
+    level = [root_dir]
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(dirs_per_dir):
+                subdir = os.path.join(parent, 'dir%02d' % i)
+                os.mkdir(subdir)
+                next_level.append(subdir)
+        directories += next_level
+        level = next_level
+    for directory in directories:
+        for i in range(images_per_dir):
+            image_format = formats[i % len(formats)]
+            shutil.copyfile(sources[image_format], os.path.join(
+                directory,
+                'image%04d.%s' % (i, FORMAT_EXTENSIONS[image_format])
+            ))
+    for source in sources.values():
+        os.unlink(source)
+    return {
+        'directories': len(directories),
+        'images': len(directories) * images_per_dir
+    }
+
+def _measure_thumbnails(dir_path, mode):
+    """
+    Thumbnail and encode every image in the given directory, timing each.
+
+    @param {String} dir_path - The directory of images to thumbnail
+
+    @param {String} mode - One of THUMBNAIL_MODES
+
+    @return {Dict} The per-image latencies and the peak RSS of the process.
+    """
+    imageme.IMAGE_CACHE = None
+    if mode != 'legacy':
+        imageme.RESAMPLE = imageme.THUMBNAIL_QUALITY_FILTERS[mode]
+        imageme.THUMBNAIL_FORMAT = imageme.THUMBNAIL_QUALITY_FORMATS[mode]
+    latencies = []
+    for image_file in sorted(os.listdir(dir_path)):
+        start = time.time()
+        if mode == 'legacy':
+            imageme._get_data_from_image(
+                _get_legacy_thumbnail_image(dir_path, image_file)
+            )
+        else:
+            imageme._make_thumbnail(dir_path, image_file)
+        latencies.append(time.time() - start)
+    return {
+        'latencies': latencies,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+def _print_results(results):
+    """
+    Print the results of any of the benchmarks as tables.
+
+    @param {Dict} results - Results by benchmark, as returned by run_benchmarks
+
+    @return {None}
+    """
+    if 'thumbnails' in results:
+        _print_thumbnail_results(results['thumbnails'])
+    if 'crawl' in results:
+        crawl = results['crawl']
+        print('crawl: %d image(s) in %d directories' % (
+            crawl['images'], crawl['directories']
+        ))
+        for run in ['unprocessed', 'processed_cold', 'processed_warm']:
+            print('%-16s %10.3f s %10.1f images/s' % (
+                run, crawl[run]['seconds'], crawl[run]['images_per_s']
+            ))
+    if 'thumbnail_src' in results:
+        print('%-16s %8s %10s %10s %10s' % (
+            'thumbnail src', 'count', 'mean ms', 'median ms', 'p95 ms'
+        ))
+        for extension, runs in sorted(results['thumbnail_src'].items()):
+            for run in ['cold', 'warm']:
+                result = runs[run]
+                print('%-16s %8d %10.1f %10.1f %10.1f' % (
+                    '%s %s' % (extension, run), result['count'],
+                    result['mean_ms'], result['median_ms'], result['p95_ms']
+                ))
+    if 'serve' in results:
+        print('%-16s %8s %10s %10s %10s %10s %8s' % (
+            'serve', 'count', 'req/s', 'mean ms', 'median ms', 'p95 ms',
+            'errors'
+        ))
+        for kind in REQUEST_KINDS:
+            result = results['serve'][kind]
+            if not result['count']:
+                continue
+            print('%-16s %8d %10.1f %10.1f %10.1f %10.1f %8d' % (
+                kind, result['count'], result['requests_per_s'],
+                result['mean_ms'], result['median_ms'], result['p95_ms'],
+                result['errors']
+            ))
+
+def _print_thumbnail_results(results):
+    """
+    Print the results of benchmark_thumbnails as a table.
+
+    @param {Dict} results - Results by mode, from benchmark_thumbnails
+
+    @return {None}
+    """
+    print('%-10s %10s %10s %10s %14s' % (
+        'mode', 'mean ms', 'median ms', 'p95 ms', 'peak RSS MB'
+    ))
+    for mode in THUMBNAIL_MODES:
+        result = results[mode]
+        print('%-10s %10.1f %10.1f %10.1f %14.1f' % (
+            mode, result['mean_ms'], result['median_ms'], result['p95_ms'],
+            result['peak_rss_mb']
+        ))
+
+@contextlib.contextmanager
+def _quiet():
+    """
+    Silence imageMe's progress output and request logging while measuring.
+
+    @return {Generator} A context manager, within which stdout and stderr are
+        discarded.
+    """
+    devnull = open(os.devnull, 'w')
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = devnull, devnull
+    try:
+        yield
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        devnull.close()
+
+def _reset_imageme(cache=True):
+    """
+    Put imageMe's global state back as it is before serve_dir, so one
+    measurement doesn't benefit from another's work.
+
+    @param {Boolean=True} cache - If True, give imageMe a fresh in-memory
+        thumbnail cache, as serve_dir does when it can't use the on-disk one.
+
+    @return {None}
+    """
+    if imageme.IMAGE_CACHE is not None:
+        imageme.IMAGE_CACHE.close()
+    imageme.IMAGE_CACHE = imageme.ImageCache(None) if cache else None
+    imageme.DIRECTORY_LISTINGS = None
+    imageme.IMAGE_TREE = None
+
+def _summarise(latencies):
+    """
+    Summarise a list of latencies.
+
+    @param {[Float]} latencies - Latencies in seconds
+
+    @return {Dict} The count, mean, median and 95th percentile in milliseconds.
+    """
+    ordered = sorted(latencies)
+    if not ordered:
+        return {'count': 0, 'mean_ms': 0.0, 'median_ms': 0.0, 'p95_ms': 0.0}
+    return {
+        'count': len(ordered),
+        'mean_ms': 1000.0 * sum(ordered) / len(ordered),
+        'median_ms': 1000.0 * ordered[len(ordered) // 2],
+        'p95_ms': 1000.0 * ordered[min(
+            len(ordered) - 1, int(round(0.95 * (len(ordered) - 1)))
+        )]
+    }
+
+@contextlib.contextmanager
+def _synthetic_tree(images=None, **tree_options):
+    """
+    Provide a tree of images to benchmark against, generating a synthetic one
+    in a temporary directory unless an existing directory is given.
+
+    @param {String=None} images - An existing directory of images to use
+
+    @param {Dict} tree_options - Options for _make_tree
+
+    @return {Generator} A context manager giving the tree's root directory.
+        Synthetic trees are removed afterwards.
+    """
+    if images is not None:
+        yield images
+        return
+    root_dir = tempfile.mkdtemp(prefix='imageme-benchmark-')
+    try:
+        _make_tree(root_dir, **tree_options)
+        yield root_dir
+    finally:
+        shutil.rmtree(root_dir)
+
+def benchmark_crawl(root_dir):
+    """
+    Time _create_index_files over a tree, both without processing (as in
+    imageMe's first pass) and with thumbnails generated from a cold cache,
+    then again with the cache warm.
+
+    @param {String} root_dir - The root directory of the tree
+
+    @return {Dict} The time taken and images per second of each run, along with
+        the size of the tree.
+    """
+    image_count, directory_count = 0, 0
+    for _, _, image_files in imageme._walk_image_dirs(root_dir):
+        directory_count += 1
+        image_count += len(image_files)
+    results = {'images': image_count, 'directories': directory_count}
+    _reset_imageme()
+    for run, force_no_processing in [
+            ('unprocessed', True), ('processed_cold', False),
+            ('processed_warm', False)]:
+        with _quiet():
+            start = time.time()
+            created_files = imageme._create_index_files(
+                root_dir, force_no_processing
+            )
+            seconds = time.time() - start
+            imageme._clean_up(created_files)
+        results[run] = {
+            'seconds': seconds,
+            'images_per_s': image_count / seconds if seconds else 0.0
+        }
+    _reset_imageme(False)
+    return results
+
+def benchmark_serve(root_dir, clients=4, requests=200, dynamic=False):
+    """
+    Measure the throughput and latency of requests for index pages, thumbnails
+    and original images against _run_server, running in a thread.
+
+    @param {String} root_dir - The root directory of the tree to serve
+
+    @param {Integer=4} clients - The number of concurrent keep-alive clients
+
+    @param {Integer=200} requests - The number of requests of each kind to
+        make. The tree's paths of each kind are cycled through.
+
+    @param {Boolean=False} dynamic - If True, serve index pages rendered on
+        request (as with --dynamic), rather than from index files.
+
+    @return {Dict} Latency summaries, requests per second and error counts by
+        kind of request.
+    """
+    _reset_imageme()
+    with _quiet():
+        # Thumbnails are generated up front either way, so only serving is
+        # measured. The index files tell us what there is to request
+        created_files = imageme._create_index_files(root_dir)
+    paths = _get_tree_paths(root_dir)
+    if dynamic:
+        imageme._clean_up(created_files)
+        created_files = []
+        imageme.IMAGE_TREE = imageme.ImageTree()
+        imageme.DIRECTORY_LISTINGS = imageme.DirectoryListingCache('.')
+    port = _get_free_port()
+    # The server serves the current directory. It runs until the process exits
+    cwd = os.getcwd()
+    os.chdir(root_dir)
+    results = {}
+    try:
+        with _quiet():
+            server = threading.Thread(
+                target=imageme._run_server, args=(port, '127.0.0.1')
+            )
+            server.daemon = True
+            server.start()
+            while True:
+                try:
+                    socket.create_connection(('127.0.0.1', port)).close()
+                    break
+                except socket.error:
+                    time.sleep(0.05)
+            for kind in REQUEST_KINDS:
+                kind_paths = paths[kind]
+                if kind_paths:
+                    kind_paths = [
+                        kind_paths[i % len(kind_paths)]
+                        for i in range(requests)
+                    ]
+                fetched = _fetch_all(port, kind_paths, clients)
+                results[kind] = _summarise(fetched['latencies'])
+                results[kind]['errors'] = fetched['errors']
+                results[kind]['requests_per_s'] = \
+                    len(kind_paths) / fetched['seconds'] \
+                    if fetched['seconds'] else 0.0
+    finally:
+        os.chdir(cwd)
+        with _quiet():
+            imageme._clean_up(created_files)
+    _reset_imageme(False)
+    return results
+
+def benchmark_thumbnail_src(root_dir):
+    """
+    Time _get_thumbnail_src_from_file for every image in a tree, first with a
+    cold cache and then with it warm.
+
+    @param {String} root_dir - The root directory of the tree
+
+    @return {Dict} Latency summaries of the cold and warm runs, by image file
+        extension.
+    """
+    image_paths = []
+    for here, _, image_files in imageme._walk_image_dirs(root_dir):
+        image_paths += [(here, image_file) for image_file in image_files]
+    _reset_imageme()
+    latencies = {}
+    for run in ['cold', 'warm']:
+        for here, image_file in image_paths:
+            extension = os.path.splitext(image_file)[1][1:].lower()
+            with _quiet():
+                start = time.time()
+                imageme._get_thumbnail_src_from_file(here, image_file)
+                latency = time.time() - start
+            latencies.setdefault(extension, {}).setdefault(
+                run, []
+            ).append(latency)
+    _reset_imageme(False)
+    return dict(
+        (image_format, dict(
+            (run, _summarise(run_latencies))
+            for run, run_latencies in runs.items()
+        ))
+        for image_format, runs in latencies.items()
+    )
+
+def benchmark_thumbnails(
+        count=10, megapixels=24.0, exif_thumbnail_width=0, images=None):
+    """
+    Compare per-image thumbnailing latency and peak RSS across THUMBNAIL_MODES.
+
+    @param {Integer=10} count - The number of synthetic images to generate
+
+    @param {Float=24.0} megapixels - The size of the synthetic images
+
+    @param {Integer=0} exif_thumbnail_width - If non-zero, embed an EXIF
+        thumbnail of this width in the synthetic images.
+
+    @param {String=None} images - A directory of real images to use instead of
+        generating synthetic ones.
+
+    @return {Dict} Results by mode.
+    """
+    temp_dir = None
+    if images is None:
+        temp_dir = tempfile.mkdtemp(prefix='imageme-benchmark-')
+        images = temp_dir
+        _make_jpegs(images, count, megapixels, exif_thumbnail_width)
+    try:
+        results = {}
+        for mode in THUMBNAIL_MODES:
+            # Run each mode in a fresh process so peak RSS is its own
+            output = subprocess.check_output([
+                sys.executable, os.path.abspath(__file__),
+                '_measure-thumbnails', images, mode
+            ])
+            measured = json.loads(output.decode('utf-8').splitlines()[-1])
+            results[mode] = _summarise(measured['latencies'])
+            results[mode]['peak_rss_mb'] = measured['peak_rss_kb'] / 1024.0
+        return results
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+def run_benchmarks(benchmarks, args):
+    """
+    Run the given benchmarks, as configured on the command line, over a single
+    tree of images.
+
+    @param {[String]} benchmarks - The names of the benchmarks to run
+
+    @param {argparse.Namespace} args - The parsed command line arguments
+
+    @return {Dict} The results of each benchmark, by name, along with the
+        configuration and environment they were run in.
+    """
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'pillow': getattr(
+                PIL, '__version__', getattr(PIL, 'PILLOW_VERSION', None)
+            ),
+            'platform': platform.platform(),
+            'cpus': multiprocessing.cpu_count(),
+            'time': time.time()
+        },
+        'configuration': dict(
+            (name, value) for name, value in vars(args).items()
+            if name not in ['benchmark', 'output', 'json']
+        )
+    }
+    tree_options = dict(
+        depth=args.depth, dirs_per_dir=args.dirs_per_dir,
+        images_per_dir=args.images_per_dir, megapixels=args.megapixels,
+        formats=args.formats
+    )
+    with _synthetic_tree(args.images, **tree_options) as root_dir:
+        if 'crawl' in benchmarks:
+            results['crawl'] = benchmark_crawl(root_dir)
+        if 'thumbnail-src' in benchmarks:
+            results['thumbnail_src'] = benchmark_thumbnail_src(root_dir)
+        if 'serve' in benchmarks:
+            results['serve'] = benchmark_serve(
+                root_dir, args.clients, args.requests, args.dynamic
+            )
+    return results
+
+def main():
+    """
+    Run the benchmark named on the command line.
+
+    @return {None}
+    """
+    parser = argparse.ArgumentParser(description='Benchmark imageMe.')
+    subparsers = parser.add_subparsers(dest='benchmark')
+    thumbnails = subparsers.add_parser(
+        'thumbnails',
+        help='Per-image thumbnailing latency and peak RSS, before and after'
+    )
+    thumbnails.add_argument('--count', type=int, default=10)
+    thumbnails.add_argument('--megapixels', type=float, default=24.0)
+    thumbnails.add_argument(
+        '--exif-thumbnail-width', type=int, default=0,
+        help='Embed EXIF thumbnails of this width in the synthetic images'
+    )
+    thumbnails.add_argument(
+        '--images', default=None,
+        help='Directory of real JPEGs to use instead of synthetic ones'
+    )
+    thumbnails.add_argument('--json', action='store_true')
+    thumbnails.add_argument(
+        '--output', default=None, help='File to write the results to as JSON'
+    )
+    # The tree benchmarks share their options
+    for name, help_text in [
+            ('crawl', 'Time generating index files for a whole tree'),
+            ('thumbnail-src', 'Per-image latency of getting thumbnail srcs'),
+            ('serve', 'HTTP throughput and latency of the server'),
+            ('all', 'Run the crawl, thumbnail-src and serve benchmarks')]:
+        tree = subparsers.add_parser(name, help=help_text)
+        tree.add_argument(
+            '--depth', type=int, default=2,
+            help='Levels of subdirectories in the synthetic tree'
+        )
+        tree.add_argument(
+            '--dirs-per-dir', type=int, default=2,
+            help='Subdirectories of each directory in the synthetic tree'
+        )
+        tree.add_argument(
+            '--images-per-dir', type=int, default=20,
+            help='Images in each directory of the synthetic tree'
+        )
+        tree.add_argument('--megapixels', type=float, default=2.0)
+        tree.add_argument(
+            '--formats', type=lambda value: value.upper().split(','),
+            default=IMAGE_FORMATS,
+            help='Comma separated image formats of the synthetic tree ' \
+                '(default %s)' % ','.join(IMAGE_FORMATS)
+        )
+        tree.add_argument(
+            '--images', default=None,
+            help='Directory tree of real images to use instead of a ' \
+                'synthetic one'
+        )
+        tree.add_argument(
+            '--clients', type=int, default=4,
+            help='Concurrent clients for the serve benchmark'
+        )
+        tree.add_argument(
+            '--requests', type=int, default=200,
+            help='Requests of each kind for the serve benchmark'
+        )
+        tree.add_argument(
+            '--dynamic', action='store_true',
+            help='Serve index pages rendered on request'
+        )
+        tree.add_argument('--json', action='store_true')
+        tree.add_argument(
+            '--output', default=None,
+            help='File to write the results to as JSON'
+        )
+    # Used internally, to measure each mode in its own process
+    measure = subparsers.add_parser('_measure-thumbnails')
+    measure.add_argument('images')
+    measure.add_argument('mode', choices=THUMBNAIL_MODES)
+    args = parser.parse_args()
+    if args.benchmark == '_measure-thumbnails':
+        print(json.dumps(_measure_thumbnails(args.images, args.mode)))
+        return
+    if args.benchmark == 'thumbnails':
+        results = {'thumbnails': benchmark_thumbnails(
+            args.count, args.megapixels, args.exif_thumbnail_width,
+            args.images
+        )}
+    elif args.benchmark == 'all':
+        results = run_benchmarks(['crawl', 'thumbnail-src', 'serve'], args)
+    else:
+        results = run_benchmarks([args.benchmark], args)
+    if args.output is not None:
+        output = open(args.output, 'w')
+        json.dump(results, output, indent=2, sort_keys=True)
+        output.close()
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        _print_results(results)
+
+if __name__ == '__main__':
+    main()
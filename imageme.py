@@ -11,7 +11,10 @@ what's called.
 """
 
 # Dependencies
-import base64, io, os, re, sys, threading, SimpleHTTPServer, SocketServer
+import argparse, base64, collections, cProfile, email.utils, errno
+import functools, gzip, hashlib, heapq, io, json, multiprocessing, os, pstats
+import re, select, signal, socket, sqlite3, struct, threading, time
+import Queue, SimpleHTTPServer, SocketServer, urllib, urlparse
 # Attempt to import PIL - if it doesn't exist we won't be able to make use of
 # some performance enhancing goodness, but imageMe will still work fine
 PIL_ENABLED = False
@@ -26,40 +29,2026 @@ except ImportError:
         'performance you could out of imageMe. Install Pillow (' +\
         'https://github.com/python-pillow/Pillow) to enable support.'
     )
+# Check whether Pillow can write WebP, which the best quality thumbnails are
+# encoded as if so
+WEBP_ENABLED = False
+if PIL_ENABLED:
+    try:
+        from PIL import features
+        WEBP_ENABLED = features.check('webp')
+    except ImportError:
+        pass
+# Attempt to import pyinotify - without it, watching for changes falls back to
+# polling directory modification times
+INOTIFY_ENABLED = False
+try:
+    import pyinotify
+    INOTIFY_ENABLED = True
+except ImportError:
+    pass
+# Attempt to get sendfile - os.sendfile on Python 3.3 and later, otherwise the
+# pysendfile module (https://github.com/giampaolo/pysendfile). Without it,
+# files are served by copying them through Python a chunk at a time
+SENDFILE_ENABLED = False
+try:
+    from os import sendfile
+    SENDFILE_ENABLED = True
+except ImportError:
+    try:
+        from sendfile import sendfile
+        SENDFILE_ENABLED = True
+    except ImportError:
+        pass
+# Attempt to get scandir - os.scandir on Python 3.5 and later, otherwise the
+# scandir backport module (https://github.com/benhoyt/scandir). Without it,
+# directory scanning falls back to os.listdir and a stat per entry
+SCANDIR_ENABLED = False
+try:
+    from os import scandir
+    SCANDIR_ENABLED = True
+except ImportError:
+    try:
+        from scandir import scandir
+        SCANDIR_ENABLED = True
+    except ImportError:
+        pass
+# Attempt to import brotli (https://github.com/google/brotli), which compresses
+# pages better than gzip. Without it, pages are only gzipped
+BROTLI_ENABLED = False
+try:
+    import brotli
+    BROTLI_ENABLED = True
+except ImportError:
+    pass
 
 # Constants / configuration
+## Name of the directory, created in the served directory, which holds the
+## persistent thumbnail cache
+CACHE_DIR_NAME = '.imageme-cache'
+## Filename of the SQLite database within the cache directory
+CACHE_FILE_NAME = 'cache.sqlite'
+## Maximum total size in bytes of cached thumbnail data, above which the least
+## recently used entries are evicted
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+## The DirectoryListingCache index pages are rendered from as they're requested.
+## Set up by serve_dir in dynamic mode, None means index files are written out
+DIRECTORY_LISTINGS = None
+## The BackgroundIndexFileGenerator thumbnailing the served directories, told
+## which directories are being requested. Set up by serve_dir
+BACKGROUND_INDEXER = None
+## Quality to brotli compress pages at. 11 is the smallest, but far slower,
+## and pages are compressed again every time they're regenerated
+BROTLI_QUALITY = 9
+## Content encodings generated pages are precompressed with, most preferred
+## first
+COMPRESSION_ENCODINGS = ['br', 'gzip'] if BROTLI_ENABLED else ['gzip']
+## Suffixes of the precompressed copies written alongside index files, by
+## encoding
+COMPRESSED_FILE_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+## Filename the lightweight gallery page, which renders a directory from its
+## manifest in the browser, is served at in every directory
+CLIENT_FILE_NAME = 'imageme-lite.html'
+## The ImageCache generated thumbnails are stored in and read from. Set up by
+## serve_dir, None disables caching
+IMAGE_CACHE = None
+## Whether thumbnails are embedded in index files as base64 data URIs, rather
+## than referenced by URL and served from the cache by ImageMeRequestHandler
+INLINE_THUMBNAILS = False
+## Seconds an idle keep-alive connection is held open for. Each one holds a
+## server thread while it waits for its next request, so this is kept short
+KEEP_ALIVE_TIMEOUT = 2
+## Filename each directory's JSON manifest is served at
+MANIFEST_FILE_NAME = 'imageme.json'
+## Version of the manifest format, for its readers. Bump this whenever the
+## format changes incompatibly
+MANIFEST_VERSION = 1
+## The ManifestCache manifests are served from. Set up by serve_dir
+MANIFESTS = None
+## The Metrics timings and request counts are recorded in. Set up by serve_dir,
+## None disables recording
+METRICS = None
+## Upper bounds in seconds of the buckets timings are counted in
+METRICS_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0]
+## Number of the slowest calls of each timed function whose files are listed,
+## to help spot pathological images
+METRICS_SLOWEST_CALLS = 10
+## URL path metrics are served at, in Prometheus text format
+METRICS_URL_PATH = '/__metrics'
+## File to write cProfile stats to when the server stops. Set up by serve_dir,
+## None disables profiling
+PROFILE_PATH = None
+## The pstats.Stats profiles of the background indexer and of each request
+## are added into while profiling
+PROFILE_STATS = None
+## Lock held while adding to PROFILE_STATS
+PROFILE_STATS_LOCK = threading.Lock()
+## URL path prefix full-size conversions of images browsers can't display
+## (TIFFs) are served under
+FULL_SIZE_URL_PREFIX = '/__full/'
+## Animated GIFs of up to this many frames get animated thumbnails, with every
+## frame scaled down. Longer ones (and all GIFs, if 0) get their first frame
+GIF_THUMBNAIL_MAX_FRAMES = 50
 ## Filename of the generated index files
 INDEX_FILE_NAME = 'imageme.html'
-## Regex for matching only image files
-IMAGE_FILE_REGEX = '^.+\.(png|jpg|jpeg|tif|tiff|gif|bmp)$'
+## Version of the generated index HTML. Stored indexes from other versions are
+## never reused, so bump this whenever the HTML or the way it's stored changes
+INDEX_VERSION = 5
+## Extensions of the image files to index, in lower case. Matching ignores case
+IMAGE_FILE_EXTENSIONS = frozenset([
+    '.bmp', '.gif', '.jpeg', '.jpg', '.png', '.tif', '.tiff'
+])
+## The ImageTree directories are listed from while the server runs. Set up by
+## serve_dir, None means trees are scanned afresh each time they're walked
+IMAGE_TREE = None
+## Number of threads directory trees are scanned with. Scanning mostly waits
+## on the filesystem, so this helps most on network mounts
+SCAN_THREADS = 8
+## Port the server runs on, unless given another
+SERVER_PORT = 8000
+## Number of threads the server handles requests with
+SERVER_THREADS = 16
+## Seconds a client may go without sending a request's data, or accepting a
+## response's, before its connection is dropped
+SOCKET_TIMEOUT = 15
+## Maximum bytes of a file sent at a time when serving it, by each sendfile
+## call or read and write
+SEND_CHUNK_BYTES = 1024 * 1024
+## Images per page of the gallery, beyond which a directory's index is split
+## across several files. 0 puts every image on a single page
+IMAGES_PER_PAGE = 200
 ## Images per row of the gallery tables
 IMAGES_PER_ROW = 3
+## Resampling filter to use when thumbnailing for each thumbnail quality
+## setting. The draft decoding below keeps even the best of these fast
+THUMBNAIL_QUALITY_FILTERS = {} if not PIL_ENABLED else {
+    'fast': Image.NEAREST,
+    'balanced': Image.BILINEAR,
+    'best': Image.LANCZOS
+}
+## Format to encode thumbnails as for each thumbnail quality setting. WebP is
+## smaller for the same quality, but slower to encode
+THUMBNAIL_QUALITY_FORMATS = {
+    'fast': 'JPEG',
+    'balanced': 'JPEG',
+    'best': 'WEBP' if WEBP_ENABLED else 'JPEG'
+}
+## Thumbnail quality setting used unless configured otherwise
+THUMBNAIL_QUALITY = 'balanced'
 ## Resampling mode to use when thumbnailing
-RESAMPLE = None if not PIL_ENABLED else Image.NEAREST
+RESAMPLE = THUMBNAIL_QUALITY_FILTERS.get(THUMBNAIL_QUALITY)
+## Format to encode thumbnails as. PNGs stay PNG unless this is WebP, so they
+## keep their transparency, and GIFs stay GIF so they keep their animation
+THUMBNAIL_FORMAT = THUMBNAIL_QUALITY_FORMATS[THUMBNAIL_QUALITY]
+## Whether to have JPEGs decoded at reduced size when thumbnailing, rather
+## than decoding every pixel only to throw most of them away
+THUMBNAIL_DRAFT = True
+## How many times larger than the thumbnail non-JPEG images are reduced to by
+## fast pixel binning before resampling (Pillow 7.0 and later)
+THUMBNAIL_REDUCING_GAP = 2.0
+## Seconds between rewrites of the index files of a directory being
+## thumbnailed in the background, showing the thumbnails ready so far
+PARTIAL_INDEX_INTERVAL = 2
+## Minimum ratio of the time between those rewrites to the time the last one
+## took, so big directories aren't forever being rewritten
+PARTIAL_INDEX_COST_RATIO = 10
+## Number of thumbnails each background worker process may have queued or in
+## progress at once. Bounds memory use while still keeping workers busy
+THUMBNAILS_IN_FLIGHT_PER_WORKER = 4
+## URL path prefix thumbnails are served under
+THUMBNAIL_URL_PREFIX = '/__thumb/'
 ## Width in pixels of thumnbails generated with PIL
 THUMBNAIL_WIDTH = 800
+## Widths in pixels of the smaller thumbnails generated alongside each
+## THUMBNAIL_WIDTH one, which browsers showing the gallery smaller (on phones,
+## say) fetch instead. Made from the same decode of the image
+THUMBNAIL_EXTRA_WIDTHS = [200, 400]
+## Seconds between checks for changed directories when polling for changes,
+## or to wait for inotify events to settle before acting on them
+WATCH_INTERVAL = 2
 ## Base64 data for an image notifying user of an unsupported image type
 UNSUPPORTED_IMAGE_TYPE_DATA = 'data:image/jpeg;base64,/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgGBgcGBQgHBwcJCQgKDBQNDAsLDBkSEw8UHRofHh0aHBwgJC4nICIsIxwcKDcpLDAxNDQ0Hyc5PTgyPC4zNDL/2wBDAQkJCQwLDBgNDRgyIRwhMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjIyMjL/wAARCAMgAyADASIAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwD36iiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAoorn/+E68If9DXof8A4MYv/iqAOgopM1n6lrukaKYv7V1axsPNz5f2q5SLfjGcbiM4yPzoA0aKytP8SaFrFw1vpet6bfTqhdo7W7jkYKMDJCknGSOfetUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRSc0A0ALRRRQAUUUUAFFFFABRRXg/xL+M/iLwv4z1DQNMtdPWK28vE0qM7ndGr/3gB970oA94orkfhhrmoeJPh3perarMJr2487zJAgTO2Z1HAAA4AFddQAUVieL/ABCnhXwnqOtvF5v2SLcsecbmJCqCewLEV89eF/jv4qh8Q2/9t3MN7pssoSWPyEjaNWONyFQDkdcHOenGc0AfUFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRSUDpzQAtFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABXwDX39XwDQB9/8Aavn/APaa6+F/+3v/ANo19Adq+f8A9prr4X/7e/8A2jQBz/7OP/JQ7/8A7BUn/o2Kvp+vmD9nH/kod/8A9gqT/wBGxV6D+0b/AMk9sP8AsKx/+ipaAPSrrxHoVgxW81rTrdh2mukT+Zptl4n8P6lKIrHXdMupD0SC7jcn8Aa+LvD3hrWPFeoPYaJZtd3SRmVow6rhAQCcsQOrD86n8R+DfEXhJo11zS5rMS/cclXRj6BlJGfbNAH3BRXgv7Pvja6u5LnwrqE7TLFF59m0jZKqCA0Y9uQQO3P4dJ8dvGF54a8LWtjpszwXWpyMhmQ4ZYlA3bT2J3KM+hNAHol/4h0XSn2ajrGn2b/3bi5SM/8AjxFOsdc0jU2xp+qWV2fS3uFk/kTXx34M8A6348urmDSBbqtsqtNLcSbUXdnaOASScHoO1dTL8A/GVrfW0bw2lzbvKiyy2twDsUkAthwp4HoKAPquiha+AaAPv6il718AUAff1VbzUbKwXdeXlvbL6zSqg/UirVfAVAH3DH4z8LSyCOPxLo7yHoq30RP/AKFW2DkA5B96+Ob34R+PLC0a5n8OTmNBk+VLHK2P91GJP5VneDPG+r+CdXS806ZjCzD7Ras37uZfQjsfRuo/SgD7YqG5u7azj8y6uIoE/vSuFH606CaO5gjnhkWSKRQ6OpyGBGQR+Br4H4oA+3x408KmTZ/wk2jbz/D9viz+W6tuN0kRXRw6MMhlOQR618ey/B3x/FbmdvDspQDOEniZvwUOT+lc74d8R6t4V1dNQ0m7e3nQ4YfwyD+669x9f0oA+5qKoaJq1rr2iWeq2T7re6iEqZ6gHsfccj8K8H+OPxLuzqUvhPR7loYIRi/mjbBkYjPlgjoAMZ9Tx2OQD3K+8TaBpc3k3+uaZaS/3Li7jjb8iRV+1u7a9gWe0uIriFvuyROHU/iK+LPD3gDxT4qtnudG0ea5t1JHmlljQkdQC5AJ+lZsU2r+GNcDRtc6dqdnJ3BR42HYj+h6igD7rpCQoJJAA6k9qwfBnie28YeFbLWrZdhmUrLHnJjkXhl/Pp7EGvmH42MT8XNbBJIAgAB7fuIzQB9RTeMfC9u+yfxJpEbZxte+iU/+hVpWl/Z6hF5tldwXMf8AehkDj8wa+N9D+GfjDxJpcWp6Tor3FnLu2S+fEgbBKnG5geoI/CvY/gL4L1fw5qGu3et6bPZTFIoIfNTG4ZLPg9xwnSgDxLx9LJL8QvEfmOz7dTuVXcc4AlbAHtX154E/5J54a/7BVr/6KWvkDx3/AMlD8S/9hW6/9GtUcHgvxVdW8Vxb+GtZmglQPHJHYSsrqRkEELggjnNAH3FRXlnwD0nUtH8CX1tqmn3djO2pSOsV1C0TFfKiGQGAOMgjPsa8q+MXxLu/Eeu3GiabctHoto5jYRtgXLg8s3qoPQdOM9+AD6QufFnhuyuDBdeINJgmBwY5b2NGB+hatWKWKeJZYZFkjYZV0YEEexFfGemfDDxprOlrqVjoFxJaOu5WZkQsvqqsQSPTAOayPDviHU/Cmtw6lplw8FxE2GXnbIueUYdwfT+tAH3NQeOar2V5BqFhb3tq/mQXESyxOP4lYAg/ka+T/i18Qbnxf4kntLedl0azkKW8SH5ZWHBkOOue3oPqcgH063jHwxHP5D+JNIWbOPLN9EGz9N2a+W/jWQ3xc1xlIIItyCO/+jx1m6N8MvGev6et/pugzy2rjckjukQceq72BYe4rndR0680m/lsdQtZbW7hOJIZkKsvGRkH1BBHsQaAPrT4Jf8AJINC/wC3j/0okrv64D4Jf8kg0L/t4/8ASiSu/oAp6tplprWk3Wm38QltLmMxypnGQffsfftXk/hr9n7SdF1+DUr/AFebUY7eQSRW3kCJSwORvO47hntxnvxwfRfHX/JPPEv/AGCrr/0U1fIHgT/kofhr/sK2v/o1aAPt6qd7qunacM32oWtr3/fzKn8yKy/HY/4t94l/7BV1/wCimr4qsrOfUb63sbWMyXNxKsUUYIy7scKPzIH40Afbdv4v8M3cohtvEWkzSngJHexsxPsA2a2WZUQsxAUDJJPAFfFPiH4feKvCtot3rWjS21szBfNDpIoJ6AlGIH41jwLqWryWmmW5uryQEx21spZ8ZOSEXtnqcUAfaieMfDEk/kp4k0h5c42LfRFvyzW3XxP4g+H/AIq8LWaXms6PNbWzEL5odJFBPQEoSB+Ndr8CfGN1pPi6LQJZmbTtSyqxseI5gCVYemcbT65HpQB9R1n3uu6PprFb/VbG0I6ie4WM/qRWhnvXxnYfCnx1qUYkt/Dd2qnp55WE/k5FAH1xY+JdB1SXytP1vTruQ9Et7qOQ/kCa1K+Gtf8AC2t+FrpLfW9Oms5JASm/BVwOuGBIOMjoa99/Z/8AGV3rOlXvh+/naaTT1WS2dzlvKPBXPopxj2bHQCgD2iqt7qNlpsXm395b2sX9+eVY1/MkVxHxa8ev4G8Mo1kV/tW+JjttwzsAHzSY74yPxI+lfKenaZqviPVBbafa3F/eyksVRS7H1J/xNAH2nB4w8M3LbbfxHpErekd9Gx/Rq2QwZQVIIIyCK+KfEfw+8UeErCO81zSmtLaSQRI/nRuC5BIHysccA/lXc/s5f8lCv/8AsFSf+jYqAPp6q19qNjpsHnX97b2kX9+eVUX8zXK/E3xuvgbwo97EEe/uG8m0jbpvI5Y+yjn64HevkrTdJ1rxXq7QWFvc6lfzEyOQSzHnlmY9Oe5NAH2vp/iDRdWcppur2F6w5ItrlJD/AOOk1o18O+IfCWveE544tc0yazMmfLZiGV/XDKSCfxr6B+BfxAuvEmnXGg6rcNNf2KCSGZ2y8sOcfNnqVJAz3DDvzQB7DRRRQB8SePpZJPiF4j3yM+3VLlV3EnAErYFfXngX/knnhn/sFWv/AKKWvkDx3/yUPxL/ANhW6/8ARrVHB4M8VXVvFcW/hrWZoJUDxyR2ErK6kZBBC4II5zQB9xUV5Z8A9J1HRvAt7b6pp93YztqcjrHdQtExXyohkBgDjIIz7GvmrxNosnh3xPqWkS5LWlw0YYjllz8rfiMH8aAPuiisDwRrq+JPBWkatuDPPbL5p/6aL8r/APjwNfM3xu1n+2PidfIjborBEtE+qjLf+PMw/CgD64qreajZWC7ry8t7ZfWaVUH6kV5x8BNDOlfDpLyRNs2pTtcHIwdg+RR9PlJ/4FXynQB9wx+M/C0sgjj8S6O8h6Kt9ET/AOhVtg5AOQfevjm9+EfjywtGuZ/Dk5jQZPlSxytj/dRiT+VZ3gzxvq/gnV0vNOmYwsw+0WrN+7mX0I7H0bqP0oA+2KKjhmjuLeOeGQSRSKHR1OQykZBH4Gvlz4xfEu78R63c6Hp1yY9FtJDGwjOPtLrwWYjqoPQdOM88YAPo658WeG7KcwXXiHSoJgcGOW9jRvyJzWrDNFcRLLDIkkbDKujZB/GvjTTPhj401jS11Kx0C4ktXXejs6IXX1VWYEg9sA5rI8PeItU8J65DqWmXDwXETYZedrrnlGHcH0/rQB9zUVi6rqUtz4JvdT0VjLLJp0lxZMgzvYxlkx+OK+II5ZIpUlid0kQhlZSQVI5yDQB980UfjRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABXwDX39XwfrGlXOiaxeaZeIUuLWVonHuD1Hsev40AfeAYMoIOQRkV4B+0yQT4XAPOLo/8AomtfwL8cvDo8MWln4juZbO/tYlhaQwvKswUYDZUE5IHOQOc15D8UfHY8e+J1u7aKSGwto/Jtkk+8RnJZh2JPb0AoA6j9nEH/AIWFfnHH9lSf+jYq7/8AaO/5J5p//YVj/wDRU1Y37OPh6WG11bxBNGVjn22tuxGNwUkuR7Z2jPqD6Vs/tHf8k8sP+wrH/wCipaAPP/2cf+Sh3/8A2CpP/RsVeufHGFJPhLq7sATE8Dr7HzkX+RNeR/s4/wDJQ7//ALBUn/o2KvYPjb/ySHXP+3f/ANHx0AeA/BFivxc0UA8MJwff9xIf6V7X8cPBd74q8K211pkLT32mSM4hUZaSNgN4X1Pyqcd8HvivE/gl/wAle0L/ALeP/SeSvprxX450PwWbE63PJCl47LG6Rl9u0DJIHOOR0B60AfGulazqWhXq3mlX09ncKMCSFypI9D6j2PFex+E/2h7+G4itvFFnFcW5IVru2XZIv+0V6N+GK9P1bXPhj4rsturar4eu4yvBnuI1kX/dJIZT9MV8k6nFaQareQ6fM09lHO628rjBeMMQrH3IwfxoA+8hXwDX3N4Sjmh8GaFFcA+emn26yZ67hGoP618OywyQTPDKpSRGKsrDlSOCDQB9918AV9Z6d8d/A11YRzXeoTWU5Ub7eS2kcqe43IpB+ua+TMUAff1fANff1fANAH38a+NPivp0GlfFDXrW3VVj88ShVGADIiuR+bGvoM/HbwF9jM/9pXBkxn7P9kk3n2zjb+tfLniHWrjxH4hv9YuVCy3kzSlAchQeij6DA/CgD60+D1xJdfCfQJJCSwikjGfRZXUfoBXxxX3F4M0VvDngzSNIfAltrZFlwcjeeWx/wImvh2gD79PWvlX4/adBY/Eoywqqm9so7iTaMfPlkz+SCvYbb47eA57TzpNRubaTGfIltJC+fTKgr+tfOPjvxZJ418W3WstEYYn2xwRMclI1GAD7nkn3JoA+gP2ebmSf4byxuSVg1CWNM9htRv5sa+Yb65kvL65upiTLNK0jk9SScnP519d/B7QZfD/w102C4jKXFzuupFIwRvOVz77Qua+afiT4al8LeO9TsGTbA8hntjjhonJK4+nK/VTQB9jaZZQ6bpdpY26hYLeFIowOyqAB/KvAf2lLKCPVfD98qjzp4ZonI6lUKEf+htW/4C+Ofh9fDNrZeJLiWzv7WIRGbyXkSYKMBvlBIJA5BHWvIvih46HjvxSL23jkisLaPybZJPvYySWI7Ent6AUAeofs03MjWPiO1JPlxywSKPdhID+iLXm/xt/5K9rv/bv/AOiI69r+AnhyXRfAjX9zGUn1ObzlUjBEQGEz9fmYezCvFPjb/wAle13/ALd//REdAH0B8Ev+SQ6F/wBvH/o+Su/rgPgl/wAkh0L/ALeP/R8ld/QB8Q+O/wDkofiX/sK3X/o1q+v/AAJ/yTzw1/2CrX/0UtfJvxO0+TT/AImeIYpFwXvXnA9pDvB/Jq9n+Hnxo8LWXgzTtN128ksryxhW3/1DusioMKQUB7AZzjmgD2qvgIV9t+EfGuj+N7O6utHaZorabyWMsewscA5Az05746GvjTWtHutB1u80q9QpcWsrRv74PBHsRgj2NAHp/wDw0Z4uH/MN0Pn/AKYy/wDxyvNPEeu3HibxBd6zdQ28M90waRLdSEBAAyASTzjJ56k19H+Hfj/4Wv7CP+2jNpl4BiUeS0sZPqpQE49iPz61Pqfx+8F2cZNpJe379hDblB+JfbxQBs/BuZpvhNoLvkkRypz6LK4H6AV8eCvv32r4T13Rbvw9rt7pN6pWe0laNuCA2OjD2IwR9aAPusEYwMfSvkL42/8AJXtd/wC3f/0RHXsHhb4+eGr3SYR4hmk0/UUULMRA8kcjf3l2AkZ64I46V4d8T9csPEnxE1XV9LmM1lceV5cjIULbYkU8HB6qaAPpD4Jf8kg0L/t4/wDSiSu/rgPgn/ySHQx/18f+lEld/QBgeOv+SeeJf+wVdf8Aopq+QPAn/JQ/DX/YVtf/AEatfX/jr/knniX/ALBV1/6KavkDwJ/yUPw1/wBhW1/9GrQB9f8Ajv8A5J54l/7BV1/6KavkDwJ/yUPw1/2FbX/0atfX/jv/AJJ54l/7BV1/6KavkDwJ/wAlD8Nf9hW1/wDRq0AfXXxBgSf4c+JEkG5Rptw4B9VjYj9QK+R/ATlPiH4aI76pbD85VH9a+vfHf/JPPEv/AGCrr/0U1fIHgT/koXhr/sK2v/o1aAPrr4gQJP8ADrxIkiggaZcOB7rGWH6gV8jeA2K/EPw0Qcf8TS2H5yrX1946/wCSe+Jf+wVdf+imr5A8Cf8AJQvDX/YVtf8A0atAH2fresWXh/RrnVdRlEVpbJvkbGT7ADuScAD1NfNGs/tAeL76dzpotNMgz8ipEJXA92fIJ/AV6f8AtCxTSfDeJos7I9QiaXH93a45/wCBFa8S+FHivS/BvjUalq8TvbNbvCJETc0LEqd+PoCOOcMfpQBR8SfEXxP4u0mLT9cvkuoI5hMh+zxowYBl6qo4wxrtP2cSf+FhagM8HSpD/wCRYq1/jT8RfC/i3wdZ6foepG6uY79JnX7PJGAgjkXOWUd2FZH7OI/4uHqH/YKk/wDRsVAEn7SDSf8ACdaYpz5Y01Sv182TP9K7L9m6O2HhHVpV2/amv9snrsEa7fwyX/WtP44+BrrxV4et9R0yIzahppZvJUfNLE2NwHqRgED6454r5r0PxDq/hq/+26PfTWdxjaWjPDD0IPBHQ4IoA+iv2jv+Se6f/wBhWP8A9FS15/8As4/8lCv/APsFSf8Ao2KuC8R+N/EviyKNNb1aa7iRt6xYVEDYI3bVAGcE84zzXe/s4/8AJQr/AP7BUn/o2GgCx+0hcyN400q1JPlx6cJFHu0jg/ogrkPBHxP1nwFY3VrpVjpsouZRJJJcxuz8DAGVdeByenc16h+0b4dmns9L8QwR7o7fdbXBH8IYgoT7Z3D6ketcJ8J/ikvgOW5sNRgkn0q6cSExYLwyYxuAOMggAEZ7DHoQCv4s+Mmv+MfD82i6lYaSkEjK2+GGRXUqwOQTIQDxjp0Jo+BszRfFnSkUnEsc6Ng9vKc/zAr3V/jj4ASLcNakdv7i2c2f1UD9a3PBHjfTvHmm3WoabDPDDBcm3KzgB2wqtnAJ4+b17UAdRRRRQB8Q+O/+Sh+Jf+wrdf8Ao1q+v/Av/JPPDP8A2CrX/wBFLXyb8TrCTTviZ4hhlUqXvZJx7iQ7wfyavZ/h58aPC1n4M03TNcu5LG8sYFtzmB3WRUG1SCgP8IGc45zQB7Sa+e/2jPDJjutN8TQR/LKPslwQOjDLIT9RuH/ARXsfhHxro/jezurvR2maG2m8ljKmwk4ByBnpz3x0NXfE2hW/iXw3f6NdYEV3CU3YzsbqrfgQD+FAHiv7OfiRI4dY8P3MoVY8X0O44wOFk/8AZD+deESyXGo37yuWmubmUseOXdj/ADJNJDcXFlM7RSSQybXibHB2sCrKfqCQfrXpHwJ8N/238QYr6VN1tpSG4YkceYeIx9ckt/wCgD6osrSGwsbezt0CQW8axRr6KoAA/IV8EV9/V8A0Affxr40+K+nQaV8UNetbdVWPzxKFUYAMiK5H5sa+gz8dvAX2Mz/2lcGTGfs/2STefbONv618ueIdauPEfiG/1i5ULLeTNKUByFB6KPoMD8KAPrP4PXEl18J9AkkJLCKSMZ9FldR+gFfHY6E+9fb/AIM0VvDng3SNIfAltrZVlxyN5GWx/wACJr4u1rSLvQdavNKvYylzaStG4PfHQj2IwQe4IoA9Q/4aN8Xf9A7Q/wDvxL/8crzbxHr1z4n8QXmtXcNvBcXbB5EtlKoCFAyASTzjJ56k19GeHvj/AOFr6xj/ALaM2mXgAEg8lpYye+0rk4+o/PrVjUvj94Ls0P2SW9v37LDblB+JfbQBsfBuZp/hLoLuSSElTn0WZwP0ArqYdA0W31E6jDpFhFfNyblLZBIf+BAZrRxXgP8Aw0x/1KP/AJUv/tVAHv2aWgDFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFch44+HOh+O7VBqEbQ3kS7YbuHAkQf3T2Zc9j+GK6+igD5ouv2cPEqSkWmsaTLH2aUyRnH0CsP1rd8P/s4RxXCTeIdZE0anLW9khXd9XbnH0X8RXvVFAEcEEVtBHBBGkcMahERBhVUDAAHYVynxH8Df8LA8PW+k/wBo/YPJu1ufN8jzc4R1243L/fznPauvooA8w+HHwf8A+Ff+IbjVv7d+3+baNbeV9k8rGXRt2d7f3MYx3rsPG/hn/hMfCF9oP2v7H9q8v9/5fmbdsiv93Iznbjr3rfooA8g8E/Az/hDvF9jr/wDwkf2z7L5n7j7F5e7dGyfe8w4xuz07Vs/Ez4Vj4gz2l0mrvZT2sRjRGiEiHJznqCD789OlejUUAfMj/s5eKw/yapopX1MkoP5COuv8Kfs86dp15FeeIdQGomMhhaxR7IiR/eJOWHtx75r2zFFABXmvj/4N6T41u21O3uG03VWGHmRNyS46b1yOfcEe+a9KooA+ZG/Zx8WB8DVNFKepllB/Ly61tP8A2a7kuDqXiOFFHVba2Lk/8CYjH5V9C0UAFfANff1fIP8AwpP4h/8AQv8A/k7b/wDxygDqLv8AZv8AEaTlbTWNKlhzw0xkjbH0CsP1rvfAfwN0vwtfQ6pqt0NT1CIh4V8vbFE3rg5LEdicY9M4NesZzS0AAr4Br7+zjtXyD/wpT4g/9C//AOTtv/8AF0AdZqH7N2uxzkabrenTw54NyrxN+Shv510/g79n2w0u9jvvEd6motGQy2kSEQ5H98nlh7YA9c9K9r60UAJisTxT4S0jxhpLadrFt5sed0bocSRN/eVux/Q9xW5RQB82X37N2vpOw07WtMnhzw1wJIm/IK3866bwn+zzYafdR3fiO/GoFCGFrApWIkf3ieWHtgV7bRQADivIPG3wM/4THxffa9/wkf2P7V5f7j7D5m3bGqfe8wZztz0716/RQBz/AIJ8M/8ACHeELHQftn2z7L5n7/yvL3bpGf7uTjG7HXtXQUUUAcV8QPhnpPj+1ia5ke11CBSsN3EoJA/usv8AEuecZBz0Iyc+NP8As4+KRKRHqujtHnhmklDflsP86+mqKAPPvhd8Npfh5bagJtVF7JfGMuqRbEj2bumSc/ePPHatjxn8P9C8c2ax6pCy3EQIhuoTtkj9s9CPYg/nXU0UAfNV3+zd4ijmIsta0uaLPDTeZEfyCt/Ormm/s2agzqdT8QWsS91toWkJ/FiuPyr6JooAK5bxp4A0Px1ZJDqkLLPECILqEgSR+2ehHsf0PNdTRQB81Xn7N/iFJiLHWtLmizw03mRHH0Ct/OprL9m3WJGH27X7GBe5gieX9Dtr6PxRQBieEPDUHhDwtZaFbzyXEVqHxLIAGbc7Oc492P4Vt0UUAZ+u6Z/bXh7U9J87yft1pLbebt3bN6Fd2MjOM5xkV5BoX7PP9ieIdM1b/hKPO+w3cVz5X9n7d+xw23PmHGcYzg17fRQBn69pn9t+HtT0nzvJ+3Wktt5u3ds3oV3YyM4znGRXkGhfs8/2J4h0zVv+Eo877DdxXPlf2ft37HDbc+YcZxjODXt9FAGfrumf234d1PSfO8n7day23m7d2zehXdjIzjOcZFeQaF+zz/YniHTNV/4SjzvsN3Fc+V/Z+3fscNtz5hxnGM4Ne30UAZ+u6Z/bXh7U9K87yfttpLbebt3bN6Fd2MjOM5xkV5BoX7PP9ieIdM1X/hKPO+w3cVz5X9n7d+xw23PmHGcYzg17fRQBBe2dtqNlNZXkKTW06GOWNxkMp4INeAaz+zdeC4ZtE16B4SfljvUKso9Cy5z9cCvoaigD5li/Zx8Ulh52q6Oi+qSSsf1QV6b8NvhCngDWJ9VfWWvZ5rY25RYPLVQWVs53En7nt1r02igDI8SeIdP8LaHNq2qO6WkTKrFF3HLMFGB365+grnZfFHwz8RKJr3UvDl3kcfbvK3flJz+lL8U/BeoeOvC8Wl6dewW0kdws588Ha+FYBcjJHLZ6HpXgFx8DPH0EhWPSYbhRxviu4gD/AN9MD+lAG78Z/GPhnUNNsfDfhWO0NtDcfabiS0iCRbgpVVXAAbhmJPTp15xe/Zt0uR9c1rVtp8qK2W2DY6s7BsD6bP1FZGjfs++Lb6Zf7Tls9Mgz8xaTzXx7BeD+LCvpDw/oGn+GdFt9J0yARWsC4A6lm7sx7knnP8qANCWJJomilRXjcFWVhkMDwQR3FeF+I/2cree4efw7q/2ZGORbXalwv0cc4+oJ9693ooA+Zof2cPFDOPP1bR0T1jeVz+RQfzr2H4bfDmP4eWF5Aupy30l2yM5MYjRSoP3Rknv3PYV3FFABRRRQBxXxA+GekePraNrl2tdRgUrDdxqCQOu1h/EueccY5weTnxp/2cfFXm4j1XR2jzwzSSg4+mw/zr6aooA8++F/w3l+HltfibVBeyXvll1SLYibN3TJOc7uvHQVtL8RPBsiO3/CTaYuwkMr3Ko2R/snB/Sunr5JufgZ4+t5THFpcNyvaSK7jA/8eYH9KAOZ8ca3aeJfGmq6vY232e3upt0aYwTwBuI9WxuPuTX1D8IvCjeE/ANrDPGUvrsm6uQRyrMBtU/RQvHrmvPvAXwCntNSh1PxXLA6QsHSwhO8OR08xsYx7DOfXtXvlABXwDX39XyD/wAKT+If/Qv/APk7b/8AxygDqLv9m/xGk5W01jSpYc8NMZI2x9ArD9a73wH8DdL8LX0OqardDU9QiIeFfL2xRN64OSxHYnGPTODXrGc0tACYrlvGnw+0LxzZLFqkLLcRAiG6hOJI/bPcexzXVUUAfNV3+zf4iSU/YtZ0qaPs03mRn8grfzq5p37NmoPIp1TxDbRJnkW0LSE/i23H5GvonFFADXdY0Z3IVVGSSeAK+CrW1lvbuG1t1LzTyLHGo/iZiAB+Zr7j8R6Odf8ADt/pIu5LQXkJhaaNQWVTwRg+oyPoa8v+H/wSk8I+MxrF/qNvfQ28bfZQkZRhIeNzA5AwM45PJ9qAPZOlFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUVBeXkGn2Vxe3UgitreNpZZG6KijJP5A0AT0V53B8avBt5rVlpdjdXd5PeXEdvG0duyqGdgoJ37eMn/61eiUAFFFFABRRRQAUUUUAFFFFABTfrinV8a/Fa7v7n4ma6NQZy8VyYolY8LEPuAD0K4P4570AfZI/KlrzX4E3V/dfDK3N8zssc8kdsznJMQxjn0DbwPpXpVABSYA6ClooAKKKKACiiigAorJ8QeJdI8Laet/rV6tpbNII1cqzZYgnGFBJ4B7dqwfCvxP8O+Mtdm0nRmupZYrdrhpJIdibQyrgZOc5YdqAO0ooooAKKKKACkOQcUtfIfxvlkb4ta1GzsUQQBVJ4X9xGeB2oA+u+aM8cHmuB+CX/JIdC/7eP/SiSvIv2jpZB4+sIhI3l/2XG2zPGfNl5x60AfTYOR0xQTXkP7OX/JPL/wD7Csn/AKKirlP2kbq/GtaNalnGnfZmkQA4VpdxDfUhdv50AfRINLXzr+zddX51jWrQM5077OsjDPyrLuwuPQld312j0FfRVABRRRQAUUUUAFFFFABRRRQAUUV5f4z+Nmk+D/EV1oj6Xe3V3a7PMYMqRncgcYOSejDsO9AHqFFeBN+0wobC+EmK+p1HB/8ARVbWk/tE+G7yVY9T0++08k8yDEyL9cYb8lNAHsdITUVpd21/aRXVpPHPbyrujliYMrD1BHWvnv8AaRur8a1o1qWcad9maRADhWl3EN9SF2/nQB9Eg0Hivnb9m66vzrGtWgZzp32dZGGflWXdhcehK7vrtHoKvftMSyJH4ZjV2VH+1FlBwGx5OMigD3vmjP514D+zL/zNP/bp/wC1q6P9ouWSL4e2PluybtUjVtpxkeVLwfagD1sc8EH60tfMP7OP/JQtQ/7BUn/o2Kvp6gAooooAKKKKACiiigAooooAKKKKADFFUdY1iw0HS59T1S5W2soMeZKwJC5IUdOepA/GuR0T4u+FfEXia00LSpru4ubovsk8gpGNqMxzuweinse34AHeUYFFFAB0ooooAKKKKACiiigAowKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKwPHX/JPPE3/YKuv/RTVv1geOv+SeeJv+wVdf8AopqAPjXw1qMOj+KdI1S4V3gs72G4kWMZYqjhiBkjnA9a+iv+GjfB/wD0Ddc/78Rf/Ha+cdB0wa14h0zSvO8k3t3Fb+bt3bN7hd2MjOM5xkV7d/wzP/1N3/lN/wDttAHu17eQadYXF9dSCK2t4mmlcg/KijLHjngAmvI9U/aM8OWzsmnaXqF7g4DvthVvpyT+YFejeO/+SeeJf+wVdf8Aopq+MvDumx6z4m0nS5XaOO9vIbd3TqodwpIz35oA9zg/aWtmkxceF5Y09Y70OfyKCvUte8b2HhzwfbeJruyv5LKZYmMcKKZIxIMjcCwHUgHBPJrz+6/Zw8ONCRZ6xqsUuPvS+XIPyCr/ADr1PX9Gh17w3qGjzALHd27wg4+4SOCPocH8KAOM8L/Gnw14t8Q22i2VrqcFzc7vLe5ijVCVUsRkOTnAPavRq+DtL1GfSdXs9Stjie0mSePP95WyP5V9ueJtYTQPC2p6uSv+i2zypnozAfKPxOB+NAHm7/tFeEFdl+wa22CRuEEWD9P3ter2dyL2xt7oRSRCaNZBHKAGTIzhgCRkZ55NfDOg6TLruv2GlQZ8y7uEhBAzjcQCfoBk/hX3bQAV5T46+J/gbSvEU+heIvD9xqVxZFTuazhmQbkVxt3uD0YdhzXq1fIPxt/5K9rv/bv/AOiI6APqXwt4hsvFnhq01vT4porW53+Wk6hXG12Q5AJHVT3rlPF3xl8N+D9Yn0i6hv7m+gC+YkES7V3KGGWZh2YdM1L8Ev8AkkOhf9vH/pRJXgHxs/5K9rv/AGw/9ER0AeiTftLQKx8nwrI69i98F/lGa3fDv7QPhvVrtLfU7S50p3IAlkYSRA/7TDBH1xj1IrlPh58FvD/i3wNp2uX9/qcdxdeYGSCRFQbZGQdUJ6KO9eXeOvCU3grxXc6NNN56IFkhm27fMRuQcdu4+ooA+2a5nxh460LwRZpcavcsJJM+VbRDdLLj0HAA9yQKwfglrUus/DSy89zJLZSPaFjySFwVH4Kyj8K+cfiXeXF98SvEMtyxLpfSQrk9ERiqj/vkCgD1iT9paES4j8KyNH/ea/AP5CMj9a7fwL8XdH8c6qdMtrC+tbxYjKRIFZNowD8wOe47d64/4cfDv4a+JfCdjK4XUdTaFWuka8dJIpMfMNisuADwCRyO5r0Dwb8NND8D6ne3ukNdE3UaxlJ3DiMA5wpwDzx1z0oA5P8AaO/5J7p//YVj/wDRUteN/CbxrpvgTxTdapqkF3NBLZPbqtqiswYujZO5lGMIe/pXsn7R3/JPdP8A+wrH/wCipa8Q+HHgb/hYHiG40r+0fsHk2jXPm+R5ucOi7cbl/v5zntQB71pPx78LazrNjpdtYayk95cR28bSQxBQzsFBJEhOMnng16B4i1608MaBd6zfJM1taqGdYVDOcsBwMjufWvJNC/Z6/sTxDpmq/wDCUed9iu4rjyv7P279jhsZ8w4zjGcGvW/EekL4g8N6lpDuIxeW7wiQru2EjAbHfBwce1AHjt1+0rZo5Fr4ZnlXsZbsJ/JWrS0L9ofw9qFykGq6fdaZvOPNDiaNfqQAw/AGm2/7OPhlYR9o1fV5Hx1jaNB+RQ/zrxP4heDJfAvil9Jef7RE0SzwTbdpeMkgZHYgqR+FAH2kCCMg8H0r5B+Nv/JXtd/7d/8A0RHXuPwG1WXU/hlBFKxY2NzJaqScnaMOB+AfH0FeHfG3/kr2u/8Abv8A+iI6APf/AIJf8kh0L/t4/wDSiSvIP2jv+Sh2H/YKj/8ARstev/BL/kkOhf8Abx/6USV5B+0d/wAlDsP+wVH/AOjZaAO//Zx/5J5f/wDYVk/9FRV1HxF8c+HvB9tZW3iHTbi/g1DzAsUcEcqfJtzuDsB/GMda5f8AZx/5J5f/APYVk/8ARUVc/wDtM9PC/wD29/8AtGgD0j4deOfD3jG2vLbw9ptxYQaf5YaKSCOJBv3Y2hGI/hOenarnjT4gaL4DgtZNX+0s91v8mO3j3M2zbu6kAfeHUjrXlf7MvXxT/wBun/taj9pr/mV/+3v/ANo0AWbn9pWyR8Wvhm4lX1lu1jP5BW/nU+mftI6RPMq6noN3aITgvBMs2Pcghf0rz74Q/DnS/iAdY/tO6vIFsfJ2C1ZVLb9+c7lP9wfnTPit8L18ANZXVjdzXWnXTNGDMo3xuOcEjAORkjgdDQB9V2V7bajZw3lnPHcW0yB45Y23KwPcGpzjBzjGO9fPv7N2tS/atZ0N5CYTGt3En90g7XI+uU/KtD9onxRPZ2On+G7aQoLwG4utpwWjU4RfoW3H/gIoA1/EH7QPhnSrh7fTLa51Z16yR4jiJ9mPJ+u3HuawoP2lrdmH2jwtKi9yl6GP6oP515z8M/hpcfEG+uHe5NpptptE0yruZmPRVB4zjPPbj1ro/ix8J9F8C+GLXVNMvdQmllvFtmS6dGGCjtkbVHdBQB7J4K+Kfh/x1fS2OmR3sN3FCZmiuIgPkDAEggkdWFdxXzB+zj/yUO//AOwVJ/6Nir6foAK+Qfjb/wAle1z/ALd//REdfX1fIPxs/wCSv65/27/+iI6AOj+E/wAKND8d+FrrVdTu9QhlivXt1S1dFUqERsncrc5Y1ifFD4WSeADa3ltem8025cxqzqFeNwMhWxwcgEgjHQ5Hr2HwW+Inhbwl4NvLDXNU+y3UmoPMsf2eV8oY4wDlVI6qfyrA+MPxSsfG8NnpWjwzCxtpfOeaZdplfBAwOwAZuvJz0GOQCT9n3xBPYeOX0UyE2uowv+7zwJEG4N/3yGH417V8RfHPh7wfbWVt4h024v7fUPMCxRwRyp8m3O5XYD+MY614Z8AdHmvviPHqCo3kadbySO+OAzqUUfU7mP8AwE11f7TX/Mr/APb3/wC0aAPSPh1458PeMba8tvD2m3FhBp/lhopII4kG/djaEYj+E56dq83/AGmenhb/ALe//aNH7MvXxT/26f8Ataj9pr/mV/8At7/9o0AH7Mv/ADNP/bp/7WroP2jv+Se6f/2FY/8A0VLXP/sy/wDM0/8Abp/7WroP2jv+Se6f/wBhWP8A9FS0Aef/ALOP/JQtQ/7BUn/o2Kvp48CvmH9nH/koWof9gqT/ANGxV7v8RPEx8I+BtS1aMj7SqCO3/wCujHap/DO76CgDL8ZfFrw14Mna0uJZLzUVxutbUAlPTcScL9OvtXB2/wC0raNOFufDE0cOeXivA7Y/3SgH614l4X8O3vizxHaaNY48+4bBdukagZZj7AD+nevb9e/Z0sE0WWTQ9UvX1GNCyx3WwpKR/CMKNufU5oA9f8O+JtH8V6aL/Rr1LmDO1gMhoz6MDyDXP+Nvido3gK+trXVrHUpTcxmSOS1jRkODgglnBz07dxXyt4P8TXXhHxRZaxauw8lwJkU/62I/eQ/UfkcHtX0X8f8AQ/7T+Hv9oRpum0y4WUnHPlt8jD8yp/4DQB1ngjx5pXjzT7q80qK6iW3l8p47lVVskAg4VmGDkjr2NS+NPGmmeBdHi1PVEuJIpZhAqWyqzliCc4ZlGMKe/pXg37O2sfY/G95pbvhL+0O0eskZ3D/x0vVj9o3W/tXinTdGR8pY25lkAPR5D0P/AAFVP40Ae2eCPHmk+PLC5u9KiuoltpBE8dyqq2cZBG1mGPx7Gjxt480nwFp9tearFdTLcy+Ukdqis2cZJIZlGPx7ivCv2d9Z+xeN7vS3fCahanaPWSM7h/46Xo/aJ1j7Z44s9MR8pYWg3D+7JIdx/wDHQlAHs/gn4oaN49vrq10qx1KI20Qkkkuo0VeTgAFXY5PPbsea7ccivK/gFoX9l/DwX8iYm1Odpskc7F+RR+jH/gVeqUAcB8bf+SQa7/27/wDpRHXzT8O/EVn4S8dabrl/HPJbW3m70gALndE6DAJA6sO9fS3xt/5JBrv/AG7/APpRHXzD4I8NDxh4vsdBF39k+1eZ+/8AL8zbtjZ/u5Gc7cdR1oA9+/4aN8H/APQN1z/vxF/8dr1+vAP+GZ/+pu/8pv8A9truvjP4sm8K+BZBZSmO+1CQW0TqcMgIJdh+Axn1YGgCHxd8bPDPhe7ksYfN1S9jJWSO2I2RnuGc8Z9hn04rlrH9pPTpbhV1Dw3c28JPLwXKykfgVT+deP8AgHwVd+O/EaaZbSiCFEMtxcFc+Wg44HckkAD/AAr03xx8ArbSPDtzqnh6/vLiW1jMsttdbWLoBklSoHIGTgjnFAHvOkavp+u6bFqGl3cV1aS/ckjOR9D3B9jzV6vjv4UeLJvCvjqwYyEWV7IttdJngqxwGP8Aukhs9eo719iYxxQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFYHjrn4e+JR/wBQq6/9FNW/VbULOPUdNurGb/V3MLwv9GBB/nQB8VeBePiD4aJOANVtcn/tqtfbxr4JkiuLC7eKaOSC5gk2srAqyMD0x1BBr1F/2hfGbW3kiDSUfGPOW3Yt9eXK/pQB9C+O/wDknniX/sFXX/opq+QfAn/JQvDX/YVtf/Rq19Y+JL9dU+Eer6gn3brQppxj/agLf1r5O8Cf8lC8Nf8AYVtf/Rq0Afb1FFFAHyD8Y/C58NfEK9MabbTUP9MgwOBuJ3j8GDcehFbHiX4grq3wO0LQxNm+8829yuefLgAK5+oaPn1U17R8XvCX/CWeBbkQR77+xzdW3HLYHzJ+K549QtfIHtQB7R+zr4dN54nvtelTMVhF5URI/wCWsnBI+ihv++hX0rXKfDfwz/wiXgXTdNkQLclPOueOfNfkg/Thf+AiuroAK+Qfjb/yV7Xf+3f/ANER19fV8g/G0f8AF3tc/wC3f/0RHQB7/wDBL/kkOhf9vH/pRJXz/wDG3/kr2u/9u/8A6Ijr6A+CX/JIdC/7eP8A0fJXgHxsGfi9rn/bv/6IjoA9/wDgn/ySHQv+3j/0okrx/wDaNGPiHYf9gqP/ANGy17B8E/8AkkOhf9vH/o+SvH/2jv8AkoVh/wBgqP8A9Gy0Aegfs4/8k91D/sKyf+ioqb8Vfg3L4s1Btd0GWKLUmULcQSnak+BgMG7NgAc8HA6d3fs48fD2/wD+wrJ/6KirktS+PuvaT4t1a2jtbG+02G8kjgDgo4RWIHzA45x3FAHkGseH9X8PXP2fV9NubKU/dE0ZUN7qejD3Ga9O+C/xH1TT/E9l4d1C8ludMvG8iJZWLGBz93aT2JwMdOc9uZvE/wAf5/EPhu/0iLw5FbfbIWheWS6Mu1WGCQuxefQ544rk/hD4du9f+IulvDGxt7CZbueUDhAh3KCfUsAB+PpQB7J+0d/yT2w/7Csf/oqWvP8A9nIgfEO/BPXSpAP+/sVey/F3w5P4m+HV9a2kZkurcrdQxqMlinUD1O0tgdzivk/w/r2o+GNat9W0qfybuEnaduQQRggg9QR/nNAH3VmvHPjr8QL/AMN2lnoWj3D215eoZZriM4eOLOAFPYkg89Rj3rg4f2gPFl3qVks66da2onj8/wAiA5ZNw3DLs2MjPTmtz9o7w9dNeaX4ijjZrYQ/ZJmHSMhiy5+u5vyoA8z8GfDfxB47WeXSkgS3hbY9xcyFU3YztGASTjngdx61T8Z+DdT8DaxFpeqSW0k8kAnVrZyy7SzKOSAeqmr3gv4l+IPAkdxBpTW8ltO294LmMsm7GNwwQQcY79hVLxp401Hx1rMWqapFbRzxW626rbIyrtDM3QsTnLHvQB73+zj/AMk91D/sKyf+ioq8g+Nv/JXtd/7d/wD0RHXr/wCzjx8PdQ/7Csn/AKKirzb4/aJcWHxDfVGjb7NqUCMkmONyKEZfqAqn/gQoA9p+CR/4tFoY7/6R/wCj5K8g/aO/5KHYf9gqP/0bLVP4O+OfEWm+ItN8MWcsUmm3l0N8U0ZbyweXKEEEHAJ9M9q6L9pDQ7garpGupGWtmtzaO4HCMrFlB+u5sfQ0AdT+zkcfDzUP+wrJ/wCioq5/9pnp4W/7e/8A2jXmnw+8ceIvCmqLZ6JJE0d9Mkb286b0ZicA8EEHnsa9L/aYHHhfp/y9/wDtGgA/Zl6+Kf8At0/9rUftNf8AMr/9vf8A7Ro/Zm4/4Sj/ALdP/a1L+01z/wAIv/29/wDtGgBP2Zf+Zp/7dP8A2tXQftHD/i3unn/qKx/+ipa5/wDZm4/4Sn/t0/8Aa1dB+0dz8PbD/sKx/wDoqWgDgP2cf+Shah/2CpP/AEbFVn9pGzkTxhpF6QfLmsPJUnplJGJ/9GCq37OQ/wCLg6h0/wCQVJ/6Nir3rxv4NsfHHhyXSrxjE+RJBcKMtDIM4IHcc4I7g9utAHlH7O/inTLXStQ8PXVzFBdvdfaYRIwXzQyqpC56kbBx159jWp+0ZfWjeCdPshdQm7/tJJfIEg37BFIC23rjLDn3FeN6t8K/G2kXLxS+Hry4APElmnnqw9RsyfwIB9qzNV8GeI9C0dNU1bSbiys5JlhU3GEZnIY42k7uinnFAHf/ALOP/JQ7/wD7BUn/AKNir6fr5h/ZxB/4WFqBxwNKkB/7+xV9PUAFfIPxt/5K9rn/AG7/APoiOvr6vkH42/8AJXtc/wC3f/0RHQAzwV8J9d8eaNNqml3enQwRXBt2F1I6sWCqxICoRjDjv613ulfs2XBlVtZ1+NYwfmjs4Sxb6M2Mf98mul/Zy/5J5qH/AGFZP/RUVev0AZ2h6FpvhzSotN0m0S1tY+Qi9z3JPUk+prxH9pnp4X/7e/8A2jXv9eA/tMjI8L/9vf8A7RoAT9mXr4p/7dP/AGtR+01/zK//AG9/+0aP2ZuP+Eo/7dP/AGtWv+0ZolxfeGtL1aCNnTT53WbA+6sgUbj7ZRR/wIUAZH7Mpx/wlHv9k/8Aa1dB+0d/yT2w/wCwrH/6KlrwHwl4y1nwVqbX2jzqjyJsljkXcki9cMPr6YPvX0n8ctDuNZ+Gs7WsZkksbhLsooySqhlY/grE/QUAeVfs4/8AJQr/AP7BUn/o2KvRP2iI3k+HNsyAlY9SiZ/YeXIP5kV84+HvEOp+F9Yh1XSZ/JuosgHAIYHqpB6g19j3+j/8Jh4COm6sqRy6hZJ52xeI5SobKg/3XwQD6CgD58/Z5nhi+JEySEBptPlSPPdt6Nx/wFWr6lyP618JMmqeG9b2ss9jqdlKDg5V43HSu41343+MNe0aTTJXs7SKVCkslpEVkkUjkEljjPtigDzevvXULKHUtOurG4XdBcxNFIvqrAg/oa+Rfhb4DuvGnimBpYG/si1kEl5KR8rAc+WPUt0x2GTX2FQB8NeGNWk8OeLNM1TDA2d0kjr3Kg/Mv4jIrUmab4hfFBiu7/ibaiAvqkRbA/75T+VbPxs8Of2B8RryaNNttqQ+2R46bmJDj/voE/iK6f8AZz8PfavEOo6/KmY7KEQQkj/lo/Uj6KCP+B0AedQmfwD8S137t2k6lhvV0V+fwZf51n+JtWk8SeLNS1UBmN7dPJGvUhSflX8BgV6l+0X4f+x+JtP12JMR30JilI/56R4wT9VKj/gNc98EvDZ1/wCIlrcSR7rbTF+1yZHG4HCD67iD/wABNAH1bY2cOnadbWNsuyC2iWGNfRVGAPyFWKKKAOA+NnPwh13/ALYf+j46+f8A4J8fF3QiTgfvx/5Akr6h8a6G3iTwXq+jx4825t2EWTgeYPmXJ7DcBXxVp99daTqNvfWcjQ3dtIJI5B1VgcjigD7zzivBf2mInNt4alGfLV7lW+pEZH8jXJXf7QnjS4tzHFHpdq3TzYbdi3/j7MP0r3z4ieEV8beDrrSlKpdAia1kbosq9M+gIJU/71AHkv7NM8K3viSBiPOeO3dB32qZA36sv6V79eXENrY3FxOQIYo2eQnptAyf0r4c0rVdU8L63HfWEstnf2rkdMFT0KsD+IINdX4r+L/inxhpbabePa2tm/8ArY7SMp5uOQGLMTj2zQBwtvFJNdRRRZMjuFXHXJPFffNfLnwQ8BXOt+JYPEN5AV0vT38yNmHE0w+6F9Qp5PuAK+o6ACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigApCM0tFAGNrvhPQfE0aprOlW15tGFeRfnUezD5h+BrAtfg94BtJRJH4dhZgc/vZpJB+TMRXcUUAQNZWr2LWLW0LWjRmJoCgMZQjBUr0xjjHTFZUHgvwta3EVxb+GtGhnicPHJHYRKyMDkEELkEHnNblFABXN+PPE7eD/Bt9rccSTSwbBHE5IDszhccfUn8K6SsbxN4X0rxfpH9maxA8ttvEihJGQqwBAOQfQnrxQB4D4j/AGhtU1jRZ7DTdHj02WdDG9z9pMrKp67RtXBx35x9a4/4YeCpfGvjCCB4idNtSJr18cbAeE+rEY+mT2r26L9njwbHMJHudXlXOfLe4TafyQH9a9N0zSrDRtPisNNtIrW0iGEiiXAHv7n36mgC5RRRQAVjX3hLw5qd495f6BpV1dSY3zT2ccjtgYGWIJPAA/CtmigCvY2FnplnHZ2FrBaWsedkMEYjRcnJwowBkkn8azr7wl4c1O8e8v8AQNKurmTG+a4s45HbAAGWIyeAB+FbNFAFexsLPTLNLSwtYLW2jzshgjEaLk5OFAAGSSfxqnqXhrQtZuFuNU0TTb6dUCLJdWqSsFyTgFgTjJJx7mtSigClpukabo1u1vpen2ljAz+YYrWFYlLYA3YUAZwAM+wrI1f4f+E9dkaXUdAsZZWOWlWPY7fVlwT+ddJRQBwsHwb8AW8gdPDsZIOcSXEzj8mciu0tbS3srdLe1giggQYSKJAqqPYCpqKACuX1v4c+EfEVy9zqehWstw/LyoDE7H1LIQSfrXUUUAchpvwt8EaTMJrTw5Z+YpyDPumx9N5NdcQCCMDFLRQBxV78JPAeoStLP4ctlYnJ8h3hH5IwFJa/CLwFaOHj8OW7Ef8APWSSQfkzEV21FAFax0+z0y3FvYWlvawA5EUEYRc/QcdqfcWsF5bPb3UMc8Eg2vHKgZXHoQeoqaigDldK+G/hHQ9ai1jTNFitr6LdskSSTC7lKnC7tvQkdK6h0WRGR1DIwIZWGQQe1OooA5CL4XeC4NWt9Ug0GCG8t5VmieF3QK6nIO0MF4I9K39U0HSNb8r+1dKsb/yc+X9qt0l2ZxnG4HGcDOPQVoUUAZ2maDpGieb/AGVpVjYGbHmfZbdIt+M4ztAzjJ/M0anoOka35X9raVY3/k58v7VbpLszjONwOM4HT0FaNFAGfpehaRonm/2VpVjYedjzPstukW/GcZ2gZxk4z6mn6lpGm6zbLb6pp9pfQK4dY7mFZFDAEAgMCM4JGfertFAGXpvhrQtGuWuNL0XTrGdk2NJbWqRMVJBxlQDjIHHsK574qeLLrwb4Il1OwaNb1p4oYTIu5clstkd/lVq7WsnX/DOjeKLEWWtWEd5bhtyq5KlT0yCCCDye/egDw61/aWvEjAu/DEEsndorwxj8ijfzrzzx98SNV+IF3A15FFbWdtnybaIkgE9SSfvHgDPHH1Ofcrj9nnwZM+6OfVrcf3YrhCP/AB5Ca1NG+CPgfR5lmOny38iHKm9l8xfxUAKfxBoA5T9nfwvcWGl6j4huoigvtsNruGC0aklm+hOAP9017fRiigArGvvCXhzU7uS7v9A0u6upMb5p7OOR2wMDLMpJ4AHPpWzRQBT03SdO0a3a30uwtbGBnLtHawrEpYgDJCgDOABn2FXKKKACs/VNB0jW/K/tXSrG/wDJz5f2q3SXZnGcbgcZwM49BWhRQBnaZoOkaJ5v9laVY2Bmx5n2W3SLfjOM7QM4yfzNaGOOtLRQBxt98KPAuoXHnz+HLRXzn9yXhH5IQP0rsqKKAOS1X4Y+C9anae98PWjSucs8W6EsfUlCM11uKKKAM/VtC0rXrX7Nq2n217COQs8YbafUE9D7iuWt/g74BtZxNH4dhZwc4kmlkX/vlmI/Su5ooAYkSRIqRqqooCqoGAo9AKfRRQBn6noek60sa6rpllfLGSYxdW6yhCeuNwOM1Jp2lafpFsbbTbG2soCxYxW0KxLuPU4UAZ4H5VcooAp6jpOnaxbrb6nYWt7ArBxFcwrKoYd8MCM8nn3pmmaJpWipImlaZZ2KyEF1tYFiDEdM7QM1fooAKKKKAEIyc1ga94G8M+J5PN1jRra6lxjzSCkmPTepBx+NdBRQBxdj8JPAenyiSDw5bMw/57u8w/J2IrswABgcD0FLRQBj654V0LxJEses6Va3oThGlT51Hsw5H4GsKx+EfgPTpxNB4ctmYHOJ3kmX/vl2IrtaKAEAwMCloooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAgvbuDT7G4vbqURW9vG0ssjdEVQSSfYAVwUHxq8G3mtWWl2Fzd3c95cR28bR2zKu52Cgkvt4yfeuk8d/8k88Tf9gq6/8ARTV8g+BP+SheGv8AsK2v/o1aAPt6iiigArzTUPjv4Gss+TfXN6R2t7Zv5vtFemCvgCgD7+ooooAKKKKACiiigArF8VeJrDwj4fuNY1F8QxDCoD80rn7qL7n/AOv0Brar5B+L3jF/FvjW4WGUtp2nsba2AOVOD8zj/eI6+gFAH074T8aaJ4004XmkXQcqB5sD/LLCfRl/qMg9jWNrXxg8FaFeXFnc6q0l3byNHLBDbuxVlOCM425BHrVP4N+DV8K+CoZ54wNR1JVuJyRyqkfIn4A5+rGvmfx3/wAlD8S/9hW6/wDRrUAfaOk6lFrGj2OqW6usF5bx3EayABgrqGGcEgHB9T9au1z/AIE/5J54Z/7BVr/6KWugoAKKK+cfGHx28U6d4l1bSLC306CKzvJrdJTEzuQjlcnLY7elAH0dRWR4UvrnU/B2iahePvurqwgmmfaBudo1YnA4HJNa9ABRXzj4v+O3irTvEmraTYW2nQRWd5NbpKYmd2COVBOWx29K938KX1xqfg7Q7+7k8y5utPgmmfaBudo1LHA4HJPSgDXooooAKKKKACiiigAooooAKKKKACszxFrUHhzw7qGsXI3RWcDS7c43kDhc+pOB+NadeGftG+IvI0zTPDsT/PcSG6nAP8C8KD7Elv8AvmgBNL/aIuNW1az0228IZnupkhj/AOJj3YgD/ll717pXzL+zz4d+3+L7vW5UzFpsO2Mn/nrICB+Sh/zFfTVAGX4j1uDw54d1DWLgborOBpducbyB8q57ZOB+NeP6V+0Pcavq1np1r4R3T3UyQxj+0e7EAf8ALL3pf2jvEPkaVpfh6J8PcObqcA/wL8qg+xJY/wDAK5j9nfw99v8AF15rcqZi02HbGT/z1kyP/QQ/5igD6aooooAKhurqCxtJru6lSG3hQySSOcKigZJJ+lTVzvjvQJvFHgjVdGt5FjnuYh5TMcDerBgD7EqB+NAHN+HvjX4R8Ra1HpUMl3azzPsge7iVElbsAQxwT2zjnjrXo1fH/hb4VeLdW8R21tcaNe2NskqtPcXUTRqiA8lSR8x9AM5+nNfV3iLUpNH8MatqkSK8llZzXCo3RiiFsH8qANKivmjQvjd4x17xlodg8llbWt1qEEMsdvb/AHkaRVYZcsRwTyK+l6AIL27g0+xuL26lEVvbxtLLI3RFUEkn2AFcFB8avBt5rVlpdhc3d3PeXEdvG0dsyrudgoJL7eMn3rpPHf8AyTzxN/2Crr/0U1fIPgT/AJKF4a/7Ctr/AOjVoA+3qKKKACiiigAooooAgvbuDT7G4vbqURW9vG0ssjdEVQSSfYAVwUHxq8G3mtWWl2Fzd3c95cR28bR2zKu52Cgkvt4yfeuk8d/8k88Tf9gq6/8ARTV8g+BP+SheGv8AsK2v/o1aAPt6iiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKAIri4itLaW5ncRwxIZJHPRVAyT+VeDL+0uzMFXwgWJOABqPX/yFXV/HvxD/ZHgA6fG+LjVJRCBnkRr8zn/ANBX/gVeMfBXw9/b3xJsXkTdb6eDeSZHGV+5/wCPlT+BoA+uh0560UUUAFFFFABRRRQAUUUUAFFFFABXlXxS+L0Xg2Q6RpMcd1rJXdIZOY7cEcbgOrEc4/E+h9Vr4Iubqa8u5rq5kMk8zmSR26sxOST+NAHQ3PxG8aXdwZpPFGqq2c4iumjX/vlSB+ld74F+O+s6ffw2fieX7fpzsFNyVAmhHrx98DuDz6HtXo+l/Er4TaLpSaZp+owQWipsMa6fN8477v3fzE9yetfN3ixNFj8U6gPDtx52kNLutn2MuFIB24YBuCSvPpQB9x18g6l8Z/Heou3/ABOjaof+WdrCiY/4Fjd+tfSHwt1GTVfhloF1K26QWwiLE5J8slOf++a+L6AOjPj7xiX3HxVrWfa+kx+W7Fd/4H+O2t6dqMFr4lnGoaa7BXnZQJoR/eyMbgO4Iz6GvpWW0tprdraW2ikgZdpiaMFSPQg8V8M6/p40jxFqemhiwtLuWAE9Tscr/SgD7s7Zr51+Mnj7xf4f8b3Gk6fq8lpp5hjliSKNA3K8/NjP3g3evdPCt2994P0S8kOZLiwglYnuWjUmsLxd4p8DeGNQS719rE6oIwkYFuJbjZkkDgEqMk4zgcmgD5ZX4geMVk8weKdZJ972Qj8s4r2L4VfGjUNW1m38P+JnjlkuTstr1VCsX7I4HHPQEAc+uci1rPxo+HnibTptL1TSdTe3mQp5klrGdmR95TvJBHByBXzrbztbXUU6Eq8Th1I6gg5oA+2fHf8AyTzxL/2Crr/0U1fFOn31xpepWuoWjhLm1mSeJiAdrqQynB4PIFfa3jv/AJJ54l/7BV1/6KavjzwZBDdeOvD9vcRJLDLqVskkcihldTKoIIPUEdqALUnxD8Zyz+a3inV9+c4S7dV/75Bx+lerfDT44X1xqdvoviqWOWO4YRw6hgIyOeAJMcEHgbsDHfPb3W90nTtRsHsbywt57VlKmGSMFcfTHFfDerWD6VrF7p0hy9pcSQMcYyUYqT+lAH3iOpr4Br7x0S//ALU0HTtQIx9qto58em5Q39a+DqAPv6vKvin8XYvBkv8AZGkxxXOssoLmTmO3BHG4d2Pp6cntn1U18EXNzLe3ctzO5eaZ2kkc9WZjkn8yaAOhufiN40u5zNJ4o1ZWPaK5aNf++VIH6V3vgb476zp9/FaeJ5ft+nOwU3OwCaEdM/LjePUHn0PGK9G0r4l/CfRNKj0zT9SghtETYUXT5/m4xlv3fzE9yetfN/ixNFj8UaiPDs/naQZd1s21lwpAO3DAH5SSvPXH40AfcQ7dc0tcj8LtRk1X4Y6BdSsWcW3kkk5J8tjHz7/LXXUAZviDVBonhzU9UbH+iWsk4B7lVJA/EiviTQtLfWfEGnaWhIa8uY4AR23MBn8M19Z/GWVofhLrzKcEpEv4GZAf0NfO3wahWb4taCj4IDyv+KwuR+ooA+w6+IfHf/JQvEv/AGFbr/0a1fb1fEPjv/koXiX/ALCt1/6NagCQePfFqWltaw+I9TggtoliijguWiVUUAKMKR2Heur8K/G/xToV5GNTu31bTycSRXGDIB6q/XP1yP519E+ArS2T4eeHglvCol0y2Z8IPmJiUkn1zXyl8StFt/DvxE1rTLRBHbRzB4ox0RXUOFHsA2B9KAPtCKSOaNJYnDxuoZXU5DA8gj1r4l8df8lD8Tf9hW6/9GtX1N8H7uS9+FGgSyEllieLJ9EkdB+iivlnx1/yUPxN/wBhW6/9GtQBr2Pxe8daZp1rYWeu+XbWsSwwp9kgbaigBRkoScADrXv/AMFPFGs+LfB13f65efa7qPUHhV/KSPCCOMgYQAdWP51c8GeDfC114F8P3Fz4a0eaeXTbZ5JJLGJmdjEpJJK5JPrXX6bpOm6Pbtb6Xp9pYwM5do7WFYlLEAZIUAZwAM+woA+LfHf/ACULxL/2Fbr/ANGtWxYfF7x3pmnW1hZ675draxJDCn2SA7UUAKMlMnAA61j+Ov8AkoXiX/sK3X/o1q+ovBng3wrdeBfD9xceGdGmnl0y2eSWSwiZnYxKSSSuSSec0AU/gr4o1nxb4NvL/W7z7Xcx6g8Kv5aR4QRxkDCgDqxPTPNeReOPi740g8WazplpqotLW0vZreNYYEDbUdlGWIJzgetfTGm6Tp2j2zW2mafa2MDOXMdtCsaljjJwoAzwOfavi7x3/wAlD8S/9hW6/wDRrUASP4/8Yu+4+KtZz14vZAPyBxXaeE/jx4k0e5jj1xxq1gWAfeoWZB6qwxuPs2c+or6C8CwxH4deHFMSFW0q2LAqMHMS5zXzp8bfBdn4T8V28+mQrBYajG0iwr92N1OHCjsOVOO2T0GKAPqi1u4L20iu7WVJoJkDxyIcq6kZBB9MV458WPjHdeG9Rk8P+HfLF/GB9ou3UOISRkKgPBbGCSQQM4+j/wBnLWJbvwpqmlyMWWxuVePJ+6sgJx9Nysf+BGvFfiZYT6d8SvEMVwrK0l9JOpPdXJdSPwagCvJ8QfGUkpkbxTrAbOcLeSKPyBxXr3wP8a+LfE3ia6sdU1V7zT7e1MrCWNS27coUb8Z7k8ntVbwF8eNO0jQrDRdd0yaNLOFYEubXDBlUYBZDjBx1IJz6V7jouuaR4hs/t+j30F5C2FMkTZI9mHUHnoaAPM/jN8T9T8G3Vno2iCOO9uIftElxKgby0LFVCg8Ekq2cg4wOOeD4M/E/U/GdzeaRrYjkvbeH7RHcRoE8xNwVgwHGQWXpjg9OOen+IXwz0z4gwW7XE8lnfWwKxXMahvlPVWXjIzyORgnryRR8Pfhnpnw/gneCeS8vrgBZbmRQvyjnaqjO0Z56nPHPAoA7ivin4ieIf+Eo8eatqavugaYxQY6eWnyrj6gZ/Gvrnxnr6eGPB2qawWAe3gYxA95D8qD8WIr4w8P6PNr/AIh0/SYMiS7nSLI/hBPLfgMn8KAPrX4SeHv+Ec+HGlwOm24ul+1zf70mCAfcLtH4V29ArC8Z68vhjwdqusFgHt4GMWe8h+VB/wB9EUAfI3xD8Q/8JR471bU1fdA0xjg548tPlXH1Az+NfT3wk8Pf8I58ONMgdAtxdL9sn7EtJyM+4XaPwr5M8P6PN4g8Q6fpEGfMu50i3AZ2gnlvwGT+FfXXxV1KXSfhhr11AxWTyBCGHBHmMsZx7/NQB5H47+PmoT3s1j4S2W1ohK/bpEDSSkcZUHIVfTIJ6HjpXmTfEDxk0nmHxVrIY9heyAflnFL4B8Px+KfHOk6NOxWC4lJlwcEoqlmAPuFIr7QgsbS2t1toLWGK3AwIo4wqgemBxQB8k6b8ZvHenOv/ABO2uUHVLmJHB/HG79a+p/Fl7cab4O1y+s5PKurXT55oXwDtdY2KnB4OCB14r4aNfb3jv/knniX/ALBV1/6KagD538KfF3x1qfjLQ7C713zLa61CCGZPskA3I0ihhkJkcHHFfQ/jr/knnib/ALBV1/6KavkHwJ/yULw1/wBhW1/9GrX1/wCO/wDknniX/sFXX/opqAPimwvbjTtQtb+0k8q5tpVmhkwDtdSCpweDyO/Fdv8A8Ls+If8A0MP/AJJW/wD8brnPBcMV1458PW9xEk0MmpWyPHIoZXUyqCpB4IIPSvsH/hBfCH/QqaH/AOC6L/4mgBfHf/JPPEv/AGCrr/0U1fE9leT6ffW97aymK5t5VlikHVXU5B/AgV9seO/+SeeJf+wVdf8Aopq+PfBEaTePvDkciK8b6pbKysMhgZVyCO9AFhPiF4yWbzf+Ep1jdnODeSEflnFe2fCj4yXfiHU4vD/iPy2vJQRbXaAJ5jAZ2uBwGIzgjGcYxzXqXibw3p/iTw9d6Xd2kUiyRMsZKDMbkcMp7EHFfEthdvY6ja3cRxJbzLKpHYqQR/KgD7d8WXtxpng3XL+zk8q5trCeaF9oO11jYqcHIOCB1r5x8J/F7x1qXjLQ7C71zzLW51CCGaP7JANyNIoYZCZ6E9K+h/Hf/JPfEv8A2Crr/wBFNXyB4E/5KH4a/wCwra/+jVoA+3elfIX/AAur4hH/AJmH/wAk7f8A+Ir6/r4AoA+3/Hf/ACTzxL/2Crr/ANFNXxTp99caXqVrqFo4S5tZkniYgHa6kMpweDyBX2t47/5J54l/7BV1/wCimr488GQQ3Xjrw/b3ESSwy6lbJJHIoZXUyqCCD1BHagC1J8Q/Gcs/mt4p1ffnOEu3Vf8AvkHH6V6t8NPjhfXGp2+i+KpY5Y7hhHDqGAjI54AkxwQeBuwMd89vdb3SdO1GwexvLC3ntWUqYZIwVx9McV8N6tYPpWsXunSHL2lxJAxxjJRipP6UAfeA6mlqjot//amg6dqBGPtVtHPj03KG/rV6gDhfiR8SrDwBp8YMYutVuFJt7UNjj++57L+pPA7kfNWpfFDxtqk5lm8S6hFnottKYFH4JisrxZrcviLxXqmrTOXNzcMyZ7IDhB+CgCvq/wCHngPTPB/hyzRbKJtTeJXurlkBdnIyQCeijOABjpnqSaAPFPhZ4+8a6n460vRn1ye6tJ5SZ0ugJT5aqWbDEbgcA9+pr6E8WeKdO8HaDNq+pyERIdqRpgtK56KoPfg/gCa0E0uwTUBfrY2wvApQXAiUSbTjI3YzjgflXzJ+0DrMt98Qhppc+Rp1uiKnYM4DsfqQVH4CgDE174v+NNcuXkGsS6fCT8sFiTEqD03D5j+JpuhfF7xrodykn9szX0QPzQ3zecGH1PzD8DXrXwC8G6fF4Y/4Sa5tY5r66mdYHkUN5Uanb8uehLA8+mKT4+eDNPl8Mf8ACS2trFDe2kqLO8ahfNjc7fmx1IYrg+maAPT/AAl4q07xj4fh1fTXJjf5ZI3xuicdVbHf+Ywa4L42+O9e8Fw6MmhzxQNe+f5sjxByNnl4xnIH3z29K8x/Z/1iWx+In9nBz5Oo20iMnYsg3g/UAMPxrqP2menhb/t7/wDaNAHlV18SfGt25aTxRqin/plcNH+i4rQ0P4u+NNDuUlGtXF9GD88N85mVx6ZPzD8CK9D/AGaEVm8TsUBZfsuDjkf67/Csn9ojw9ZaV4g0rU7O3jgbUIpFmEagBnjK/MfchwPwFAHOeIfjR4z12d/K1I6ZbE/LDZfIQP8Af+8T+OPYVnaT8VPG2k3Cyx+Iry4APMd3IZlYenzZI/DBr0z9myK2nTX2ktoGngeApMYwXUMHyA3UD5elY/7RHh6y0rxDpep2dvHA2oQyLMI1ADPGV+bA7kOPyoA958HeKbPxj4ZtdZsgUWUFZYicmKQfeUn+vcEHvW9Xg/7NFyzWHiO1LHZHLbyAdgWDg/8AoI/Kvb9QvoNL026v7ptsFtC00jeiqMn+VAHyl8bvEP8AbnxIu4I33W+mqLNMH+Icv+O4kf8AARXr/wAAfD39leBG1OVMT6pKZMnr5SZVB+e4/Q18vRpNeXaRoGlnmcKB1Z2J/mSa+8rW1hsrOC0t0CQwRrHGo/hVRgD8hQBNRRRQAUUUUAFFFFABRRRQAUUUUAFfAZBRirKQwPIPBBr78rwz4r/Bi61jUZ/EPhmNGuZjvurIsF3t3dCeMnuDjnnvQBa0/wCAngPV7CG+sNa1i4tplDJJHcQkEf8Afrj6VO/7O3g2JGeTVNaVFGSzXEIA/wDIVfNt3p19p8pivbK4tpAcFJomQj8CKuab4Z13WHCabo9/dFjjMUDMPxOMD8aAPtHwx4cs/Cfh200SweZ7W1DhGmILncxY5IAHVj2FfDFff1fEP/CCeL/+hV1z/wAF8v8A8TQB9v18QeO/+Sh+Jf8AsK3X/o1q+3sivj3xp4L8U3XjrxDc2/hrWJYJdTuXjkjsZWV1MrEEELggjkGgD6j8C/8AJPPDX/YKtf8A0UtfEs00lxNJPM7ySyMWd3bJZjyST6k19u+DIJrXwL4et7iKSGeLTbZJI5FKsjCJQQQeQQeK+X/G/wAJfEPhXUrh7WwuNQ0osTDcwIZCqdhIBypA74wexoA91i+BngGK2ET6VNNIBjznu5dxPrgMFz+FfJFSGNw+wo27ptxzWvp/g/xJqxH2DQdRuFP8SWzlR9WxgUAfYnjv/knniX/sFXX/AKKavkDwJ/yULw1/2FbX/wBGrX2L4vtJ9Q8Fa7ZWsRlubjT7iKKMdXdo2AH4kivi++8M67pb4v8ARtQtiP8AntbOv8xQB9yXFzBZ20lzczJDBEpeSSRsKoHUk9q+FNY1B9W1q/1KRdr3dzJOwHYuxbH61Bb2lzdTCO2t5ZpM4CxoWbP0Fe3fDL4Jag+pQaz4rg+z20LCSKxfBeVgcgyD+Ff9k8nvjuAe8eH7BtK8N6Xpz/etLSKA/VEC/wBK+EsV9+9K+O/GXwt8R+E9RnAsLi800OTDeQRl1Kdt+PunHUH9aAPsTcCMgg18ClWQlWUhhwQR0NfSH7OGn+T4X1m/ZSGnvFh9OI0B/wDah/Kq/wAWPg1c6zqM/iHwyiPdTfPdWZIXzGxy6E8ZPcHqee9AFnTvgL4C1ewhvtP1vWLm1mXdHLHcQkEf9+vzHbvViT9nfwZDG0kuq60iKMszXEIAHufLr5uvNPvdOm8q9s57aQcFJomRh+BxVvTvDGu6u6rp+j39yW7x27EficYH1oA+0fC/h2z8J+HbTRLB53trUNsadgXO5yxyQAOrHtWvRRQByPxSsW1H4YeIYFBJFqZcD/YIf/2Wvl34XXy6d8TvD87HAN2sOT28wFP/AGavs6SNJYnjkUMjgqynoQe1fB17ZXWkapcWdwpiurSZo3HdXU4P6igD7zr4h8d/8lC8S/8AYVuv/RrV9p6ZqNvq+l2mo2j77e6iWaNv9lgCP518keM/Bfiq68deIbi38M6zNBLqdy8ckdhKyuplYgghcEEc5oA+o/An/JPPDX/YKtf/AEUtfMHxt/5K9rv/AG7/APoiOvqLwZBNa+BfD1tcRSQzxabbJJHIpVkYRqCCDyCCMYr51+L/AIT8R6n8UtZvLDw/qt1ayeTsmgs5HRsQxg4IGDyCPwoA9n+CX/JINC/7eP8A0okr5j8fxPH8RfEqspBOp3Dc+hkYj+Yr6k+ENheaZ8LNGs7+0ntbqPz98NxGUdczyEZU4IyCD+Ned/Gn4V6nqmrv4n0C2a6aVALy2j5k3KMB1H8XAAIHOeecnAB6n8OL6C/+G3h2W3kV0SwhhYg9GRQjD8CprqK+B5IJo5fKkhkSQcbGUg/livo79nix1fTtJ1mHUNOurW2lkilt3niKCQ4YNjP0XmgDw3x9E0XxE8SKwwTqly34GRiP0NfWfw3voL/4b+HZYJFdY7CGFiD0eNQjD81NeXfGn4WanqmrN4n0C2a6eVALy2j/ANZuUYDqP4uAAQOcjPOTjwF4JopfKkhkSQHGxlIP5UAfe+RjPaviLx3/AMlD8S/9hW6/9GtXun7PFjq+naRrMWo6ddWtrLJFLbvPEUEhIYNjPXoteF+O/wDkofiX/sK3X/o1qAPr7wIQfh54aGf+YVa/+ilrwj9orXrXUPE2maTbypI+nQyGYqc7HkK/KfcBAfxrye70jUrCGCe70+6gimRZYpJYWVZFYZDKSMEEEVr+GfAfiTxZdxw6ZpkxiJ+a5lUpEg9Sx4/AZNAHs/7NlhJFoWu6iy4Se4jhU46+WpJ/9GCvUfFPg7QvGNitrrVkswQny5VO2SIn+6w6fTkHjir2gaJZeG9BtNIsEK21qmxc9WPUsfcnJPua+SPGGl+LLDxhqur3WmanYPcXcsyzLG4ADMSMOvHTHQ0AdT44+BOpeG9MutW0q/TULG2RpZY5F2SxoOSfRgByTwfauS+Fuq3Ok/ErQpbd2X7RdJayAHhkkIQg/mD9QKy59f8AE+twGxuNW1i/jf8A5YSXEsob/gJJr174PfCXVbLXYPEniG1azS2y9rayD9474wGYfwgZyAeScenIB7frviPR/DNiLzWtQhs4CdqtITlj6KByx+go0LxHo/iaxN7o2oRXkAO1mjyCp9GU4IPsRXh37RPhzVbjVtO123t5Z9PjtPs8pjUsIWDs2Wx0BDdeny0v7Ovh3VbfVdQ12e3lh0+S1+zxNIpAmYurZX1ACkZ6fN9aAJP2kPEPOk+HIn9bycfmqf8As/6VR/Zz8O/aNb1LxBMmUtIxbwEj+N+WI9wox/wOvLfGevN4n8Y6rrDElbmdjHntGPlQf98gV9a/Dbw7/wAIv8P9J05023Bi864BHPmP8zA/TO3/AIDQB1deAftH+Iv+QT4cif1vJwPxVP8A2f8ASvf6+H/GWvN4m8Y6rrDElbmcmLPaMfKg/BQKAPUf2cvD32nXNS8Qyx/u7SIW8BI/5aPyxHuFGP8Agde2ePdEfxF4E1nSoRmae3JiHq64ZR+agVX+G3h3/hGPAGk6c6bLgxCa4BHPmP8AMQfpnH4V1ZoA+FfD+tXXhvX7HWbPHn2kokUHow7qfYgkH619Az/tIeH1st1vompyXWP9XIY0jz/vgk/+O1veMPgp4a8VXst/E02mX0pLSSW4GyRj1LIe/uMZOc5rjx+zvpGlQzX2seJ7iSyt0aWTyrZYSFUZOWLN2HpQB8+n2r7e8d/8k88S/wDYKuv/AEU1fE1vC1zdQwIpZ5HVFUdyTivtzxnBNdeBfENvbwyTTzabcxxxRqWZ2MTAAAckk9qAPj3wJ/yULw1/2FbX/wBGrX2F42jabwF4iiQZd9LuVUDuTE1fLPgzwX4ptfHXh64uPDesQwRalbPJJJYyqqKJFJJJXAAAzX2AwDqQwBGMEHvQB8OeE7yHTvGOh31ywSC21CCaRj0CrIpJ/IGvuXvXxr4x+GXiLwffypNYzXVhuPlXkEZdGXtux90+x98ZGDXKW1ld3switbWaeVjgJFGWJ/ACgD7V8d/8k88S/wDYKuv/AEU1fIPgT/koXhr/ALCtr/6NWvq7UI7+8+Dt1BNaz/2nNoLxvb7CZDMbcgrtHJO7tXzb4M8F+KrXx14euLjw1rMMEWp2zySSWEqqiiVSSSVwABzmgD7Cr4Br7+zjmviH/hBPF/8A0Kut/wDgvl/+JoA+xfGMDXXgjX7dAS8um3CKB3JjYV8X+Gr9NJ8U6RqM3+qtL2Gd/ojhj/KvuknJxXyL46+EniDwpqM72djPf6SWJhuIELlF9HA5BHr0P6AA+usjFfANSCORn2+W5fONuOa3NN8D+KdXYCx8P6jKp/j+zsqf99EAfrQB9f8Ajv8A5J54l/7BV1/6KavkDwJ/yULw1/2FbX/0atfYvi+0n1DwVrtlaxGW5uNPuIoox1d2jYAfiSK+L77wzrulvi/0bULYj/ntbOv8xQB9yXFzBZ20lzczJDBEpeSSRsKoHUk9q+FNY1B9W1q/1KRdr3dzJOwHYuxbH61Bb2lzdTCO2t5ZpM4CxoWbP0Fe3fDL4Jag+pQaz4rg+z20LCSKxfBeVgcgyD+Ff9k8nvjuAe12k9j4O8F6eurXkNpb2FnDBJLKwABVAuPc8dB1p3h3xj4e8WRSPoeqQ3flY8xQCrrnplWAIHvivNv2g/DmqavoelX+nwS3EVhJL9ojiUsQHC4fA7Dafpn61wHwH8OardePbfWo7aVNOs45fMnYEI5ZCgQHucnPHTH0oA811vT30nXtQ06RSHtbmSEg/wCyxH9K+0fB/iWz8V+GLLVbWZHMkaiZQeY5ABuU+hB/TB6GuB+LfwkfxfINb0QxprCIElic7VuVHTnoGA454IwOMV816ho+p6TIYtS066tJF42zwsh/UUAfd2QOpFfKXx90yWy+Js92yny7+2imRscHavlkf+OfqK5LwnpWuTeIdOvNK0m9u3tbmKYeRAzAbWDZJAwOnevq/wCIHgaz8eeHjp1w4huYm8y1uNuTE+MdO6noR9D1AoA5H9n/AMQ2t/4EGi+aovNOlfMWeTG7Fw30yzD8PpR8f/ENrY+BDovmqbzUZkAiz8wRGDlsemVUfjXzvrvhLX/DV09vq2lXVuVON5QmNvdWHB/Om6J4T17xJdJBpGlXVyWON6xkIvuzn5QPqaAO1+Ammy3nxPtrpVOyxt5pmbsMqYx/6H+ldh+0z08Lf9vf/tGvUvh74Gs/Afh0WELia7mPmXVxjHmP2x6KBwPxPevPf2htB1jWx4c/snSr6/8AJ+0+Z9lt3l2Z8rGdoOM4OPpQBn/sy9fFP/bp/wC1qP2mv+ZX/wC3v/2jWh+zzoWr6J/wkf8Aa2lX1h532byvtVu0W/Hm5xuAzjI/Oj9obQtX1v8A4Rz+ydKvr/yftPm/Zbd5dmfKxnaDjOD+VAGf+zL/AMzT/wBun/taj9prr4X/AO3v/wBo1ofs86FrGif8JH/a2lX1h532Xy/tVu8W/Hm5xuAzjIz9RR+0NoWr63/wjn9laVfX/lfafM+y27y7M+VjO0HGcH8jQBn/ALM3TxTn/p0/9rVv/tCeIv7O8G2+ixPibU5vnH/TKPDH/wAe2frVD9nnQtX0T/hI/wC1tKvrDzvs3lfard4t+3zc43AZxkfnXlfxg8Q/8JD8SNSkR91vZkWcP0ThvzcsfxoA1fgT4e/tn4hRXsibrfS4zcHPI3n5UH1ySw/3a+rq81+Bvh3+xPh1b3UibbjU3N0+Rzs+6g+m0Bv+BGvSh70AFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAJj3oxS0UAFIBjvS0UAJijbS0UAJilxmiigBMe9GKWigBMUtFFAARmkAxS0UAFJilooATFLiiigAoxRRQAmKWiigArwv4+fD97yAeLtNiLTQIEv0UctGPuyf8B6H2x6GvdKKAPGv2fIvEdr4euotQs3i0SRhNYyynaxY/e2r1KHg54Gc4zk49lpMUtACY560Y9TmlooAQDFKeaKKACkxzmlooATHuaWiigBMV8R+Ov+SheJT/ANRW6/8ARrV9u0mKAMDwL/yT3w1z/wAwq1/9FLW/ijApaAExS4oooAKTFLRQAm0GuX+IniD/AIRbwHqupq+24WExW5HXzH+VSPoTn8DXU0mKAPh3wjoL+JvFml6MgbF1OquR1EY5cj6KGP4V9x0YooA5f4ieIf8AhF/Aeramj7Z1hMcB7+Y/yqfwJz+FfInhDQX8TeLtL0dASt1OqyEdVjHLn8FBNfcZGaTHOaAFpsjiONnIOFBJwMninUUAfCFnqmqaPKwsr68sZAfm8mVojn3wRT9R17V9YCjU9Vvr4KcqLm4eTB/4ETX3XiloA+cPgz8LNQm1q28S65aPbWdqfMtYZ1w80nZtp5CjqCepxjIr6P8A0oxRQAm3ilHFJmlFACY5paKKACiiigApMdaWigBMUEZpaKADHvSYpaKAExS0UUABGaQDFLRQAUgUClooATHHWloooATFLRSZwcUAGKXHvRRQAUhGaWigBMe9GPelooATFGKWigDP1vVYdC0K+1W4P7mzgeZh0ztBOB7npXwzZWc+o6hb2Vsu+e4lWKNfVmIAH5mvvbqMUmM0AJHGkUaxRqERAFVQMAAdAKdRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFVrvULKwXfeXlvbL6zSqg/WsyPxl4WllEUfiXR3lPARb6Ik/huoA3KKQHP0o780ALRSUtABSHijPHXtXkf7RMskfw8svLkZd+qRq20kZHlS8H24oA9c5yRS18wfs5f8lCv/APsFSf8Ao2Kvp7nk0AcP8VfGt/4D8LW+p6fbW9xPNeLbbbgMVAKO2cAgn7g7964n4P8AxM8S+NvG15ZavcQG0j095lhhhCAOJIwDnlujHv3rQ/aO/wCSe6f/ANhWP/0VLXnX7Pl3bWPjvUZru4hghGlSZklcIo/exdzQB9SUVkWfinw9qMvlWOvaXcyE4CQXcbnP0DVr0AFFFQ3V1b2cJnuriKCFfvSSuFUfUnigCaismx8TaBqc/kWGuabdzf8APOC7SRvyBJrWoAKKSqF5rukacxW+1WxtiOonuUTH5mgDQorGt/Fvhu8lEVr4i0meQnASO9jYk+mA1bIoAKKKKACiioLm8trOLzbm5hgj/vSuFH5mgCeisL/hNPCu/Z/wk+jb/wC79viz/wChVto6yIro6srDIKnINADq+XfEvx58Vz+IJ20W4hstNjlKxR+QkhkUHq5YE5PoMYz+NfUR6V414j/Z80nWNem1Gw1aXTop5DJLbiASKGJydh3DaD6c4+nFAHpfhLxBH4p8KadrccXlC7i3NHnOxgSGGe+CDXhnjD47eKdO8SatpFhbabBFZXk1skpiZ3IRyuTlsdvSvoLSdMtNG0m102wiEVpbRiOJAc4A9+59TXxZ47/5KF4l/wCwrdf+jWoA+x/Cl9can4O0PULuTzLm60+CaZ9oG52jVmOBwOSeleP/ABK+M/iLwv4z1DQNLtNPWK2EeJpo2dzujV/7wHVsdK9Y8C/8k98Nf9gq1/8ARS18wfGz/kr2uf8Abv8A+k8dAH0h8MNc1DxJ8O9L1fVZhNe3HneZIECg7ZnUcAAdABXXVwHwS/5JDoX/AG8f+j5K7+gAoqlf6xpmlKG1HUrSzU9DcTrGD/30aTT9Y0zVkL6bqVneqOrW06yAfkTQBeopOaOvQ9aAFooHSk/GgBaKKTPPFAC1Fc3EVpaTXNw4jhhQySOeiqBkk/gKk9a8r+PniL+yPAX9mxPi41SURYzz5a/Mx/PaP+BUAfPB8deMZpePFGtlnPAW/lHJ7ABv0r7UgjSw0+GJ7hmSGJUMs75ZsDGWY9T7mvk74KeHf7e+JFlJIm6304G8kyOMqcIP++yp/A161+0d/wAk8sP+wrH/AOipaAPRZfGHhm3OJ/EekRH0e9jH82qWz8TaDqDhLLW9NuWPRYbtHP6GvibRNG1DxDq0Gl6Vbm4vZ9wjiDqu7apY8sQBgAnr2ra134c+LfDdm13quiXEFsv3pUZZVX/eKEgfjigD7T5xWL4v8Qp4U8J6jrckXm/ZItyx5wGYkKoJ9CxAr5T+HfxF1PwRrMGJ5JdIkcC5tCSV2k8so7MOvHXGK+utV0uz1rSrrTL+LzbS5jMciZ6g+nofQ9qAPmzwz8ePFUPiG3Ot3EN7p00oSWPyEQxqTyVKgHI9Dn+tfRviHU5NG8M6rqsUaySWVnNcKjHhiiFgD+VeXeHP2ftI0XXodSvtWl1GKCQSw23kCNSQcrvO47hnnAxn6cV6J46/5J54m/7BV1/6KagDwjQvjf4x17xlolhJJZW1rdahBDLHb2/3kaRQwyxYjgnkV9L18Q+Bf+SheGv+wra/+jVr7fNAHypqH7QPja7yLc6fYjsYbfcR/wB9lv5V9VV8A19/UAFFIT3rHufFnhuynNvdeIdKgmHBjlvY1YfgWzQBs0VHFNHcRLLDIkkbchkYEH6EU8nFAC0U3nI9KXPFAC0Un60UALXzP45+NHiuHxe1pZw/2TDplyQbVgGaYqefMPdSOw4wep4NfTFeEftF+FlksrDxRbx/vImFpckDqpyUY/Q5H/AhQB7TpGq2muaRa6pYSiW1uYxJG49D2PoR0I9avV86fs6+KWt9VvvDM7/urlftNuCeBIvDAfVcH/gFfRdABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFHaijtQB8BV2178JPHen2jXM/h2cxKMt5Uscrf98oxP6VxFff1AHxP4M8b6v4J1dLzTp2MJYfaLVmPlzL6Edj6MOR9Mg/U3xG0ePxb8NdTgtiJme3FzasvO5lw64/3gMf8Cr5m+LGmwaV8UNetbZQsXnrMFHQGRFkOPbLGvpP4O3Ml18J9BklJLCKSMZ9EldR+gFAHy14H1z/AIRvxtpGrFtscFwvmn/pm3yv/wCOlq+2Lq5isrOe6nbbDBG0kjeiqMk/kK+IvGPh+Twt4u1LRpAdttMRGT/FGeUP4qQa968e+PF1D4BWmoJKPtWsJHavtPRx/rePT5GH4j1oA+bIo5J50ijUtJIwVVHUk9BX0z+0PDHb/DXS4IlCRx6nEiKOgAhlAFeV/A/w+db+JFpPIm6301Gu3JHG4cJ+O4g/8BNer/tHf8k8sP8AsKx/+ipaAPm3TNJ1HWLhrfS9Pur6dULtFawtKwXIGSFB4yRz7iuv8GeDfFNr468Pz3HhrWIYYtSt5JJJLCVVRRIpJJK8ACuj/Zx/5KHf/wDYKk/9GxV9P0AeQftHf8k90/8A7Csf/oqWvnXQfD2reJ9QNjo1lJeXIjMhRCBhcgZJPA5YfnX0V+0d/wAk90//ALCsf/oqWvP/ANnH/koWof8AYKk/9GxUAefeI/BniHwnJGNc0uWzEpwjlldGPoGUkZ9s17J+z742urmW48KX0zSxxxedZs5yUAIDR/TkEemDXcfHGFJfhLq7sMmJ4HXPY+ci/wAmNeDfBFivxc0QDownB/78SH+lAH0/4y8UW3g/wte61cjf5C4jizgySHhV/E9fQAntXxlPPq/ijXDJK1zqOp3cmB1d3Y9gB29hwK9z/aXuZEsfDlqCfLklnkYdsqIwP/QzWd+zXYwyar4gvmUGaCGGJD3AcuT/AOgLQB5h4h8A+KfC1ql1rGjzW1u5AEoZZEBPQFlJA/GvT/gb8SrtNUi8J6xcPNbTgixllbLRuBny8nqpAOPQ8Drx79qdlDqWl3dhcKGguIWikUjgqwIP86+FLG5ks7+3uoSRLDKsiEdiCCP1FAH1v8bf+SQ67/27/wDo+OvlDRtHv/EGqw6Zplsbm9n3eXEGALYUseTgdATX1f8AG3/kkOu/9u//AKPjrwD4Jf8AJXtD/wC3j/0RJQBi+IfAHinwrbLda1o01tbsQvmh0kQE9AWQkA/Wu++A3ja70/xKnhi6nZ9Ovt3kKx4hlAJ+X0DYII9ce9e7/ECFJ/h14kRwCBptw4z6rGWH6gV8jeAnKfETw0VOD/alsPwMqg0AfblFeAftNf8AMrf9vf8A7RrwCgD7/FfAFe//ALM3TxR/26f+1q8AoA7qX4O+P4rdpn8OSlAMkJPEzfgoYk/gK57w94k1bwnqyahpN29vOhwy/wAMg7qy9CPr9RivuWvlP4/6dBYfEoywqFN5ZRXEgA/iyyfyQUAfTuiava69o1nqtk5a2u4hKmeoz1B9wePwr4w8d/8AJQ/Ev/YVuv8A0a1fQ37PFzJP8N5o3JKwahLGmewKI382NfPPjv8A5KH4l/7Ct1/6NagD6/8AAn/JPPDX/YKtf/RS18geO/8AkoXiX/sK3X/o1q+v/An/ACT3w1/2CrX/ANFLXyB47/5KF4l/7Ct1/wCjWoA+v/Av/JPfDX/YKtf/AEUtfMHxt/5K9rn/AG7/APoiOvp7wL/yT3w1/wBgq1/9FLXzD8bP+Sva5/27/wDoiOgD3/4Jf8kh0L/t4/8AR8lUfjH8Q5fBWiQ2emOq6vf5ET4B8iMfefB784H4ntir3wS/5JDoX/bx/wCj5K8H+OlzJP8AFjU43JKwRQRp7Dylb+bGgDj9D8Oa14pvmtdHsJr24A3vsxhfdmJwPxIo1zw5rXhe/W11iwmsbj7yb8YYDurDg/UGvp34E2UNr8KrGaNcPdzTSyH1YSMg/RBR8drKG6+FeoTSqDJazQyxH0YyKn8nNAEfwb+IcvjTRJrLU3DavYACR8Y8+M8K+PUdD+B718+/E7RD4f8AiLrVmqbYmnM8XHGyT5wB9M4/Ctj4G3EkHxY0uNCQs8c8b+48pm/morv/ANpHQd9rpHiCNOY2azmb2PzJ/J/zFAHqfw81j+3vh9oeoFt8j2qxyN6unyMf++lNfJfj/Wv+Eh8e61qatujluWWI+safIn/jqivWvgb4vi0jwF4niuWBGlg3yKx+8rIRtH/AkH4tXjOkeH7zWdM1i+tlzFpdsLiXjqC6rj8izfRTQB9ffDnWP7d+Hmh35bc7WqxyHuXT5GP4lSfxr5D8Xav/AG94w1fVA25Lq7kkjP8AsbjtH/fOK9h+CHi+PR/AHimKdhnTFN9GrH7wZMbR/wACQf8AfVeVfD7QD4l8eaRpbLuhecSTD/pmnzN+ikfjQB9i+HNITQPDWm6THjFpbJESO7Acn8Tk/jXy18bfEP8AbnxIvIY33W+nKLNP95eX/wDHyw/AV9XajfwaVpl3qF022C1haaRv9lQSf5V8IxRzXl2kUYaSaZwqjqWYnA/HJoA+o/gF4e/snwCdSkTE+qTGXPfy1+VB+e4/8Cqr+0d/yTyw/wCwrH/6Klr1q1tobO0htbdAkMCLHGg/hUDAH5V5L+0d/wAk8sP+wrH/AOipaAPIPgl/yV7Qv+3j/wBJ5K+rdd1Kx0jQr2+1J0SzhiZpd+MMMfd9yemO+a+ExirVppt9qEgjsrK5uXPRYYmcn8AKAKlfb3jv/knviX/sFXX/AKKavFPht8D9SfVbbWPFUC21rAwkSxYhnlYcjeBwq9OOp6YFe1+O/wDknvib/sFXX/opqAPkHwJ/yULw1/2FbX/0atfX/jv/AJJ74m/7BV1/6KavkDwJ/wAlC8Nf9hW1/wDRq19f+O/+Se+Jv+wVdf8AopqAPkDwJ/yULw1/2FbX/wBGrX2/2r4g8C/8lC8Nf9hW1/8ARq19vnpQB8AV9/V8A19/etAHyz8Y/iVd+I9cudC064aPRrRzG3ltj7TIpILE91B4A6HGe4xyejfDbxhr+mrqOm6FPNaMMpIzIgceqhiCw+ma5Pmvv1RgADjjigD4a0LX9X8J60l9ptxJaXcLYdTwGAPKOvceoP8AOvsS6Fl478ATC2cNa6tYt5bMPull4z7q36ivnj9oKyhtfiUssSgNdWMU0hHdtzp/JFr1H9ni5kn+G00chJWDUZY4/ZSiN/NjQB85eEtXOg+L9I1UttW2uo5HP+xu+Yfiua+yvGWsjw94M1fVd+17a1doz/00Iwg/76Ir5B+IGg/8I1481jSwmyKO4Lwjt5b/ADJ+SsB+Fet/G3ximq/DnwzFA4B1dVvZVU9FVB8p/wCBP+a0AeMeE9X/ALB8XaTquSEtbqOR/dNw3D8s19f/ABE1f+wvh7rt+G2utq0cbejv8in/AL6YV8f6v4evNF07R7y5XEeqWpuYuMYG9lx9cBW+jCvY/jb4wTWPh74WigcZ1RVvpFU9AqAbT/wJz+K0AeafC/Q/+Eg+I+i2bLuhScTygjI2R/OQfY4A/GvrDxrpiaz4J1rT2UMZrOUJn++Fyp/BgK8l/Zu0HZaav4glTmR1s4GPXC/M/wCeU/75Ne6ylRE5f7oU5+lAHw/4O1JtI8aaLfqcCC9iZv8Ad3AMPyzX3H+Oa+BIgzSoF+8WGD7199mgAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACjtRR2oA+Al69M+3rX1m3x28BfYzONSuDKBkW/wBkk3k+mcbf1r5MBxXs91+zf4jScraazpUsOeGmMkbfkFb+dAHlfiLWrjxH4hv9YuVCzXkzSlF6KD0UewGB+FfZ3gzRW8O+DNI0mQAS21siy46eYRl//Hia4LwH8DdM8LX0WqatdDU9QiO6JRHthib1weWI7E4x6ZANem6lqdno+nS6hqNwlvaQgGSVuignHP4kUAeQftDeFDf6JaeJbaPM1gfJuMd4WPB/Bj/4+fSvnJ7mZ7SK1aRjBG7SJGTwrMAGI+oVfyr688V/FDwdpvh27kGrafqjyRMiWdtOspmJGNrbSdqnPJPbPWvk/QtGuvEGu2Wk2S7p7qVY144XPUn2AyT9KAPpz4E+Gzonw+S+lTbc6rIbg5HPljhB+WWH+9TP2gLCS8+GRmRSRaXsU747Ahk/m4r1FEWONURQqqMADoBTbi3iureW3njSWGVCkkbjKspGCCO4xQB8dfCzxjb+CPGkepXqSNZSwtb3BjGWVWIIIHfDKv4Zr6GHxr8DzX1raWmoz3U1zMkK+XbOoUswUE7wvAz78V55rn7N14Ll20HW4GgJysV8rKyj03KDu/75FQaV+zfrBuFbU9esrdFOc2iPK34bguKAOu/aO/5J7p//AGFY/wD0VLXAfs4jHxCv8/8AQKk/9GxV7d8RvAv/AAsDw9b6V/aP2DyrpbnzfI83OEdduNy/385z2rA+HHwgPgDxDcasdd+3+datb+V9k8rGWRt2d7f3MYx3oA0PjZ/ySHXf+3f/ANHx14B8Ev8Akr2hf9vH/oiSvp7xt4Z/4THwhfaD9s+x/avL/f8AleZt2yK/3cjOduOveuA8E/Az/hDvF1jr3/CRfbPsvmfuPsPl7t0bJ97zDjG7PTtQBd+PPhqbXPAgvrWMvPpcv2hlAyTERh8fT5W+imvCvhf46HgPxSbyeKSawuY/JuY48FgM5DKO5B/QmvsbHNeKeLf2erDUbqS88OX4055CSbWVS0IJ/ukcqPbn2wOKAHePPjl4ePhm7svDdzLeX93E0Ky+S0aQhhgt84BJwTjGef18W+HHhubxT470uwSMtAkqz3JxkLEhBbPpn7o92Fd/Y/s3+IJLgDUNb0yGHPLQeZK2PoVUfrXu/hXwho/gzSf7P0e28tCd0krnMkrert3/AJDsKAOd+NpB+EOuj/r3/wDR8deAfBP/AJK9of8A28f+iJK+nvG3hj/hMfCF9oP2v7H9q8v9/wCX5m3bIr/dyM5246964DwT8Df+EO8XWOvf8JH9r+y+Z+5+xeXv3Rsn3vMOMbs9D0oA9A8df8k98S/9gq6/9FNXyB4FH/FwvDX/AGFbX/0atfZ2u6Z/bXh7UtK87yfttrLbebt3bN6Fd2MjOM5xkV5BoX7PX9i+IdN1X/hKPO+xXUVz5X2Dbv2MGxnzDjOMZxQB7fnPTmiiigBMHnFfAVff4r4AoA+s7X47+A57QTS6hc20mMmCW0kLfTKgr+tfOXj3xZJ418XXestE0MT4jgiY5KRrwAfc8k+5Nejah+zdrsc5Gm63p08PY3KvE35KG/nXT+Dv2fbHSr2O+8R3qai8ZDJaxIViyP7xPLD2wB656UAdj8H9Bl8P/DbTILhClzchrqRSMEFzkAjt8u38a+W/HfPxD8S/9hW6/wDRrV9ugYrxHXf2ef7a8Q6nqv8AwlHk/bbuW58r7Bu2b3LYz5gzjOM45oA9Q8C/8k88Nf8AYKtf/RS18i/EGB7f4jeJEkUgnUp3/BnLD9CK+ydC0z+xfD2maT53nfYrWK283bt37EC7sZOM4zjJrjPiF8JdK8dypffaHsNURQn2hE3LIo6B1yM47EEH60AZXwj+Juja1o+j+GHM0Or29sLdYzGSkixp94MMgfKvfHNePfHG3eH4s6s7KQsyQOp9R5KL/NTXq3wu+EGq+B/F0+rale2FzD9leGEQM+8MzLyQVAAwCOp612Pj/wCHGk+P7OJbx3tr2DPkXcQyyg/wsP4l7449iMnIB518E/iZo9roWn+EdQ82C+WdorVhGXSXzHLAEjODliOeMY5rD/aK8Ny2viKy8RRRk215EIJWA+7KmcZ+q4x/uGt/wN8DtY8LeO9P1m81HT7mytGdysZcSElGC8FcdSD1r2y+sbbUrKazvYI7i2mQpJFIuVdT2IoA+b/g/wDFfT/CWnzaHr3mpYtKZbe4RC/lE43KQOccZGM8k+tJ8Yvivp3i3T4dD0AyvZCQSz3DoU8wgHaqg845ycgcgVq65+zdc/aXfQNbhMDHKxXylWT23IDn8hTdE/Zuuzco+v63AsAOWisVZmb23MBj8jQBR/Z28NzXXiW88QyRkWtlEYI2I4aV8ZwfZc5/3hXu/jPQR4n8G6ro5AMlzAwiz0Eg+ZD/AN9AVq2Fha6ZYw2Vjbx29tCuyOKNcKo9qsUAfA8U8sMcyRSMqTJskAPDruDYP4qD+Ar6g+B3heO1+GMsl5CCdaeR5FI5MONij6EBj/wKsPU/2b7e81S7ubTxJ9kt5pmkjt/sG/ylJyFz5gzjpnFe329tFaWkVtAgSGFBHGo6KoGAPyFAHwdvubI3NsS8RceVMnTIDBtp/wCBKD+Ar339m/w6Y7XVvEcycyMLO3JHYYZ/wJ2D/gJrV8W/AODxL4ov9Zg1/wCwreSea0H2LzNrEfMd28Zycnp3r1Hw7olv4b8OWGjWpzFaQrGGxjee7Y7EnJ/GgDzH9obxD/Z3g+10WJ8TalPlwP8AnlHgn/x4p+RrzP4D+Hf7Z+IKX8ibrfS4jOcjjzD8qD65JYf7tZPxf8QnxF8SNSlR91vZt9jg9AEyGx9WLH8a96+B3h3+w/hzbXMibbnU3N2+RzsPCD6bQG/4EaAPSa8g/aN/5J5Yf9hWP/0VLXr9cf8AEfwL/wALA8PQaV/aP2DybpbnzfI83OEdduNy4+/nOe1AHzj8Ev8Akruh/wDbf/0RJX19XkHgn4Gnwf4vsdfPiP7Z9l8z9x9i8vdujZPveYcY3Z6dq9foAK5/x3/yT3xL/wBgq6/9FNXQVn67pn9t+HtT0rzvJ+3Wktt5u3ds3oV3YyM4znGRQB8Y+Bf+SheGv+wra/8Ao1a+xPGUD3XgfxBbxgmSXTbhFA7kxsBXlWhfs8/2J4h03Vf+Eo8/7FdRXPlf2ft37HDbc+YcZxjODXt/86APg/RdRfR9d0/U0Te9ncx3AQnG4owbH6V9reGPFWk+L9I/tPR5nltg5jYvGyFXABIwRz94cjivIvE37OcNzeS3PhzVVtY3JItbpSyofQOOcexBPua9N+HXha48HeCbLRruSGS6iaR5XhJKMzOSMEgHoQOnagD4sHFfa/g3x3ovjmzmuNIkmL2+3z4poirRls4BPQ9D0J6V594y+AFjrWoTajoeoLp08zF5LeSPdEWPUrjlR3xzXVfCfwJe+AvDt3Y6jNazXVxdmbfbMxXZtUAfMoOcg/nQB8peIdDuvDniC+0i8Uia1laMnGAw7MPYjBH1r6S8P/Hvwnd6NFLrNxLYagqATQiB5FZu5QqDwffGP1rrvGngDRfHVgsGqRMk8QPkXUJxJHn3PUeoP6GvErn9m/xIs5FrrGkyxZ4aUyI2PoEb+dAHnfjjxTN408W3mtSRmJJSFhiJz5cajCj69z7k19TfCjw5L4Y+HenWdyhS6mBuZ0IwVZ+dp9wu0H6VzHgn4D6T4eu49R1q5/tW8jYNHHs2woR3IPLn64HtXrg6UAeB/tH+HS0OleI4k5QmznI9Dlk/Xf8AmK8GDXV89ragvMygQwR+mWJ2j6sxP1NfcHiXQoPE3hrUNFuW2x3cJj34zsbqrY74IBx7V5j4Q+AkPhjxTY61Prwv1tHMiwfYvLBbBCnPmHoSD07UAWvjr4Yju/htDcWcIB0Z0ZFUdISAhA/8dP0WvmCSeWaOFJJGZYU2Rg/wKWLYH4sx/GvvG8tIb6yuLO4QPBcRtFIp7qwwR+RrxTSP2crew1ezvLvxH9st4Jklkt/sGzzQpzt3eYcA9OlAHq3g3QV8MeD9L0cAB7aBVkx0Mh5c/ixJqt4/1ZNE8Aa5fs20paOiHP8AG42L/wCPMK6Wvnr9orxWs1zY+FraQHySLq7wejEEIp/Alv8AgS0AeUeA9LbWfHmh2KruEl5Gzjr8inc3/joNfW/jvxjbeB/DE2r3ELTuHWKGFW2+ZIc4GewwCSfQV5N+zr4TZft3im5jwrA2loT35zIw/ID/AL6r1nx34OtfHPhibR7iYwPvWWGYLu8uQZwcdxgkEehoA8y8BfHa717xLa6Pr2n2sIvJBHBPa7lCufuqysTnJ4zngkcV7lXhvgH4D3eg+JbbWNd1G1mFnIJYILTcwZx90szAYwecAdcc17lQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFGe1FGM0AfII+CfxCOP+Kf/wDJyD/4uvr6kxS0AFcV8U/DereLfBUukaO1us8k8bus7lQ6L82AQDzkL1x0rtaTAoA+SIvgb4/kmEb6PFEuceY95EVHvwxP6V738NvhlY+AbKSRpRd6tcACa524Cr12ID0Hqep/AAd7RQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAZr5B/4Ul8Q/8AoX//ACdt/wD45X16RmlxQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABUN1JNFZzyW8JnnSNmjiDBfMYDhcngZPGTU1FAHyGvwR+ILMAdBC5PLG8g49+Hr66jRI41jjUKiAKqgYAA6ClxS0AFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABXgHi74A3l74lW80PUhJZ3lxuuhdNmWDccs4P8Y69cHOOvJHv9GOc0AQWdpBYWcNpaRLFbwoI441GAqgYAFT0UUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFABRRRQAUUUUAFFFFAH/9k='
 
 class BackgroundIndexFileGenerator:
+    """
+    Generates PIL-enhanced index files in a background thread. Thumbnails are
+    generated by a pool of worker processes, or by the thread itself when
+    there's only the one worker.
 
-    def __init__(self, dir_path):
+    Directories are worked through from a priority queue, in crawl order
+    unless they're requested over HTTP (see prioritise), when they jump to the
+    front with the images asked for first. While a directory's thumbnails are
+    being made, the index files with newly ready thumbnails are rewritten every
+    PARTIAL_INDEX_INTERVAL seconds, or less often if rewriting them is slow
+    (see PARTIAL_INDEX_COST_RATIO), and all of them once more when they're all
+    done.
+    """
+
+    def __init__(self, dir_path, workers=None):
         self.dir_path = dir_path
+        self.workers = workers or multiprocessing.cpu_count()
+        self.lock = threading.Lock()
+        # Directories with images yet to be queued for thumbnailing, as a heap
+        # of [priority, location] entries. Requested directories come before
+        # the crawl, the most recently requested first
+        self.queue = []
+        # The current heap entry of each directory in the queue. Entries
+        # replaced by reprioritising have their location set to None, and are
+        # dropped as they reach the top of the heap
+        self.entries = {}
+        # Images asked for, as sets of image files by location, to be
+        # thumbnailed before the rest of their directory
+        self.requested = {}
+        # Count of directories queued, so each gets a distinct priority
+        self.sequence = 0
+        self.thread = threading.Thread(target=_profiled, args=(self._process,))
+        self.thread.daemon = True
+
+    def _collect(self, in_flight, in_progress):
+        # Wait for the oldest outstanding thumbnail, storing it in the cache
+        progress, image_file, key, result = in_flight.popleft()
+        try:
+            # Without a pool, thumbnails are made as they're collected
+            if result is None:
+                thumbnails, metadata, timings = \
+                    _make_thumbnail(progress.location, image_file)
+            else:
+                thumbnails, metadata, timings = result.get()
+        except Exception as exptn:
+            print('WARNING: Error thumbnailing %s: %s' % (key[0], exptn))
+            thumbnails, metadata, timings = None, None, None
+        if METRICS is not None:
+            METRICS.merge(timings)
+        if metadata is not None:
+            IMAGE_CACHE.put_metadata(*metadata[:6])
+        for width, encoded in (thumbnails or {}).items():
+            IMAGE_CACHE.put(*(key[:3] + (width,) + key[4:] + encoded))
+        # Images that should have had a thumbnail but didn't get one aren't
+        # tried again when the index is written
+        if metadata is None or (thumbnails is None and \
+                _has_derivative(metadata, THUMBNAIL_WIDTH)):
+            progress.failed = True
+        progress.outstanding -= 1
+        progress.finished.add(image_file)
+        if progress.outstanding == 0 and not progress.pending:
+            del in_progress[progress.location]
+            self._write_index_files(progress, finished=True)
+        elif time.time() >= progress.next_write:
+            self._write_index_files(progress)
+
+    def _dequeue(self, location):
+        with self.lock:
+            entry = self.entries.pop(location, None)
+            if entry is not None:
+                entry[1] = None
+            self.requested.pop(location, None)
+
+    def _enqueue(self, location, priority):
+        # Must be called with the lock held
+        entry = self.entries.get(location)
+        if entry is not None:
+            entry[1] = None
+        entry = [priority, location]
+        self.entries[location] = entry
+        heapq.heappush(self.queue, entry)
+
+    def _get_next_image(self, progress):
+        # Images asked for go first, if they're still to be thumbnailed
+        location, pending = progress.location, progress.pending
+        with self.lock:
+            requested = self.requested.pop(location, set())
+        for image_file in requested:
+            if image_file in pending:
+                pending.remove(image_file)
+                pending.appendleft(image_file)
+        return pending.popleft()
+
+    def _get_next_location(self):
+        with self.lock:
+            while self.queue and self.queue[0][1] is None:
+                heapq.heappop(self.queue)
+            if not self.queue:
+                return None
+            return self.queue[0][1]
+
+    def _process(self):
+        # Without PIL there are no thumbnails to make
+        if IMAGE_CACHE is None:
+            _create_index_files(self.dir_path)
+            return
+        # A single worker is better off in this thread, without the overhead
+        # of passing images to and from a pool
+        if self.workers <= 1:
+            self._process_queue(None)
+            return
+        pool = multiprocessing.Pool(
+            self.workers, _init_thumbnail_worker,
+            (THUMBNAIL_WIDTH, RESAMPLE, THUMBNAIL_FORMAT, METRICS is not None)
+        )
+        try:
+            self._process_queue(pool)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _process_queue(self, pool):
+        max_in_flight = 1
+        if pool is not None:
+            max_in_flight = self.workers * THUMBNAILS_IN_FLIGHT_PER_WORKER
+        # DirectoryProgress of the directories being thumbnailed, by location
+        in_progress = {}
+        # Thumbnails queued in the pool, as (DirectoryProgress, image file,
+        # cache key, AsyncResult) tuples in submission order. Without a pool,
+        # there's no AsyncResult, the thumbnail is made when it's collected
+        in_flight = collections.deque()
+        for here, _, _ in _walk_image_dirs(self.dir_path):
+            with self.lock:
+                self.sequence += 1
+                self._enqueue(here, (1, self.sequence))
+        while True:
+            # Apply backpressure - don't queue more until there's room
+            while len(in_flight) >= max_in_flight:
+                self._collect(in_flight, in_progress)
+            # Take the next image from whichever directory is now at the front
+            # of the queue, so requests are seen to as soon as there's room
+            location = self._get_next_location()
+            if location is None:
+                break
+            progress = in_progress.get(location)
+            if progress is None:
+                # A directory that can't be read mustn't stop the rest
+                try:
+                    progress = self._start(location)
+                except Exception as exptn:
+                    print('WARNING: Error processing %s: %s' % (
+                        location, exptn
+                    ))
+                    progress = None
+                if progress is None:
+                    self._dequeue(location)
+                    continue
+                in_progress[location] = progress
+            image_file = self._get_next_image(progress)
+            # Once everything's queued, the directory is finished as soon as
+            # it's all collected
+            if not progress.pending:
+                self._dequeue(location)
+            key = _get_thumbnail_key(
+                location, image_file,
+                stat=_get_image_stat(location, image_file)
+            )
+            if key is not None and not IMAGE_CACHE.contains(*key):
+                result = None
+                if pool is not None:
+                    result = pool.apply_async(
+                        _make_thumbnail, (location, image_file)
+                    )
+                progress.outstanding += 1
+                in_flight.append((progress, image_file, key, result))
+                continue
+            # Cached in the meantime, when it was requested
+            progress.finished.add(image_file)
+            if progress.outstanding == 0 and not progress.pending:
+                del in_progress[location]
+                self._write_index_files(progress, finished=True)
+        while in_flight:
+            self._collect(in_flight, in_progress)
+
+    def _start(self, location):
+        # Get a directory's DirectoryProgress, or write its index files straight
+        # away and return None if there's no thumbnailing to do
+        print('Processing %s' % location)
+        directory = IMAGE_TREE.get(location)
+        if directory is None:
+            return None
+        dirs, image_files = directory.dirs, directory.image_files
+        # Nothing to do for directories unchanged since their index was last
+        # stored, the first pass has already written that out
+        _, stored = _get_stored_index(
+            self.dir_path, location, image_files, dirs
+        )
+        if stored is not None:
+            return None
+        pending = collections.deque()
+        for image_file in image_files:
+            key = _get_thumbnail_key(
+                location, image_file,
+                stat=_get_image_stat(location, image_file)
+            )
+            if key is not None and not IMAGE_CACHE.contains(*key):
+                pending.append(image_file)
+        progress = DirectoryProgress(location, dirs, image_files, pending)
+        if not pending:
+            self._write_index_files(progress, finished=True)
+            return None
+        return progress
+
+    def _write_index_files(self, progress, finished=False):
+        # Partly processed directories, and those where thumbnails failed, are
+        # indexed with just the thumbnails already cached. Until it's finished,
+        # only the pages with images finished since they were last written
+        # change. A directory that can't be indexed mustn't stop the rest
+        location, dirs, image_files = \
+            progress.location, progress.dirs, progress.image_files
+        pages = None
+        if not finished:
+            page_size = IMAGES_PER_PAGE or len(image_files)
+            pages = set(
+                index // page_size + 1
+                for index, image_file in enumerate(image_files)
+                if image_file in progress.finished
+            )
+        progress.finished = set()
+        started = time.time()
+        try:
+            _create_index_file(
+                self.dir_path, location, image_files, dirs,
+                ready_only=not finished or progress.failed, pages=pages
+            )
+        except Exception as exptn:
+            print('WARNING: Error indexing %s: %s' % (location, exptn))
+        progress.next_write = time.time() + max(
+            PARTIAL_INDEX_INTERVAL,
+            (time.time() - started) * PARTIAL_INDEX_COST_RATIO
+        )
+
+    def prioritise(self, location, image_file=None):
+        """
+        Have the given directory worked on next, ahead of the crawl and of
+        directories requested before it. Does nothing for directories which
+        aren't waiting to be worked on.
+
+        @param {String} location - The directory, as found walking dir_path
+
+        @param {String=None} image_file - An image file in the directory to
+            thumbnail before the rest, if any
+        """
+        with self.lock:
+            if location not in self.entries:
+                return
+            self.sequence += 1
+            self._enqueue(location, (0, -self.sequence))
+            if image_file is not None:
+                self.requested.setdefault(location, set()).add(image_file)
+
+    def run(self):
+        self.thread.start()
+
+class DirectoryListingCache:
+    """
+    An in-memory cache of the index pages rendered from the served
+    directories' listings in IMAGE_TREE, used to serve index pages on request
+    rather than writing index files. Nothing is listed until it's first asked
+    for.
+
+    A directory's pages are rendered afresh whenever IMAGE_TREE's listing of
+    it changes, see ImageTree.get_current.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.lock = threading.Lock()
+        # Listings by location, as (ImageDirectory the pages are rendered
+        # from, pages rendered so far by page number) tuples. Pages are kept
+        # as (ETag, HTML, compressed HTML by encoding) tuples
+        self.listings = {}
+
+    def _render_page(
+            self, location, image_files, dirs, page, page_count, pages):
+        # Pages are rendered outside the lock, so one slow directory doesn't
+        # hold up requests for the others. They're only kept once complete,
+        # so a client going away part way through doesn't leave half a page.
+        # Complete pages are compressed for the requests after this one
+        chunks = []
+        for chunk in _generate_index_page(
+                self.root_dir, location, image_files, dirs, page, page_count,
+                force_no_processing=not PIL_ENABLED, defer_thumbnails=True):
+            chunks.append(chunk)
+            yield chunk
+        html = ''.join(chunks)
+        pages[page] = (
+            '"%s"' % hashlib.sha1(html).hexdigest(), html,
+            _get_compressed_data(html)
+        )
+
+    def get_page(self, location, page):
+        """
+        Get a page of the given directory's index, rendering it if need be.
+
+        @param {String} location - The directory, within root_dir
+
+        @param {Integer} page - The page number, counting from 1
+
+        @return {(String, String, Dict)} The page's (ETag, HTML, compressed
+            HTML by encoding) if it's been rendered before, a Generator
+            yielding its HTML in chunks as it's rendered if not, or None if
+            there's no such directory or page.
+        """
+        directory = IMAGE_TREE.get_current(location)
+        if directory is None:
+            return None
+        with self.lock:
+            listing = self.listings.get(location)
+            if listing is None or listing[0] is not directory:
+                listing = self.listings[location] = (directory, {})
+        pages = listing[1]
+        page_count = _get_page_count(len(directory.image_files))
+        if page > page_count:
+            return None
+        if page in pages:
+            return pages[page]
+        return self._render_page(
+            location, directory.image_files, directory.dirs, page, page_count,
+            pages
+        )
+
+class DirectoryProgress:
+    """
+    A directory being thumbnailed by BackgroundIndexFileGenerator, and how far
+    it's got.
+    """
+
+    def __init__(self, location, dirs, image_files, pending):
+        self.location = location
+        self.dirs = dirs
+        self.image_files = image_files
+        # Images yet to be queued for thumbnailing, as a deque
+        self.pending = pending
+        # Count of thumbnails queued and not yet collected
+        self.outstanding = 0
+        # When the index files are next to be rewritten, if still unfinished
+        self.next_write = time.time() + PARTIAL_INDEX_INTERVAL
+        # Whether any thumbnails couldn't be made
+        self.failed = False
+        # Images finished since the index files were last written
+        self.finished = set()
+
+class DirectoryWatcher:
+    """
+    Watches the served directory tree for changes while the server runs, and
+    regenerates the index files of just those directories whose contents
+    changed. Thumbnails are only generated for new or modified images, as the
+    rest are already cached.
+
+    Uses inotify (via pyinotify) where available. Otherwise directory mtimes
+    are polled every WATCH_INTERVAL seconds, which notices images being added,
+    removed or renamed but not modified in place.
+
+    When index pages are rendered on request (see DIRECTORY_LISTINGS), changed
+    directories' cached listings are invalidated instead.
+    """
+
+    def __init__(self, dir_path, created_files, wait_for=None):
+        self.dir_path = dir_path
+        # Shared with serve_dir, so new index files get cleaned up too
+        self.created_files = created_files
+        # Don't start regenerating until this thread (the background indexer)
+        # has finished, so we don't race it
+        self.wait_for = wait_for
         self.thread = threading.Thread(target=self._process, args=())
         self.thread.daemon = True
 
     def _process(self):
-        _create_index_files(self.dir_path)
+        if INOTIFY_ENABLED:
+            self._watch_inotify()
+        else:
+            self._watch_mtimes()
+
+    def _regenerate(self, locations):
+        for location in sorted(locations):
+            # Removed directories only matter to their parents
+            if not os.path.isdir(location):
+                continue
+            print('Change detected in %s' % location)
+            # Manifests and pages rendered on request are from IMAGE_TREE
+            IMAGE_TREE.invalidate(location)
+            if DIRECTORY_LISTINGS is not None:
+                continue
+            dirs, image_files = _list_image_dir(location)
+            index_file_paths = _create_index_file(
+                self.dir_path, location, image_files, dirs,
+                force_no_processing=not PIL_ENABLED
+            )
+            for index_file_path in index_file_paths:
+                if index_file_path not in self.created_files:
+                    self.created_files.append(index_file_path)
+
+    def _watch_inotify(self):
+        changed = set()
+        def _on_event(event):
+            # Only changes to images and directories affect the indexes - our
+            # own index files being written certainly don't
+            if event.dir:
+                changed.add(event.path)
+                changed.add(event.pathname)
+            elif _is_image_file(event.name):
+                changed.add(event.path)
+        watch_manager = pyinotify.WatchManager()
+        notifier = pyinotify.Notifier(
+            watch_manager, _on_event, timeout=WATCH_INTERVAL * 1000
+        )
+        watch_manager.add_watch(
+            self.dir_path,
+            pyinotify.IN_CREATE | pyinotify.IN_DELETE | \
+                pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO | \
+                pyinotify.IN_CLOSE_WRITE,
+            rec=True, auto_add=True,
+            exclude_filter=lambda path: \
+                CACHE_DIR_NAME in path.split(os.sep)
+        )
+        if self.wait_for is not None:
+            self.wait_for.join()
+        while True:
+            # Gather events until there's been none for WATCH_INTERVAL, so a
+            # directory being copied in is only regenerated once
+            if notifier.check_events():
+                notifier.read_events()
+                notifier.process_events()
+            elif changed:
+                self._regenerate(changed)
+                changed.clear()
+
+    def _watch_mtimes(self):
+        # Directories' mtimes, and what they listed at the time as
+        # (subdirectories, image files), by location
+        listings = {}
+        for here, dirs, image_files in _walk_image_dirs(self.dir_path):
+            listings[here] = (
+                os.stat(here).st_mtime, (list(dirs), list(image_files))
+            )
+        if self.wait_for is not None:
+            self.wait_for.join()
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            changed = set()
+            for location, (mtime, listing) in list(listings.items()):
+                try:
+                    current_mtime = os.stat(location).st_mtime
+                except OSError:
+                    # Gone - its parent will have changed too
+                    del listings[location]
+                    continue
+                if current_mtime == mtime:
+                    continue
+                # Our own index files being written change directories' mtimes
+                # too, so only a change in what they list counts
+                current_listing = _list_image_dir(location)
+                listings[location] = (current_mtime, current_listing)
+                if current_listing != listing:
+                    changed.add(location)
+            # Anything under a new subdirectory is new too
+            for location in list(changed):
+                for subdir in listings[location][1][0]:
+                    subdir_path = os.path.join(location, subdir)
+                    if subdir_path not in listings:
+                        for here, dirs, image_files in _walk_image_dirs(
+                                subdir_path, rescan=True):
+                            changed.add(here)
+                            listings[here] = (None, (
+                                list(dirs), list(image_files)
+                            ))
+            self._regenerate(changed)
+            # Take mtimes after regenerating, so new index files being written
+            # don't count as changes
+            for location in changed:
+                if os.path.isdir(location):
+                    listings[location] = (
+                        os.stat(location).st_mtime, listings[location][1]
+                    )
 
     def run(self):
         self.thread.start()
 
+class ImageCache:
+    """
+    A persistent on-disk cache of generated thumbnail data, backed by a SQLite
+    database. Entries are keyed on the source image's path, mtime and size
+    along with the thumbnail width and resampling mode, so unchanged images
+    never need to be decoded again. The total size of stored data is capped,
+    with the least recently used entries evicted first.
+    """
+
+    def __init__(self, cache_dir, max_bytes=CACHE_MAX_BYTES):
+        # With no cache directory, keep the cache in memory for this run only
+        db_path = ':memory:'
+        if cache_dir is not None:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            db_path = os.path.join(cache_dir, CACHE_FILE_NAME)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.closed = False
+        # The connection is shared between the background indexer and the
+        # server, so all access goes through the lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        # Paths are byte strings, in whatever encoding the filesystem uses
+        self.connection.text_factory = str
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS thumbnails ('
+            'path TEXT, mtime REAL, size INTEGER, width INTEGER, '
+            'resample INTEGER, format TEXT, data BLOB, bytes INTEGER, '
+            'last_used REAL, PRIMARY KEY (path, mtime, size, width, resample))'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS thumbnails_last_used '
+            'ON thumbnails (last_used)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS metadata ('
+            'path TEXT PRIMARY KEY, mtime REAL, size INTEGER, format TEXT, '
+            'width INTEGER, height INTEGER)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS directories ('
+            'path TEXT PRIMARY KEY, signature TEXT, thumbnails TEXT)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS sources ('
+            'id TEXT PRIMARY KEY, path TEXT, mtime REAL, size INTEGER, '
+            'width INTEGER, resample INTEGER)'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS sources_path ON sources (path)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS directory_pages ('
+            'path TEXT, page INTEGER, html BLOB, PRIMARY KEY (path, page))'
+        )
+        self.connection.commit()
+        self.total_bytes = self.connection.execute(
+            'SELECT COALESCE(SUM(bytes), 0) FROM thumbnails'
+        ).fetchone()[0]
+
+    def _evict(self):
+        # Drop least recently used entries in small batches until we're back
+        # under the size cap
+        while self.total_bytes > self.max_bytes:
+            rows = self.connection.execute(
+                'SELECT rowid, bytes FROM thumbnails ORDER BY last_used LIMIT 16'
+            ).fetchall()
+            if not rows:
+                break
+            self.connection.executemany(
+                'DELETE FROM thumbnails WHERE rowid = ?',
+                [(rowid,) for rowid, _ in rows]
+            )
+            self.total_bytes -= sum(row_bytes for _, row_bytes in rows)
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.connection.commit()
+            self.connection.close()
+
+    def contains(self, path, mtime, size, width, resample):
+        """
+        Check whether a thumbnail is cached for the given key, without reading
+        or touching it.
+
+        @return {Boolean} True if the thumbnail is cached.
+        """
+        key = (os.path.abspath(path), mtime, size, width, resample)
+        with self.lock:
+            if self.closed:
+                return False
+            return self.connection.execute(
+                'SELECT 1 FROM thumbnails WHERE path = ? AND mtime = ? AND '
+                'size = ? AND width = ? AND resample = ?',
+                key
+            ).fetchone() is not None
+
+    def get(self, path, mtime, size, width, resample):
+        """
+        Get the cached thumbnail for the given key.
+
+        @return {(String, String)} A (format, data) tuple of the encoded
+            thumbnail, or None if it isn't cached.
+        """
+        key = (os.path.abspath(path), mtime, size, width, resample)
+        with self.lock:
+            # The background indexer may still be running as we shut down
+            if self.closed:
+                return None
+            row = self.connection.execute(
+                'SELECT format, data FROM thumbnails WHERE path = ? AND '
+                'mtime = ? AND size = ? AND width = ? AND resample = ?',
+                key
+            ).fetchone()
+            if row is None:
+                return None
+            # Record the use without committing - these are flushed alongside
+            # the next write, or when the cache is closed
+            self.connection.execute(
+                'UPDATE thumbnails SET last_used = ? WHERE path = ? AND '
+                'mtime = ? AND size = ? AND width = ? AND resample = ?',
+                (time.time(),) + key
+            )
+        return row[0], bytes(row[1])
+
+    def get_directory(self, path, signature):
+        """
+        Get the stored index of a directory, as generated when its contents
+        had the given signature. See _get_directory_signature.
+
+        @return {([String], [Tuple])} The index HTML of each page and the
+            cache keys of the thumbnails they reference, or None if there's no
+            index stored for the directory as it is now.
+        """
+        with self.lock:
+            if self.closed:
+                return None
+            row = self.connection.execute(
+                'SELECT thumbnails FROM directories WHERE path = ? AND '
+                'signature = ?',
+                (os.path.abspath(path), signature)
+            ).fetchone()
+            if row is None:
+                return None
+            pages = [
+                bytes(html) for (html,) in self.connection.execute(
+                    'SELECT html FROM directory_pages WHERE path = ? '
+                    'ORDER BY page',
+                    (os.path.abspath(path),)
+                ).fetchall()
+            ]
+        # Paths are byte strings, which JSON can't hold, so are stored as
+        # Latin-1, which has a character for every byte
+        thumbnails = [
+            (key[0].encode('latin-1'),) + tuple(key[1:])
+            for key in json.loads(row[0])
+        ]
+        return pages, thumbnails
+
+    def get_metadata(self, path, mtime, size):
+        """
+        Get the cached metadata of the given version of an image.
+
+        @return {(String, Integer, Integer)} A (format, width, height) tuple, or
+            None if no metadata is cached for this version of the image.
+        """
+        with self.lock:
+            if self.closed:
+                return None
+            return self.connection.execute(
+                'SELECT format, width, height FROM metadata WHERE path = ? '
+                'AND mtime = ? AND size = ?',
+                (os.path.abspath(path), mtime, size)
+            ).fetchone()
+
+    def get_source(self, thumbnail_id):
+        """
+        Get the cache key of the thumbnail (or full-size conversion) with the
+        given ID, as referenced by an index. See put_source.
+
+        @return {Tuple} The thumbnail's cache key, or None if no index
+            references a thumbnail with that ID.
+        """
+        with self.lock:
+            if self.closed:
+                return None
+            return self.connection.execute(
+                'SELECT path, mtime, size, width, resample FROM sources '
+                'WHERE id = ?',
+                (thumbnail_id,)
+            ).fetchone()
+
+    def prune(self):
+        """
+        Remove entries whose source image no longer exists, or has changed
+        since its thumbnail was generated.
+
+        @return {Integer} The number of entries removed.
+        """
+        with self.lock:
+            # Stale metadata and directory indexes are replaced as soon as
+            # they're next read, so only need clearing out for images and
+            # directories which have gone altogether
+            for table in [
+                    'metadata', 'directories', 'directory_pages', 'sources']:
+                for (path,) in self.connection.execute(
+                        'SELECT path FROM %s' % table).fetchall():
+                    if not os.path.exists(path):
+                        self.connection.execute(
+                            'DELETE FROM %s WHERE path = ?' % table, (path,)
+                        )
+            rows = self.connection.execute(
+                'SELECT DISTINCT path, mtime, size FROM thumbnails'
+            ).fetchall()
+            stale = []
+            for path, mtime, size in rows:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    stale.append((path, mtime, size))
+                    continue
+                if stat.st_mtime != mtime or stat.st_size != size:
+                    stale.append((path, mtime, size))
+            removed = 0
+            for key in stale:
+                removed += self.connection.execute(
+                    'DELETE FROM thumbnails WHERE path = ? AND mtime = ? AND '
+                    'size = ?',
+                    key
+                ).rowcount
+            self.total_bytes = self.connection.execute(
+                'SELECT COALESCE(SUM(bytes), 0) FROM thumbnails'
+            ).fetchone()[0]
+            self.connection.commit()
+        return removed
+
+    def put(self, path, mtime, size, width, resample, image_format, data):
+        """
+        Store an encoded thumbnail under the given key, replacing any entries
+        for older versions of the same image and evicting the least recently
+        used entries if the cache is over its size cap.
+        """
+        path = os.path.abspath(path)
+        with self.lock:
+            if self.closed:
+                return
+            self.total_bytes -= self.connection.execute(
+                'SELECT COALESCE(SUM(bytes), 0) FROM thumbnails WHERE '
+                'path = ? AND width = ? AND resample = ?',
+                (path, width, resample)
+            ).fetchone()[0]
+            self.connection.execute(
+                'DELETE FROM thumbnails WHERE path = ? AND width = ? AND '
+                'resample = ?',
+                (path, width, resample)
+            )
+            self.connection.execute(
+                'INSERT INTO thumbnails VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    path, mtime, size, width, resample, image_format,
+                    sqlite3.Binary(data), len(data), time.time()
+                )
+            )
+            self.total_bytes += len(data)
+            self._evict()
+            self.connection.commit()
+
+    def put_directory(self, path, signature, pages, thumbnails):
+        """
+        Store the index pages generated for a directory with the given
+        signature, along with the cache keys of the thumbnails they reference.
+        """
+        # See get_directory
+        thumbnails = json.dumps(thumbnails, encoding='latin-1')
+        with self.lock:
+            if self.closed:
+                return
+            self.connection.execute(
+                'INSERT OR REPLACE INTO directories (path, signature, '
+                'thumbnails) VALUES (?, ?, ?)',
+                (os.path.abspath(path), signature, thumbnails)
+            )
+            self.connection.execute(
+                'DELETE FROM directory_pages WHERE path = ?',
+                (os.path.abspath(path),)
+            )
+            self.connection.executemany(
+                'INSERT INTO directory_pages VALUES (?, ?, ?)',
+                [
+                    (os.path.abspath(path), page, sqlite3.Binary(html))
+                    for page, html in enumerate(pages, 1)
+                ]
+            )
+            self.connection.commit()
+
+    def put_metadata(self, path, mtime, size, image_format, width, height):
+        """
+        Store the metadata of the given version of an image, replacing that of
+        any other version.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.connection.execute(
+                'INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)',
+                (os.path.abspath(path), mtime, size, image_format, width, height)
+            )
+            self.connection.commit()
+
+    def put_source(self, thumbnail_id, path, mtime, size, width, resample):
+        """
+        Remember where the thumbnail (or full-size conversion) with the given
+        ID comes from, so it can be served or made when it's requested, even
+        if it's never been cached or has been evicted. Only the current
+        version of each image is remembered, so this holds no more than the
+        images being indexed do.
+        """
+        path = os.path.abspath(path)
+        with self.lock:
+            if self.closed:
+                return
+            added = self.connection.execute(
+                'INSERT OR IGNORE INTO sources VALUES (?, ?, ?, ?, ?, ?)',
+                (thumbnail_id, path, mtime, size, width, resample)
+            ).rowcount
+            # Indexes are rendered often, so this is only committed alongside
+            # the next write, or when the cache is closed
+            if added:
+                self.connection.execute(
+                    'DELETE FROM sources WHERE path = ? AND width = ? AND '
+                    'resample IS ? AND id != ?',
+                    (path, width, resample, thumbnail_id)
+                )
+
+class ImageDirectory(collections.namedtuple('ImageDirectory', [
+        'location', 'mtime', 'dirs', 'image_files', 'image_stats',
+        'linked_dirs'])):
+    """
+    What a scan found in one directory - its location and mtime, its
+    subdirectories and image files (each sorted by name), and the images'
+    stats as (mtime, size) tuples by name. Built by _scan_image_dir.
+
+    Subdirectories which are symbolic links are listed, but also named in
+    linked_dirs - like os.walk, ImageTree doesn't descend into them, so a link
+    back up the tree can't send it round in circles.
+    """
+    __slots__ = ()
+
+class ImageMeRequestHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
+    """
+    Request handler serving the gallery. Behaves exactly as
+    SimpleHTTPRequestHandler, except that requests under THUMBNAIL_URL_PREFIX
+    and FULL_SIZE_URL_PREFIX are answered with thumbnails and full-size
+    conversions from IMAGE_CACHE. Their URLs are content-addressed, so they're
+    sent with long-lived caching headers and revalidated with 304 Not Modified
+    responses. In dynamic mode, index pages are rendered from
+    DIRECTORY_LISTINGS rather than read from files. Every directory's
+    MANIFEST_FILE_NAME and CLIENT_FILE_NAME are served from MANIFESTS. METRICS
+    are served at METRICS_URL_PATH.
+
+    Index pages, manifests and the client page are compressed when they're
+    generated (see COMPRESSION_ENCODINGS), and sent compressed to clients
+    that accept it.
+
+    Requests for directories and images are passed on to BACKGROUND_INDEXER,
+    so what's being looked at is thumbnailed first.
+
+    Files are sent with sendfile where available (see SENDFILE_ENABLED), so
+    they go from disk to socket without passing through Python. They carry
+    ETag and Last-Modified validators for conditional requests, and single
+    byte ranges can be asked for, so interrupted downloads can be resumed.
+
+    Connections are kept alive between requests (HTTP/1.1), so every response
+    must carry a Content-Length, or be sent with chunked transfer encoding.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Responses are written as headers then body, so with Nagle's algorithm
+    # the body waits on the client's delayed ACK of the headers on a kept
+    # alive connection
+    disable_nagle_algorithm = True
+    # Stalled connections are dropped after this long, so they don't tie up
+    # server threads. Idle ones go sooner, see handle
+    timeout = SOCKET_TIMEOUT
+    # The (offset, length) of the part of the file send_head opened that's to
+    # be sent, or None if it's not a file being served from disk
+    send_range = None
+
+    def _get_content_encoding(self, encodings):
+        # The most preferred of the given encodings the client accepts, if any
+        for encoding in COMPRESSION_ENCODINGS:
+            if encoding in encodings and self._accepts_encoding(encoding):
+                return encoding
+        return None
+
+    def _get_requested_file_name(self):
+        return urlparse.urlsplit(self.path).path.rsplit('/', 1)[-1]
+
+    def _is_cache_path(self, path):
+        # The thumbnail cache isn't part of the gallery, and its database gives
+        # away the path of every image
+        if CACHE_DIR_NAME in os.path.relpath(path).split(os.sep):
+            return True
+        if IMAGE_CACHE is None or IMAGE_CACHE.cache_dir is None:
+            return False
+        cache_dir = os.path.join(os.path.abspath(IMAGE_CACHE.cache_dir), '')
+        return os.path.join(os.path.abspath(path), '').startswith(cache_dir)
+
+    def _get_requested_location(self, root_dir):
+        # Work out which of the served directories the request is for. The
+        # server serves the current directory, which is the root of the
+        # gallery. Nothing in the cache directory is one of them
+        relative_path = os.path.relpath(
+            os.path.dirname(self.translate_path(self.path))
+        )
+        if CACHE_DIR_NAME in relative_path.split(os.sep):
+            return None
+        if relative_path == os.curdir:
+            return root_dir
+        return os.path.join(root_dir, relative_path)
+
+    def _get_requested_page(self):
+        # Index pages can be asked for by their own filenames (imageme-2.html)
+        # or as imageme.html?page=2
+        parts = urlparse.urlsplit(self.path)
+        page = _get_index_page_number(self._get_requested_file_name())
+        if page == 1:
+            query_page = urlparse.parse_qs(parts.query).get('page', ['1'])[0]
+            if query_page.isdigit() and int(query_page) > 1:
+                page = int(query_page)
+        return page
+
+    def _send_file_head(self, path, content_type=None, content_encoding=None):
+        # Precompressed index files are sent as the page they're a copy of, so
+        # are told their content type and encoding
+        compressible = content_type is not None
+        try:
+            source = open(path, 'rb')
+        except IOError:
+            self.send_error(404, 'File not found')
+            return None
+        stat = os.fstat(source.fileno())
+        etag = '"%x-%x-%x"' % (
+            stat.st_ino, stat.st_size, int(stat.st_mtime * 1000000)
+        )
+        last_modified = self.date_time_string(stat.st_mtime)
+        if self._is_not_modified(etag, stat.st_mtime):
+            source.close()
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            if compressible:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+        # A range is only sent if the client's copy is the version we have -
+        # otherwise If-Range asks for the whole file
+        byte_range = None
+        if_range = self.headers.get('If-Range')
+        if if_range is None or if_range.strip() in [etag, last_modified]:
+            byte_range = _get_byte_range(
+                self.headers.get('Range'), stat.st_size
+            )
+        if byte_range is not None and byte_range[0] >= stat.st_size:
+            source.close()
+            self.send_response(416)
+            self.send_header('Content-Range', 'bytes */%d' % stat.st_size)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+        start, end = 0, stat.st_size - 1
+        if byte_range is None:
+            self.send_response(200)
+        else:
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header(
+                'Content-Range', 'bytes %d-%d/%d' % (start, end, stat.st_size)
+            )
+        self.send_header('Content-Type', content_type or self.guess_type(path))
+        if content_encoding is not None:
+            self.send_header('Content-Encoding', content_encoding)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        self.send_range = (start, end - start + 1)
+        return source
+
+    def _send_compressible(
+            self, content_type, etag, data, compressed, send_body):
+        # Sent compressed to clients that accept it. Each encoding is a
+        # different representation, so gets a different ETag
+        encoding = self._get_content_encoding(compressed)
+        if encoding is not None:
+            etag = '%s-%s"' % (etag[:-1], encoding)
+            data = compressed[encoding]
+        if self._is_not_modified(etag, None):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        # Revalidated every time, as directories can change at any moment
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def _send_manifest(self, send_body):
+        location = self._get_requested_location(MANIFESTS.root_dir)
+        manifest = None
+        if location is not None:
+            # A directory that can't be listed gets an error, rather than the
+            # connection dropped
+            try:
+                manifest = MANIFESTS.get(location)
+            except Exception as exptn:
+                print('WARNING: Error listing %s: %s' % (location, exptn))
+                self.send_error(500, 'Couldn\'t list directory')
+                return
+        if manifest is None:
+            self.send_error(404, 'File not found')
+            return
+        etag, data, compressed = manifest
+        self._send_compressible(
+            'application/json', etag, data, compressed, send_body
+        )
+
+    def _send_client_page(self, send_body):
+        if self._get_requested_location(MANIFESTS.root_dir) is None:
+            self.send_error(404, 'File not found')
+            return
+        etag, html, compressed = MANIFESTS.client_page
+        self._send_compressible(
+            'text/html; charset=utf-8', etag, html, compressed, send_body
+        )
+
+    def _send_index_page(self, page, send_body):
+        location = self._get_requested_location(DIRECTORY_LISTINGS.root_dir)
+        html = None
+        if location is not None:
+            html = DIRECTORY_LISTINGS.get_page(location, page)
+        if html is None:
+            self.send_error(404, 'File not found')
+            return
+        if isinstance(html, tuple):
+            etag, html, compressed = html
+            self._send_compressible(
+                'text/html', etag, html, compressed, send_body
+            )
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        # Pages being rendered are sent as they're rendered, so the browser
+        # can start showing them straight away. Without chunked encoding, the
+        # end of the page is marked by closing the connection
+        chunked = self.request_version != 'HTTP/1.0'
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = 1
+        self.end_headers()
+        if not send_body:
+            return
+        for chunk in html:
+            if not chunk:
+                continue
+            if chunked:
+                chunk = '%x\r\n%s\r\n' % (len(chunk), chunk)
+            self.wfile.write(chunk)
+            self.wfile.flush()
+        if chunked:
+            self.wfile.write('0\r\n\r\n')
+
+    def _send_thumbnail(self, send_body):
+        # Thumbnail URLs look like /__thumb/<thumbnail ID>.<format>, and those
+        # of full-size conversions /__full/<thumbnail ID>.<format>
+        name = urlparse.urlsplit(self.path).path.rsplit('/', 1)[-1]
+        thumbnail_id = name.split('.', 1)[0]
+        key = None
+        if IMAGE_CACHE is not None:
+            key = IMAGE_CACHE.get_source(thumbnail_id)
+        if key is None:
+            self.send_error(404, 'Thumbnail not found')
+            return
+        path, mtime, width = key[0], key[1], key[3]
+        # If the image has changed since its index was generated, this URL no
+        # longer refers to anything we can serve
+        if _get_thumbnail_key(*os.path.split(path), width=width) != key:
+            self.send_error(404, 'Thumbnail out of date')
+            return
+        etag = '"%s"' % thumbnail_id
+        if self._is_not_modified(etag, mtime):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        encoded = _get_thumbnail_data_from_file(
+            *os.path.split(path), width=width
+        )
+        if encoded is None:
+            self.send_error(404, 'Thumbnail not available')
+            return
+        image_format, data = encoded
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/%s' % image_format.lower())
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.date_time_string(mtime))
+        self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def _accepts_encoding(self, encoding):
+        # Accept-Encoding lists codings with optional q-values, where q=0
+        # means the coding mustn't be used
+        for coding in self.headers.get('Accept-Encoding', '').split(','):
+            parts = [part.strip() for part in coding.split(';')]
+            if parts[0].lower() != encoding:
+                continue
+            for parameter in parts[1:]:
+                name, _, value = parameter.partition('=')
+                if name.strip() == 'q':
+                    try:
+                        return float(value) > 0
+                    except ValueError:
+                        return False
+            return True
+        return False
+
+    def _is_not_modified(self, etag, mtime):
+        # If-None-Match takes precedence over If-Modified-Since when both are
+        # given, as per RFC 7232
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return etag in tags or '*' in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None and mtime is not None:
+            parsed = email.utils.parsedate_tz(if_modified_since)
+            if parsed is not None:
+                return int(mtime) <= email.utils.mktime_tz(parsed)
+        return False
+
+    def _handle(self, send_body):
+        start = time.time()
+        if BACKGROUND_INDEXER is not None:
+            self._prioritise_request()
+        if self.path.startswith(THUMBNAIL_URL_PREFIX):
+            route = 'thumbnail'
+            self._send_thumbnail(send_body)
+        elif self.path.startswith(FULL_SIZE_URL_PREFIX):
+            route = 'full_size'
+            self._send_thumbnail(send_body)
+        elif urlparse.urlsplit(self.path).path == METRICS_URL_PATH:
+            route = 'metrics'
+            self._send_metrics(send_body)
+        elif MANIFESTS is not None and self._get_requested_file_name() == \
+                MANIFEST_FILE_NAME:
+            route = 'manifest'
+            self._send_manifest(send_body)
+        elif MANIFESTS is not None and self._get_requested_file_name() == \
+                CLIENT_FILE_NAME:
+            route = 'client'
+            self._send_client_page(send_body)
+        elif DIRECTORY_LISTINGS is not None and \
+                self._get_requested_page() is not None:
+            route = 'index'
+            self._send_index_page(self._get_requested_page(), send_body)
+        elif send_body:
+            route = 'file'
+            SimpleHTTPServer.SimpleHTTPRequestHandler.do_GET(self)
+        else:
+            route = 'file'
+            SimpleHTTPServer.SimpleHTTPRequestHandler.do_HEAD(self)
+        if METRICS is not None:
+            METRICS.observe(
+                'imageme_request_duration_seconds', 'route', route,
+                time.time() - start
+            )
+
+    def _prioritise_request(self):
+        # Have the background indexer get on with whatever's being looked at.
+        # Until it does, index files show the originals, so those being
+        # requested are the images to thumbnail first
+        location = self._get_requested_location(BACKGROUND_INDEXER.dir_path)
+        if location is None:
+            return
+        file_name = os.path.basename(self.translate_path(self.path))
+        if _is_image_file(file_name):
+            BACKGROUND_INDEXER.prioritise(location, file_name)
+        elif file_name in ['', MANIFEST_FILE_NAME, CLIENT_FILE_NAME] or \
+                _get_index_page_number(file_name) is not None:
+            BACKGROUND_INDEXER.prioritise(location)
+
+    def _send_metrics(self, send_body):
+        if METRICS is None:
+            self.send_error(404, 'Metrics not enabled')
+            return
+        text = METRICS.get_text()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(text)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(text)
+
+    def _sendfile(self, source, offset, length):
+        out_fd = self.connection.fileno()
+        while length > 0:
+            try:
+                sent = sendfile(
+                    out_fd, source.fileno(), offset,
+                    min(length, SEND_CHUNK_BYTES)
+                )
+            except OSError as exptn:
+                if exptn.errno not in [errno.EAGAIN, errno.EWOULDBLOCK]:
+                    raise
+                # The socket is non-blocking underneath while it has a
+                # timeout, so wait for room in it as socket.sendall would
+                if not select.select([], [out_fd], [], self.timeout)[1]:
+                    raise socket.timeout('timed out')
+                continue
+            if sent == 0:
+                break
+            offset += sent
+            length -= sent
+        return length
+
+    def copyfile(self, source, outputfile):
+        send_range, self.send_range = self.send_range, None
+        if send_range is None:
+            SimpleHTTPServer.SimpleHTTPRequestHandler.copyfile(
+                self, source, outputfile
+            )
+            return
+        offset, length = send_range
+        # The headers have to be on their way before sendfile writes straight
+        # to the socket
+        outputfile.flush()
+        if SENDFILE_ENABLED:
+            length = self._sendfile(source, offset, length)
+        else:
+            source.seek(offset)
+            while length > 0:
+                chunk = source.read(min(length, SEND_CHUNK_BYTES))
+                if not chunk:
+                    break
+                outputfile.write(chunk)
+                length -= len(chunk)
+        # If the file's shrunk since we said how long it was, the client will
+        # be left waiting for the rest, so don't keep the connection
+        if length > 0:
+            self.close_connection = 1
+
+    def _wait_for_request(self):
+        # A request already read into the buffer (pipelined behind the last)
+        # needn't be waited for
+        buffered = getattr(self.rfile, '_rbuf', None)
+        if buffered is not None:
+            buffered.seek(0, 2)
+            if buffered.tell() > 0:
+                return True
+        return bool(select.select(
+            [self.connection], [], [], KEEP_ALIVE_TIMEOUT
+        )[0])
+
+    def do_GET(self):
+        self._handle(True)
+
+    def do_HEAD(self):
+        self._handle(False)
+
+    def handle(self):
+        # As BaseHTTPRequestHandler.handle, except that a kept alive connection
+        # is only waited on for KEEP_ALIVE_TIMEOUT between requests, rather
+        # than holding its thread for the full socket timeout
+        self.close_connection = 1
+        self.handle_one_request()
+        while not self.close_connection and self._wait_for_request():
+            self.handle_one_request()
+
+    def send_response(self, code, message=None):
+        if METRICS is not None:
+            METRICS.count('imageme_responses_total', 'code', str(code))
+        SimpleHTTPServer.SimpleHTTPRequestHandler.send_response(
+            self, code, message
+        )
+
+    def send_head(self):
+        self.send_range = None
+        if self._is_cache_path(self.translate_path(self.path)):
+            self.send_error(404, 'File not found')
+            return None
+        parts = urlparse.urlsplit(self.path)
+        # Serve imageme.html?page=N from the page's own index file
+        page = self._get_requested_page()
+        if page is not None and page > 1:
+            self.path = parts.path.rsplit('/', 1)[0] + '/' + \
+                _get_index_file_name(page)
+            parts = urlparse.urlsplit(self.path)
+        # SimpleHTTPRequestHandler redirects directory paths missing their
+        # trailing slash without a Content-Length, which would leave keep-alive
+        # clients waiting for a body
+        if not parts.path.endswith('/') and \
+                os.path.isdir(self.translate_path(self.path)):
+            self.send_response(301)
+            self.send_header('Location', urlparse.urlunsplit(
+                (parts[0], parts[1], parts[2] + '/', parts[3], parts[4])
+            ))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+        path = self.translate_path(self.path)
+        if os.path.isfile(path) and page is not None:
+            # Index files are sent as one of their precompressed copies, where
+            # the client accepts it and one's been written
+            encodings = [
+                encoding for encoding in COMPRESSION_ENCODINGS
+                if os.path.isfile(path + COMPRESSED_FILE_SUFFIXES[encoding])
+            ]
+            encoding = self._get_content_encoding(encodings)
+            if encoding is not None:
+                return self._send_file_head(
+                    path + COMPRESSED_FILE_SUFFIXES[encoding], 'text/html',
+                    encoding
+                )
+            return self._send_file_head(path, 'text/html')
+        if os.path.isfile(path):
+            return self._send_file_head(path)
+        return SimpleHTTPServer.SimpleHTTPRequestHandler.send_head(self)
+
+class ImageMeServer(SocketServer.TCPServer):
+    """
+    A TCPServer handling requests concurrently on a fixed pool of threads, so
+    one slow client can't hold up everyone else. Accepted connections queue
+    for a free thread, which keeps the number of threads bounded no matter how
+    many clients connect (unlike SocketServer.ThreadingMixIn, which starts a
+    new thread per connection).
+    """
+
+    # Make re-runs of the script less painful - otherwise waiting for the
+    # address to be freed after the last run can block a subsequent run
+    allow_reuse_address = True
+
+    def __init__(
+            self, server_address, handler_class, threads=SERVER_THREADS):
+        SocketServer.TCPServer.__init__(self, server_address, handler_class)
+        self.connections = Queue.Queue(threads)
+        self.threads = []
+        for _ in range(threads):
+            thread = threading.Thread(target=self._handle_connections)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def _handle_connections(self):
+        while True:
+            request, client_address = self.connections.get()
+            # A None request tells us the server is closing
+            if request is None:
+                return
+            try:
+                _profiled(self.finish_request, request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        # Blocks while all the threads are busy and the queue is full
+        self.connections.put((request, client_address))
+
+    def server_close(self):
+        SocketServer.TCPServer.server_close(self)
+        for _ in self.threads:
+            self.connections.put((None, None))
+        # Give in-progress requests a moment to finish
+        deadline = time.time() + 1
+        for thread in self.threads:
+            thread.join(max(0, deadline - time.time()))
+
+class ImageMetadata(collections.namedtuple('ImageMetadata', [
+        'path', 'mtime', 'size', 'format', 'width', 'height', 'image'])):
+    """
+    What we know about a version of an image file - its absolute path, mtime,
+    size, PIL format and dimensions. Built once per image by
+    _get_image_metadata and shared by everything that needs any of it.
+
+    If the image had to be opened to read its header, image is the open
+    PIL.Image, so that a consumer needing its pixels can use it rather than
+    opening the file again. Otherwise (and once it has been consumed) it is
+    None.
+    """
+    __slots__ = ()
+
+class ImageTree:
+    """
+    An in-memory index of a directory tree - each directory's subdirectories,
+    image files and the images' stats - which index generation walks instead
+    of the filesystem. The stats taken while scanning are reused for
+    directory signatures and thumbnail cache keys, rather than statting every
+    image again.
+
+    Scanning uses scandir where available (see SCANDIR_ENABLED), and spreads
+    the subtrees across SCAN_THREADS threads, since it spends most of its time
+    waiting on the filesystem. Directories are kept as they were when last
+    scanned until they're scanned again, or asked for with get_current.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # ImageDirectory records by location
+        self.directories = {}
+        # Locations whose records are to be replaced when next asked for with
+        # get_current, however they look
+        self.invalidated = set()
+
+    def get(self, location):
+        """
+        Get what the last scan of the given directory found.
+
+        @param {String} location - The directory
+
+        @return {ImageDirectory} The directory's record, or None if it hasn't
+            been scanned.
+        """
+        with self.lock:
+            return self.directories.get(location)
+
+    def get_current(self, location):
+        """
+        Get the given directory as it is now. It's scanned again if its mtime
+        shows it's changed since the last scan, which catches images being
+        added, removed or renamed, or if it's been invalidated since. Images
+        modified in place are only noticed once it's invalidated (as
+        DirectoryWatcher does).
+
+        @param {String} location - The directory
+
+        @return {ImageDirectory} The directory's record, or None if there's no
+            such directory.
+        """
+        try:
+            mtime = os.stat(location).st_mtime
+        except OSError:
+            return None
+        with self.lock:
+            directory = self.directories.get(location)
+            invalidated = location in self.invalidated
+        if directory is not None and directory.mtime == mtime and \
+                not invalidated:
+            return directory
+        try:
+            return self.scan_directory(location)
+        except OSError:
+            return None
+
+    def get_stat(self, location, image_file):
+        """
+        Get an image's stats as of the last scan of its directory.
+
+        @param {String} location - The directory containing the image file
+
+        @param {String} image_file - The filename of the image file within
+            location
+
+        @return {(Float, Integer)} The image's mtime and size, or None if they
+            aren't known.
+        """
+        directory = self.get(location)
+        if directory is None:
+            return None
+        return directory.image_stats.get(image_file)
+
+    def invalidate(self, location):
+        """
+        Have the given directory scanned again next time it's asked for with
+        get_current, even if its mtime hasn't changed.
+
+        @param {String} location - The directory
+        """
+        with self.lock:
+            self.invalidated.add(location)
+
+    def scan(self, root_dir, threads=SCAN_THREADS):
+        """
+        Scan the tree from the given directory downwards, replacing the records
+        of every directory in it. Directories which can't be read are skipped,
+        as os.walk skips them.
+
+        @param {String} root_dir - The top level directory to scan down from
+
+        @param {Integer=SCAN_THREADS} threads - The number of threads to scan
+            with
+
+        @return {None}
+        """
+        pending = Queue.Queue()
+        def _scan_subtrees():
+            while True:
+                location = pending.get()
+                if location is None:
+                    return
+                try:
+                    directory = self.scan_directory(location)
+                except OSError as exptn:
+                    print('WARNING: Error scanning %s: %s' % (location, exptn))
+                else:
+                    # Queued before this one's marked done, so the join below
+                    # can't return until the whole tree is scanned
+                    for subdir in directory.dirs:
+                        if subdir not in directory.linked_dirs:
+                            pending.put(os.path.join(location, subdir))
+                finally:
+                    pending.task_done()
+        scanners = [
+            threading.Thread(target=_scan_subtrees)
+            for _ in range(max(1, threads))
+        ]
+        for scanner in scanners:
+            scanner.daemon = True
+            scanner.start()
+        pending.put(root_dir)
+        pending.join()
+        for scanner in scanners:
+            pending.put(None)
+        for scanner in scanners:
+            scanner.join()
+
+    def scan_directory(self, location):
+        """
+        Scan a single directory, replacing its record.
+
+        @param {String} location - The directory to scan
+
+        @return {ImageDirectory} The directory's new record.
+        """
+        directory = _scan_image_dir(location)
+        with self.lock:
+            self.directories[location] = directory
+            self.invalidated.discard(location)
+        return directory
+
+    def walk(self, root_dir):
+        """
+        Walk the tree from the given directory downwards, in the same order as
+        os.walk. The tree is scanned first if the directory hasn't been.
+
+        @param {String} root_dir - The top level directory to walk down from
+
+        @return {Generator} Yields a (location, subdirectories, image files)
+            tuple for each directory, with the subdirectories and image files
+            sorted by name.
+        """
+        if self.get(root_dir) is None:
+            self.scan(root_dir)
+        locations = [root_dir]
+        while locations:
+            directory = self.get(locations.pop())
+            if directory is None:
+                continue
+            yield (
+                directory.location, list(directory.dirs),
+                list(directory.image_files)
+            )
+            locations.extend(
+                os.path.join(directory.location, subdir)
+                for subdir in reversed(directory.dirs)
+                if subdir not in directory.linked_dirs
+            )
+
+class ManifestCache:
+    """
+    An in-memory cache of the served directories' manifests (see
+    _get_manifest), and of the page that renders them (see _get_client_page).
+    Each is kept compressed as well (see _get_compressed_data), so it's
+    compressed once rather than for every request, with an ETag for
+    revalidating it.
+
+    As with DirectoryListingCache, nothing is listed until it's first asked
+    for, and manifests are made afresh whenever IMAGE_TREE's listing of their
+    directory changes.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.lock = threading.Lock()
+        # Manifests by location, as (ImageDirectory the manifest is made from,
+        # ETag, JSON, compressed JSON by encoding) tuples
+        self.manifests = {}
+        html = _get_client_page()
+        self.client_page = (
+            '"%s"' % hashlib.sha1(html).hexdigest(), html,
+            _get_compressed_data(html)
+        )
+
+    def get(self, location):
+        """
+        Get the given directory's manifest, listing it if need be.
+
+        @param {String} location - The directory, within root_dir
+
+        @return {(String, String, Dict)} The manifest's (ETag, JSON, compressed
+            JSON by encoding), or None if there's no such directory.
+        """
+        directory = IMAGE_TREE.get_current(location)
+        if directory is None:
+            return None
+        with self.lock:
+            manifest = self.manifests.get(location)
+        if manifest is not None and manifest[0] is directory:
+            return manifest[1:]
+        data = _get_manifest(
+            self.root_dir, location, directory.image_files, directory.dirs
+        )
+        manifest = (
+            directory, '"%s"' % hashlib.sha1(data).hexdigest(), data,
+            _get_compressed_data(data)
+        )
+        with self.lock:
+            self.manifests[location] = manifest
+        return manifest[1:]
+
+class Metrics:
+    """
+    Timings of imageMe's expensive functions and of the requests it serves,
+    along with counts of its responses, for exposing in Prometheus text format
+    at METRICS_URL_PATH. Timings are counted in METRICS_BUCKETS, and the files
+    behind the slowest calls of each function are kept, so pathological images
+    can be found.
+
+    In thumbnail worker processes, timings are also kept aside to be sent back
+    to the parent process, which merges them into its own Metrics. Files are
+    labelled by their path within the served directory, so the same file
+    always gets the same label, and where it is on the server isn't given
+    away.
+    """
+
+    # Types and descriptions of the metrics, by name
+    DESCRIPTIONS = {
+        'imageme_function_duration_seconds':
+            ('histogram', 'Time spent in imageMe\'s expensive functions'),
+        'imageme_request_duration_seconds':
+            ('histogram', 'Time spent handling requests, by route'),
+        'imageme_responses_total':
+            ('counter', 'Responses sent, by status code'),
+        'imageme_slowest_call_seconds':
+            ('gauge', 'The slowest calls of each timed function, by file')
+    }
+
+    def __init__(self, root_dir=None, forward=False):
+        # The served directory, which file paths are made relative to. Worker
+        # processes leave that to the parent
+        self.root_dir = root_dir
+        self.lock = threading.Lock()
+        # Histograms, as [bucket counts, count, sum] by (metric, label name,
+        # label value)
+        self.histograms = {}
+        # Counters by (metric, label name, label value)
+        self.counters = collections.defaultdict(int)
+        # The slowest calls' seconds by path, by function name. Only a file's
+        # slowest call is kept
+        self.slowest = collections.defaultdict(dict)
+        # Function timings to be sent back to the parent process, if we're in
+        # a worker
+        self.forwarded = [] if forward else None
+
+    def count(self, metric, label_name, label_value):
+        """
+        Add one to a counter.
+        """
+        with self.lock:
+            self.counters[(metric, label_name, label_value)] += 1
+
+    def drain(self):
+        """
+        Take the function timings recorded since last drained, to be sent back
+        to the parent process. See merge.
+
+        @return {[Tuple]} The (function name, seconds, path) timings, or None
+            if timings aren't being kept aside.
+        """
+        with self.lock:
+            forwarded = self.forwarded
+            if forwarded is not None:
+                self.forwarded = []
+        return forwarded
+
+    def get_text(self):
+        """
+        Get all the metrics in Prometheus text exposition format.
+
+        @return {String} The metrics.
+        """
+        lines = []
+        with self.lock:
+            by_metric = collections.defaultdict(list)
+            for key, value in self.histograms.items():
+                by_metric[key[0]].append((key[1:], value))
+            for key, value in self.counters.items():
+                by_metric[key[0]].append((key[1:], value))
+            for function_name, calls in self.slowest.items():
+                for path, seconds in calls.items():
+                    by_metric['imageme_slowest_call_seconds'].append((
+                        ('function', function_name, 'path', path), seconds
+                    ))
+            for metric in sorted(by_metric):
+                metric_type, description = self.DESCRIPTIONS[metric]
+                lines += [
+                    '# HELP %s %s' % (metric, description),
+                    '# TYPE %s %s' % (metric, metric_type)
+                ]
+                for labels, value in sorted(by_metric[metric]):
+                    label_text = ','.join(
+                        '%s="%s"' % (
+                            labels[i], _get_metrics_label(labels[i + 1])
+                        )
+                        for i in range(0, len(labels), 2)
+                    )
+                    if metric_type != 'histogram':
+                        lines.append('%s{%s} %r' % (metric, label_text, value))
+                        continue
+                    buckets, count, total = value
+                    for bound, bucket_count in zip(
+                            METRICS_BUCKETS + ['+Inf'], buckets + [count]):
+                        lines.append('%s_bucket{%s,le="%s"} %d' % (
+                            metric, label_text, bound, bucket_count
+                        ))
+                    lines += [
+                        '%s_sum{%s} %r' % (metric, label_text, total),
+                        '%s_count{%s} %d' % (metric, label_text, count)
+                    ]
+        return '\n'.join(lines) + '\n'
+
+    def merge(self, timings):
+        """
+        Record function timings sent back from a worker process.
+
+        @param {[Tuple]} timings - The (function name, seconds, path) timings,
+            from the worker's drain
+        """
+        for function_name, seconds, path in timings or []:
+            self.observe(
+                'imageme_function_duration_seconds', 'function', function_name,
+                seconds, path
+            )
+
+    def observe(self, metric, label_name, label_value, seconds, path=None):
+        """
+        Record a timing. For function timings, the path of the file the call
+        was for may be given, and is kept if it's one of the slowest calls.
+        """
+        with self.lock:
+            key = (metric, label_name, label_value)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = \
+                    [[0] * len(METRICS_BUCKETS), 0, 0.0]
+            for i, bound in enumerate(METRICS_BUCKETS):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += 1
+            histogram[2] += seconds
+            if path is not None and self.root_dir is not None:
+                path = os.path.relpath(path, self.root_dir)
+            if path is not None:
+                slowest = self.slowest[label_value]
+                if seconds > slowest.get(path, 0):
+                    slowest[path] = seconds
+                    if len(slowest) > METRICS_SLOWEST_CALLS:
+                        del slowest[min(slowest, key=slowest.get)]
+            if self.forwarded is not None and \
+                    metric == 'imageme_function_duration_seconds':
+                self.forwarded.append((label_value, seconds, path))
+
+def _timed(path_args=()):
+    """
+    Decorate a function so its calls are timed in METRICS. Defined ahead of the
+    other functions, as it's used on them.
+
+    @param {Tuple=()} path_args - The indexes of the positional arguments which
+        make up the path of the file a call is for, when joined together
+
+    @return {Function} The decorator.
+    """
+    def _decorator(function):
+        @functools.wraps(function)
+        def _timed_function(*args, **kwargs):
+            if METRICS is None:
+                return function(*args, **kwargs)
+            start = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                path = None
+                if path_args and len(args) > max(path_args) and all(
+                        isinstance(args[i], basestring) for i in path_args):
+                    path = os.path.join(*[args[i] for i in path_args])
+                METRICS.observe(
+                    'imageme_function_duration_seconds', 'function',
+                    function.__name__, time.time() - start, path
+                )
+        return _timed_function
+    return _decorator
+
 def _clean_up(paths):
     """
     Clean up after ourselves, removing created files.
 
     @param {[String]} A list of file paths specifying the files we've created
-        during run. Will all be deleted.
+        during run. Will all be deleted, along with any precompressed copies.
 
     @return {None}
     """
@@ -67,13 +2056,22 @@ def _clean_up(paths):
     # Iterate over the given paths, unlinking them
     for path in paths:
         print('Removing %s' % path)
-        os.unlink(path)
+        try:
+            os.unlink(path)
+        except OSError as exptn:
+            # The directory may have been removed while we were running
+            print('Couldn\'t remove %s: %s' % (path, exptn))
+        for compressed_file_path in _get_compressed_file_paths(path):
+            os.unlink(compressed_file_path)
 
+@_timed((1,))
 def _create_index_file(
-        root_dir, location, image_files, dirs, force_no_processing=False):
+        root_dir, location, image_files, dirs, force_no_processing=False,
+        ready_only=False, pages=None):
     """
     Create an index file in the given location, supplying known lists of
-    present image files and subdirectories.
+    present image files and subdirectories. Directories with more than
+    IMAGES_PER_PAGE images get an index file per page.
 
     @param {String} root_dir - The root directory of the entire crawl. Used to
         ascertain whether the given location is the top level.
@@ -91,13 +2089,151 @@ def _create_index_file(
         actually process thumbnails, PIL images or anything. Simply index
         <img> tags with original file src attributes.
 
-    @return {String} The full path (location plus filename) of the newly
-        created index file. Intended for usage cleaning up created files.
+    @param {Boolean=False} ready_only - If True, only use thumbnails which are
+        already cached, indexing the other images as with force_no_processing.
+        For showing the progress of a directory being thumbnailed.
+
+    @param {Set=None} pages - If given, only these pages are generated, and
+        the others are left as they were unless they've not been written yet.
+        For rewriting just the pages of a directory being thumbnailed whose
+        thumbnails have changed.
+
+    @return {[String]} The full paths (location plus filename) of the newly
+        created index files, first page first. Intended for usage cleaning up
+        created files.
     """
-    # Put together HTML as a list of the lines we'll want to include
-    # Issue #2 exists to do this better than HTML in-code
+    # If the directory hasn't changed since its index was last generated, we
+    # can write that straight back out. It's better than an unprocessed index
+    # too, so is used even if we've been told not to process anything
+    signature, stored = _get_stored_index(root_dir, location, image_files, dirs)
+    index_file_paths = []
+    if stored is not None:
+        pages, thumbnail_keys = stored
+        for key in thumbnail_keys:
+            IMAGE_CACHE.put_source(_get_thumbnail_id(key), *key)
+        for page, html in enumerate(pages, 1):
+            index_file_paths.append(_write_index_file(location, [html], page))
+    else:
+        thumbnail_keys = []
+        page_count = _get_page_count(len(image_files))
+        # Fully processed indexes are stored, so they can be reused while the
+        # directory stays the same. These reference thumbnails by URL, so are
+        # small enough to keep hold of as they're written
+        store = signature is not None and not force_no_processing and \
+            not ready_only and pages is None
+        stored_pages = []
+        # Actually create the files, writing each page out as it's generated
+        # rather than putting it all together in memory first
+        for page in range(1, page_count + 1):
+            if pages is not None and page not in pages and \
+                    os.path.exists(_get_index_file_path(location, page)):
+                index_file_paths.append(_get_index_file_path(location, page))
+                continue
+            chunks = [] if store else None
+            index_file_paths.append(_write_index_file(
+                location,
+                _generate_index_page(
+                    root_dir, location, image_files, dirs, page, page_count,
+                    force_no_processing, thumbnail_keys=thumbnail_keys,
+                    ready_only=ready_only
+                ),
+                page, written=chunks
+            ))
+            if store:
+                stored_pages.append(''.join(chunks))
+        if store:
+            IMAGE_CACHE.put_directory(
+                location, signature, stored_pages, thumbnail_keys
+            )
+    # Remove any pages left over from when the directory held more images
+    page = len(index_file_paths) + 1
+    while os.path.exists(_get_index_file_path(location, page)):
+        print('Removing %s' % _get_index_file_path(location, page))
+        os.unlink(_get_index_file_path(location, page))
+        for compressed_file_path in _get_compressed_file_paths(
+                _get_index_file_path(location, page)):
+            os.unlink(compressed_file_path)
+        page += 1
+    return index_file_paths
+
+def _create_index_files(root_dir, force_no_processing=False):
+    """
+    Crawl the root directory downwards, generating an index HTML file in each
+    directory on the way down.
+
+    @param {String} root_dir - The top level directory to crawl down from. In
+        normal usage, this will be '.'.
+
+    @param {Boolean=False} force_no_processing - If True, do not attempt to
+        actually process thumbnails, PIL images or anything. Simply index
+        <img> tags with original file src attributes.
+
+    @return {[String]} Full file paths of all created files.
+    """
+    # Initialise list of created file paths to build up as we make them
+    created_files = []
+    # Walk the root dir downwards, creating index files as we go
+    for here, dirs, image_files in _walk_image_dirs(root_dir):
+        print('Processing %s' % here)
+        # Create this directory's index file and add its name to the created
+        # files list
+        created_files += _create_index_file(
+            root_dir, here, image_files, dirs, force_no_processing
+        )
+    # Return the list of created files
+    return created_files
+
+def _generate_index_page(
+        root_dir, location, image_files, dirs, page, page_count,
+        force_no_processing=False, defer_thumbnails=False,
+        thumbnail_keys=None, ready_only=False):
+    """
+    Generate the HTML of one page of a directory's index, a piece at a time.
+    Each image's table cell is yielded as soon as its thumbnail is ready, so
+    the page can be written or sent as it's generated, and only one image's
+    data is held in memory at once.
+
+    @param {String} root_dir - The root directory of the entire crawl. Used to
+        ascertain whether the given location is the top level.
+
+    @param {String} location - The directory the index is for
+
+    @param {[String]} image_files - All the image file names in the location.
+        Those on this page will be displayed in its gallery.
+
+    @param {[String]} dirs - The subdirectories of the location directory
+
+    @param {Integer} page - The page to generate, counting from 1
+
+    @param {Integer} page_count - The number of pages in the index
+
+    @param {Boolean=False} force_no_processing - If True, do not attempt to
+        actually process thumbnails, PIL images or anything. Simply index
+        <img> tags with original file src attributes.
+
+    @param {Boolean=False} defer_thumbnails - If True, reference thumbnails by
+        URL without waiting for them to be generated. See
+        _get_thumbnail_src_from_file.
+
+    @param {[Tuple]=None} thumbnail_keys - If given, the cache keys of the
+        thumbnails the page references are appended to this list as they're
+        generated.
+
+    @param {Boolean=False} ready_only - If True, only use thumbnails which are
+        already cached. See _get_image_entry.
+
+    @return {Generator} Yields the page's HTML in chunks.
+    """
+    if thumbnail_keys is None:
+        thumbnail_keys = []
+    # Put together HTML as lists of the lines we'll want to include, yielding
+    # each list as it's finished. Issue #2 exists to do this better than HTML
+    # in-code
     header_text = \
         'imageMe: ' + location + ' [' + str(len(image_files)) + ' image(s)]'
+    # How wide the images are shown, so the browser can pick which of their
+    # thumbnails to fetch - a column of the page, less its padding
+    img_sizes = 'calc((100vw - 8em) / %d)' % IMAGES_PER_ROW
     html = [
         '<!DOCTYPE html>',
         '<html>',
@@ -111,7 +2247,12 @@ def _create_index_file(
         '                padding-left: 4em;',
         '                padding-right: 4em;',
         '            }',
-        '            .image {max-width: 100%; border-radius: 0.3em;}',
+        '            .image {',
+        '                max-width: 100%;',
+        '                height: auto;',
+        '                border-radius: 0.3em;',
+        '            }',
+        '            table {width: 100%; table-layout: fixed;}',
         '            td {width: ' + str(100.0 / IMAGES_PER_ROW) + '%;}',
         '        </style>',
         '    </head>',
@@ -135,24 +2276,60 @@ def _create_index_file(
             '    <a href="' + link + '">' + directory + '</a>',
             '    </h3>'
         ]
+    # Links to the neighbouring pages, shown above and below the gallery
+    page_links = []
+    if page_count > 1:
+        if page > 1:
+            page_links.append(
+                '<a href="' + _get_index_file_name(page - 1) + \
+                    '">&laquo; Previous</a>'
+            )
+        page_links.append('Page %d of %d' % (page, page_count))
+        if page < page_count:
+            page_links.append(
+                '<a href="' + _get_index_file_name(page + 1) + \
+                    '">Next &raquo;</a>'
+            )
+        page_links = [
+            '    <h3 class="header">' + ' | '.join(page_links) + '</h3>'
+        ]
+    html += ['<hr>'] + page_links
     # Populate the image gallery table
     # Counter to cycle down through table rows
     table_row_count = 1
-    html += ['<hr>', '<table>']
-    # For each image file, potentially create a new <tr> and create a new <td>
-    for image_file in image_files:
+    html += ['<table>']
+    yield '\n'.join(html) + '\n'
+    # For each image file on this page, potentially create a new <tr> and
+    # create a new <td>
+    page_size = IMAGES_PER_PAGE or len(image_files)
+    for image_file in image_files[(page - 1) * page_size:page * page_size]:
+        html = []
         if table_row_count == 1:
             html.append('<tr>')
-        img_src = _get_thumbnail_src_from_file(
-            location, image_file, force_no_processing
-        )
-        link_target = _get_image_link_target_from_file(
-            location, image_file, force_no_processing
+        entry, keys = _get_image_entry(
+            location, image_file, force_no_processing, defer_thumbnails,
+            ready_only=ready_only
         )
+        thumbnail_keys += keys
+        # Give the browser the thumbnail's dimensions if we know them, so it
+        # can lay out the page before the images arrive
+        img_size = ''
+        if 'thumbnail_width' in entry:
+            img_size = ' width="%d" height="%d"' % (
+                entry['thumbnail_width'], entry['thumbnail_height']
+            )
+        img_srcset = ''
+        if 'srcset' in entry:
+            img_srcset = ' srcset="%s" sizes="%s"' % (
+                entry['srcset'], img_sizes
+            )
+        # Images are only fetched as they're scrolled into view, so the page
+        # shows just as quickly however many there are
         html += [
             '    <td>',
-            '    <a href="' + link_target + '">',
-            '        <img class="image" src="' + img_src + '">',
+            '    <a href="' + entry['href'] + '">',
+            '        <img class="image" src="' + entry['src'] + '"' + img_size + \
+                img_srcset + ' loading="lazy" decoding="async">',
             '    </a>',
             '    </td>'
         ]
@@ -160,56 +2337,674 @@ def _create_index_file(
             table_row_count = 0
             html.append('</tr>')
         table_row_count += 1
-    html += ['</tr>', '</table>']
+        yield '\n'.join(html) + '\n'
+    html = ['</tr>', '</table>']
+    if page_links:
+        html += ['<hr>'] + page_links
     html += [
         '    </div>',
         '    </body>',
         '</html>'
     ]
-    # Actually create the file, now we've put together the HTML content
-    index_file_path = _get_index_file_path(location)
-    print('Creating index file %s' % index_file_path)
-    index_file = open(index_file_path, 'w')
-    index_file.write('\n'.join(html))
-    index_file.close()
-    # Return the path for cleaning up later
-    return index_file_path
+    yield '\n'.join(html)
 
-def _create_index_files(root_dir, force_no_processing=False):
+def _generate_thumbnail_data(dir_path, image_file, img=None, width=None):
     """
-    Crawl the root directory downwards, generating an index HTML file in each
-    directory on the way down.
+    Generate the encoded thumbnails of the given image file, without consulting
+    the cache. GIFs get a GIF thumbnail, animated if the original is (see
+    _get_gif_thumbnail_data). Other images get a still thumbnail of each of
+    their widths (see _get_thumbnail_widths), all from one decode of the image.
 
-    @param {String} root_dir - The top level directory to crawl down from. In
-        normal usage, this will be '.'.
+    @param {String} dir_path - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within dir_path
+
+    @param {PIL.Image=None} img - The image file, if already opened. This may
+        be modified in place.
+
+    @param {Integer=None} width - 0 to get a full-size conversion to a format
+        browsers can display, rather than thumbnails.
+
+    @return {Dict} (format, data) tuples of the thumbnails' format names and
+        encoded bytes, by width, or None if they couldn't be generated.
+    """
+    if img is None:
+        img = _get_image_from_file(dir_path, image_file)
+    if img is None:
+        return None
+    if width == 0:
+        encoded = _get_data_from_image(img)
+        return None if encoded is None else {0: encoded}
+    if img.format == 'GIF':
+        encoded = _get_gif_thumbnail_data(dir_path, image_file, img)
+        return None if encoded is None else {THUMBNAIL_WIDTH: encoded}
+    thumbnail_format = _get_thumbnail_format(img.format)
+    widths = _get_thumbnail_widths(img.format, img.size[0])
+    img = _get_thumbnail_image_from_file(dir_path, image_file, img)
+    if img is None:
+        return None
+    thumbnails = {}
+    # Each smaller thumbnail is scaled down from the last, which is far
+    # quicker than going back to the image
+    for thumbnail_width in reversed(widths):
+        if thumbnail_width < img.size[0]:
+            img = img.resize((thumbnail_width, max(1, int(
+                thumbnail_width / float(img.size[0]) * img.size[1]
+            ))), RESAMPLE)
+        encoded = _get_data_from_image(img, thumbnail_format)
+        if encoded is None:
+            return None
+        thumbnails[thumbnail_width] = encoded
+    return thumbnails
+
+def _get_8_bit_image(img):
+    """
+    Scale a 16 bit greyscale image, as many TIFF scans are, down to 8 bits.
+    Resampling filters other than NEAREST can't handle 16 bit images, and
+    converting them straight to another mode clips them rather than scaling.
+
+    @param {PIL.Image} img - The image
+
+    @return {PIL.Image} The image in mode 'L' if it was 16 bit, otherwise the
+        image itself.
+    """
+    if not img.mode.startswith('I;16'):
+        return img
+    return img.convert('I').point(lambda value: value * (1 / 256.0)).convert(
+        'L'
+    )
+
+def _get_arguments():
+    """
+    Parse the command line arguments imageMe was run with.
+
+    @return {argparse.Namespace} The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description='imageMe is a super simple image gallery server.'
+    )
+    parser.add_argument(
+        'port', nargs='?', type=int, default=SERVER_PORT,
+        help='Port to run the server on (default %(default)s)'
+    )
+    parser.add_argument(
+        '--port', '-p', type=int, dest='port_option', default=None,
+        help='Port to run the server on, as an alternative to giving it ' \
+            'positionally'
+    )
+    parser.add_argument(
+        '--bind', default='',
+        help='Address to listen on (default all interfaces)'
+    )
+    parser.add_argument(
+        '--threads', type=int, default=SERVER_THREADS,
+        help='Number of threads to handle requests with ' \
+            '(default %(default)s)'
+    )
+    parser.add_argument(
+        '--dynamic', action='store_true',
+        help='Render gallery pages as they\'re requested, rather than ' \
+            'writing index files into every directory before starting'
+    )
+    parser.add_argument(
+        '--page-size', type=int, default=IMAGES_PER_PAGE,
+        help='Number of images per gallery page, or 0 for a single page per ' \
+            'directory (default %(default)s)'
+    )
+    parser.add_argument(
+        '--cache-dir', default=None,
+        help='Directory to keep the thumbnail cache in (default %s in the ' \
+            'served directory, or in memory with --dynamic)' % CACHE_DIR_NAME
+    )
+    parser.add_argument(
+        '--cache-size', type=int, default=CACHE_MAX_BYTES // (1024 * 1024),
+        help='Maximum size of the thumbnail cache in MB, least recently ' \
+            'used thumbnails are evicted above this (default %(default)s)'
+    )
+    parser.add_argument(
+        '--inline-thumbnails', action='store_true',
+        help='Embed thumbnails in the index pages as base64 data, rather ' \
+            'than serving them separately'
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='Don\'t read or write the on-disk thumbnail cache'
+    )
+    parser.add_argument(
+        '--quality', choices=['fast', 'balanced', 'best'],
+        default=THUMBNAIL_QUALITY,
+        help='Thumbnail quality, trading sharpness and size for generation ' \
+            'speed (default %(default)s)'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='Number of processes to generate thumbnails with (default one ' \
+            'per CPU)'
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help='Keep the gallery up to date as images are added, removed and ' \
+            'changed'
+    )
+    parser.add_argument(
+        '--metrics', action='store_true',
+        help='Serve metrics in Prometheus text format at %s' % \
+            METRICS_URL_PATH
+    )
+    parser.add_argument(
+        '--profile', default=None, metavar='FILE',
+        help='Profile background indexing and request handling with ' \
+            'cProfile, writing the stats to FILE on exit. Thumbnails made ' \
+            'by worker processes are only included with --workers 1'
+    )
+    parser.add_argument(
+        '--prune-cache', action='store_true',
+        help='Remove thumbnails of deleted or changed images from the ' \
+            'cache, then exit'
+    )
+    return parser.parse_args()
+
+def _get_byte_range(header, size):
+    """
+    Get the byte range asked for by a Range header. Only single ranges are
+    understood - anything else gets the whole file, which RFC 7233 allows.
+
+    @param {String} header - The Range header's value, or None if there isn't
+        one
+
+    @param {Integer} size - The size of the file in bytes
+
+    @return {(Integer, Integer)} The first and last byte asked for, the first
+        being at or past the end of the file if none of it was asked for. None
+        if the whole file should be sent.
+    """
+    if header is None:
+        return None
+    match = re.match(r'^bytes=(\d*)-(\d*)$', header.strip())
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # The last however many bytes - none of them, if that's 0
+        if int(last) == 0:
+            return size, size - 1
+        return max(0, size - int(last)), size - 1
+    if last != '' and int(last) < int(first):
+        return None
+    return int(first), min(int(last) if last else size - 1, size - 1)
+
+def _get_cache_dir(dir_path, cache_dir=None):
+    """
+    Get the directory to keep the thumbnail cache in for the given served
+    directory.
+
+    @param {String} dir_path - The directory being served
+
+    @param {String=None} cache_dir - An explicitly configured cache directory,
+        used in preference to the default if given.
+
+    @return {String} The cache directory path.
+    """
+    if cache_dir is not None:
+        return cache_dir
+    return os.path.join(dir_path, CACHE_DIR_NAME)
+
+def _get_client_page():
+    """
+    Get the HTML of the lightweight gallery page, which fetches its directory's
+    manifest (see _get_manifest) and renders the gallery from it in the
+    browser. It's the same for every directory.
+
+    @return {String} The page's HTML.
+    """
+    # As with the index pages, Issue #2 exists to do this better than HTML
+    # in-code
+    html = [
+        '<!DOCTYPE html>',
+        '<html>',
+        '    <head>',
+        '        <meta charset="utf-8">',
+        '        <title>imageMe</title>',
+        '        <style>',
+        '            html, body {margin: 0;padding: 0;}',
+        '            .header {text-align: right;}',
+        '            .content {',
+        '                padding: 3em;',
+        '                padding-left: 4em;',
+        '                padding-right: 4em;',
+        '            }',
+        '            .image {',
+        '                max-width: 100%;',
+        '                height: auto;',
+        '                border-radius: 0.3em;',
+        '            }',
+        '            .gallery {',
+        '                display: grid;',
+        '                grid-template-columns: repeat(' + \
+            str(IMAGES_PER_ROW) + ', 1fr);',
+        '                gap: 0.2em;',
+        '            }',
+        '        </style>',
+        '    </head>',
+        '    <body>',
+        '    <div class="content">',
+        '        <h2 class="header" id="header">imageMe</h2>',
+        '        <div id="dirs"></div>',
+        '        <hr>',
+        '        <div class="gallery" id="gallery"></div>',
+        '    </div>',
+        '    <script>',
+        '    (function () {',
+        '        var header = document.getElementById("header");',
+        '        function add(parent, tag, attributes) {',
+        '            var element = document.createElement(tag);',
+        '            for (var name in attributes) {',
+        '                element.setAttribute(name, attributes[name]);',
+        '            }',
+        '            parent.appendChild(element);',
+        '            return element;',
+        '        }',
+        '        function render(manifest) {',
+        '            header.textContent = "imageMe: " + (manifest.path || ".")',
+        '                + " [" + manifest.images.length + " image(s)]";',
+        '            var dirs = document.getElementById("dirs");',
+        '            var names = manifest.path ? [".."] : [];',
+        '            var hrefs = manifest.path ? [".."] : [];',
+        '            names = names.concat(manifest.dirs);',
+        '            hrefs = hrefs.concat(manifest.dir_hrefs);',
+        '            names.forEach(function (name, i) {',
+        '                var h3 = add(dirs, "h3", {"class": "header"});',
+        '                add(h3, "a", {',
+        '                    "href": hrefs[i] + "/' + CLIENT_FILE_NAME + '"',
+        '                }).textContent = name;',
+        '            });',
+        '            var gallery = document.getElementById("gallery");',
+        '            var sizes = "calc((100vw - 8em) / ' + \
+            str(IMAGES_PER_ROW) + ')";',
+        '            manifest.images.forEach(function (image) {',
+        '                var a = add(gallery, "a", {',
+        '                    "href": image.href',
+        '                });',
+        '                var img = add(a, "img", {',
+        '                    "class": "image", "loading": "lazy",',
+        '                    "decoding": "async"',
+        '                });',
+        '                if (image.thumbnail_width) {',
+        '                    img.width = image.thumbnail_width;',
+        '                    img.height = image.thumbnail_height;',
+        '                }',
+        '                if (image.srcset) {',
+        '                    img.sizes = sizes;',
+        '                    img.srcset = image.srcset;',
+        '                }',
+        '                img.src = image.src;',
+        '            });',
+        '        }',
+        '        var request = new XMLHttpRequest();',
+        '        request.open("GET", "' + MANIFEST_FILE_NAME + '");',
+        '        request.onload = function () {',
+        '            if (request.status === 200) {',
+        '                render(JSON.parse(request.responseText));',
+        '            } else {',
+        '                header.textContent = "imageMe: " + request.status;',
+        '            }',
+        '        };',
+        '        request.send();',
+        '    })();',
+        '    </script>',
+        '    </body>',
+        '</html>'
+    ]
+    return '\n'.join(html)
+
+@_timed()
+def _get_compressed_data(data):
+    """
+    Compress the given page data with each of COMPRESSION_ENCODINGS, for
+    serving to clients that accept them.
+
+    @param {String} data - The bytes to compress
+
+    @return {Dict} The compressed bytes by encoding. The same data always
+        compresses to the same bytes, as no timestamp is included.
+    """
+    compressed = {}
+    for encoding in COMPRESSION_ENCODINGS:
+        if encoding == 'br':
+            compressed[encoding] = brotli.compress(
+                data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY
+            )
+            continue
+        bytesio = io.BytesIO()
+        gzip_file = gzip.GzipFile(fileobj=bytesio, mode='wb', mtime=0)
+        try:
+            gzip_file.write(data)
+        finally:
+            gzip_file.close()
+        compressed[encoding] = bytesio.getvalue()
+    return compressed
+
+def _get_compressed_file_paths(path):
+    """
+    Get the paths of the precompressed copies of an index file which exist.
+
+    @param {String} path - The index file
+
+    @return {[String]} The paths of its compressed copies, of any encoding.
+    """
+    return [
+        path + suffix for suffix in sorted(COMPRESSED_FILE_SUFFIXES.values())
+        if os.path.isfile(path + suffix)
+    ]
+
+def _get_compressor(encoding, compressed_file):
+    """
+    Get a compressor for the given encoding, writing to the given file, so
+    data can be compressed a chunk at a time as it's generated.
+
+    @param {String} encoding - One of COMPRESSION_ENCODINGS
+
+    @param {File} compressed_file - The binary file to write the compressed
+        data to. It's left open once compression's finished.
+
+    @return {(Function, Function)} A function compressing a chunk of data into
+        the file, and one finishing compression once there's no more.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY
+        )
+        return (
+            lambda data: compressed_file.write(compressor.process(data)),
+            lambda: compressed_file.write(compressor.finish())
+        )
+    # No name or timestamp goes in the header, so the same data always
+    # compresses to the same bytes
+    gzip_file = gzip.GzipFile(
+        filename='', fileobj=compressed_file, mode='wb', mtime=0
+    )
+    return gzip_file.write, gzip_file.close
+
+@_timed()
+def _get_data_from_image(img, image_format=None):
+    """
+    Get the encoded bytes of the given image, in a format suitable for display
+    in a browser.
+
+    @param {Image} img - The PIL Image to encode
+
+    @param {String=None} image_format - The PIL format name to encode as, if
+        not the image's display format (see _get_display_format)
+
+    @return {(String, String)} A (format, data) tuple of the target format name
+        and the encoded image bytes, or None if the image couldn't be encoded.
+    """
+    target_format = image_format or _get_display_format(img.format)
+    # JPEG has no alpha channel, palette or 16 bit modes, which TIFFs often
+    # come in, and WebP only RGB and RGBA
+    img = _get_8_bit_image(img)
+    if target_format == 'JPEG' and img.mode not in ['1', 'L', 'RGB', 'CMYK']:
+        img = img.convert('RGB')
+    elif target_format == 'WEBP' and img.mode not in ['RGB', 'RGBA']:
+        img = img.convert('RGBA')
+    try:
+        bytesio = io.BytesIO()
+        img.save(bytesio, target_format)
+        return target_format, bytesio.getvalue()
+    except IOError as exptn:
+        print('IOError while saving image bytes: %s' % exptn)
+        return None
+
+def _get_directory_signature(root_dir, location, image_files, dirs):
+    """
+    Get a signature of a directory's contents, which changes whenever its
+    index would. This covers the subdirectories, the names, mtimes and sizes of
+    the images, and the settings affecting index generation.
+
+    @param {String} root_dir - The root directory of the entire crawl
+
+    @param {String} location - The directory
+
+    @param {[String]} image_files - The image file names in the directory
+
+    @param {[String]} dirs - The subdirectories of the directory
+
+    @return {String} The signature, or None if an image's stats can't be read.
+    """
+    contents = [
+        INDEX_VERSION, location, root_dir == location, IMAGES_PER_PAGE,
+        IMAGES_PER_ROW, THUMBNAIL_WIDTH, THUMBNAIL_EXTRA_WIDTHS, RESAMPLE,
+        THUMBNAIL_FORMAT, dirs
+    ]
+    for image_file in image_files:
+        stat = _get_image_stat(location, image_file)
+        if stat is None:
+            return None
+        contents.append((image_file,) + stat)
+    return hashlib.sha1(repr(contents).encode('utf-8')).hexdigest()
+
+def _get_display_format(image_format):
+    """
+    Get the format images of the given format are converted to for display in
+    a browser.
+
+    @param {String} image_format - The PIL format name of the original image
+
+    @return {String} The PIL format name to display the image as.
+    """
+    # Target format should be the same as the original image format, unless it's
+    # a TIF/TIFF, which can't be displayed by most browsers; we convert these
+    # to jpeg
+    if image_format.lower() in ['tif', 'tiff']:
+        return 'JPEG'
+    return image_format
+
+def _get_display_name(name):
+    """
+    Get a file or directory name as text, for showing to people. Names that
+    aren't UTF-8 (which Linux allows) have their undecodable bytes replaced,
+    so they're only fit for display - links need the name's own bytes.
+
+    @param {String} name - The name, as bytes read from the filesystem
+
+    @return {Unicode} The name as text.
+    """
+    if isinstance(name, unicode):
+        return name
+    return name.decode('utf-8', 'replace')
+
+def _get_exif_thumbnail(img):
+    """
+    Get the thumbnail embedded in an image's EXIF data, as written by most
+    cameras. Only the EXIF header is read, not the image itself.
+
+    @param {PIL.Image} img - The image to find an embedded thumbnail in
+
+    @return {PIL.Image} The embedded thumbnail as a PIL Image, or None if the
+        image doesn't have one.
+    """
+    exif = img.info.get('exif')
+    if not exif or not exif.startswith(b'Exif\x00\x00'):
+        return None
+    # EXIF data is a TIFF structure - the thumbnail is described by its second
+    # IFD (image file directory), which follows the first
+    tiff = exif[6:]
+    try:
+        endian = {b'II': '<', b'MM': '>'}[tiff[:2]]
+        ifd0 = struct.unpack(endian + 'I', tiff[4:8])[0]
+        entry_count = struct.unpack(endian + 'H', tiff[ifd0:ifd0 + 2])[0]
+        next_ifd = ifd0 + 2 + entry_count * 12
+        ifd1 = struct.unpack(endian + 'I', tiff[next_ifd:next_ifd + 4])[0]
+        if ifd1 == 0:
+            return None
+        entry_count = struct.unpack(endian + 'H', tiff[ifd1:ifd1 + 2])[0]
+        tags = {}
+        for i in range(entry_count):
+            entry = tiff[ifd1 + 2 + i * 12:ifd1 + 14 + i * 12]
+            tag, field_type = struct.unpack(endian + 'HH', entry[:4])
+            # SHORT values sit in the first two bytes of the value field
+            value_format = 'H' if field_type == 3 else 'I'
+            tags[tag] = struct.unpack(
+                endian + value_format,
+                entry[8:10] if field_type == 3 else entry[8:12]
+            )[0]
+        # JPEGInterchangeFormat and JPEGInterchangeFormatLength tags
+        offset, length = tags[0x0201], tags[0x0202]
+        return Image.open(io.BytesIO(tiff[offset:offset + length]))
+    except (KeyError, IOError, struct.error):
+        return None
+
+@_timed((0, 1))
+def _get_gif_thumbnail_data(dir_path, image_file, img):
+    """
+    Get the encoded thumbnail of a GIF, scaled down to THUMBNAIL_WIDTH wide.
+    Animated GIFs of up to GIF_THUMBNAIL_MAX_FRAMES frames keep their
+    animation, with every frame scaled down. Otherwise just the first frame is
+    used.
+
+    @param {String} dir_path - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within dir_path
+
+    @param {PIL.Image} img - The opened GIF
+
+    @return {(String, String)} A ('GIF', data) tuple of the thumbnail's
+        encoded bytes, or None if it couldn't be generated.
+    """
+    size = (THUMBNAIL_WIDTH, max(1, int(
+        THUMBNAIL_WIDTH / float(img.size[0]) * img.size[1]
+    )))
+    frame_count = getattr(img, 'n_frames', 1)
+    if frame_count > GIF_THUMBNAIL_MAX_FRAMES:
+        frame_count = 1
+    frames, durations = [], []
+    bytesio = io.BytesIO()
+    try:
+        for frame in range(frame_count):
+            img.seek(frame)
+            durations.append(img.info.get('duration', 100))
+            # Scaled in full colour, since scaling a palette image can only
+            # pick pixels rather than blend them, then back to a palette
+            # straight away (as saving would), so only a byte per pixel is
+            # held for each frame
+            frames.append(img.convert('RGBA').resize(size, RESAMPLE).convert(
+                'P', palette=Image.ADAPTIVE
+            ))
+        if len(frames) == 1:
+            frames[0].save(bytesio, 'GIF')
+        else:
+            # Without a loop count, the original only plays once
+            options = {}
+            if 'loop' in img.info:
+                options['loop'] = img.info['loop']
+            frames[0].save(
+                bytesio, 'GIF', save_all=True, append_images=frames[1:],
+                duration=durations, **options
+            )
+    except (IOError, EOFError) as exptn:
+        print('WARNING: Error thumbnailing %s/%s: %s' % (
+            dir_path, image_file, exptn
+        ))
+        return None
+    return 'GIF', bytesio.getvalue()
+
+def _get_image_entry(
+        location, image_file, force_no_processing=False, defer_thumbnails=False,
+        inline=None, ready_only=False):
+    """
+    Get everything an index needs to show an image: how to link to it, its
+    thumbnail and what's known of its dimensions. Index pages and manifests are
+    both built from these.
+
+    @param {String} location - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within location
 
     @param {Boolean=False} force_no_processing - If True, do not attempt to
-        actually process thumbnails, PIL images or anything. Simply index
-        <img> tags with original file src attributes.
+        actually process thumbnails, PIL images or anything. Simply use the
+        original file.
 
-    @return {[String]} Full file paths of all created files.
+    @param {Boolean=False} defer_thumbnails - If True, reference thumbnails by
+        URL without waiting for them to be generated. See
+        _get_thumbnail_src_from_file.
+
+    @param {Boolean=None} inline - Whether to embed thumbnails as data rather
+        than reference them by URL. Defaults to INLINE_THUMBNAILS.
+
+    @param {Boolean=False} ready_only - If True and the image's thumbnail
+        isn't cached (not made yet, or couldn't be made), index it as with
+        force_no_processing rather than generate the thumbnail now.
+
+    @return {(Dict, [Tuple])} The entry, and the cache keys of the thumbnails
+        and conversions it references. The entry has the image's name, href and
+        thumbnail src, and where known its format, width and height, the
+        thumbnail_width and thumbnail_height, and a srcset of smaller
+        thumbnails.
     """
-    # Initialise list of created file paths to build up as we make them
-    created_files = []
-    # Walk the root dir downwards, creating index files as we go
-    for here, dirs, files in os.walk(root_dir):
-        print('Processing %s' % here)
-        # Sort the subdirectories by name
-        dirs = sorted(dirs)
-        # Get image files - all files in the directory matching IMAGE_FILE_REGEX
-        image_files = [f for f in files if re.match(IMAGE_FILE_REGEX, f)]
-        # Sort the image files by name
-        image_files = sorted(image_files)
-        # Create this directory's index file and add its name to the created
-        # files list
-        created_files.append(
-            _create_index_file(
-                root_dir, here, image_files, dirs, force_no_processing
+    if ready_only and not force_no_processing:
+        key = _get_thumbnail_key(
+            location, image_file, stat=_get_image_stat(location, image_file)
+        )
+        if key is None or not IMAGE_CACHE.contains(*key):
+            # Images with no thumbnail to make (small GIFs) are still indexed
+            # in full, if their metadata's been read
+            cached = None if key is None else IMAGE_CACHE.get_metadata(*key[:3])
+            force_no_processing = cached is None or _has_derivative(
+                ImageMetadata(*(key[:3] + tuple(cached) + (None,))), None
             )
+    # Get the image's metadata once, for everything that needs it
+    metadata = None
+    if not force_no_processing:
+        metadata = _get_image_metadata(
+            location, image_file, _get_image_stat(location, image_file)
         )
-    # Return the list of created files
-    return created_files
+        # An image that can't be read is indexed as it is, rather than opened
+        # again by everything else that wants its metadata
+        force_no_processing = metadata is None
+    keys = []
+    entry = {
+        'name': image_file,
+        'href': _get_image_link_target_from_file(
+            location, image_file, force_no_processing, metadata
+        ),
+        'src': _get_thumbnail_src_from_file(
+            location, image_file, force_no_processing, metadata,
+            defer_thumbnails, inline=inline
+        )
+    }
+    if metadata is not None:
+        keys.append(_get_thumbnail_key(location, image_file, metadata))
+        entry['format'] = metadata.format
+        entry['width'] = metadata.width
+        entry['height'] = metadata.height
+        entry['thumbnail_width'], entry['thumbnail_height'] = \
+            _get_thumbnail_size(metadata)
+    # Full-size conversions are served by URL, just as thumbnails are
+    if entry['href'].startswith(FULL_SIZE_URL_PREFIX):
+        keys.append(
+            _get_thumbnail_key(location, image_file, metadata, width=0)
+        )
+    # Offer the smaller thumbnails too, for browsers showing the images
+    # smaller. They're generated alongside the full width one
+    if entry['src'].startswith(THUMBNAIL_URL_PREFIX):
+        candidates = []
+        widths = _get_thumbnail_widths(metadata.format, metadata.width)
+        for width in widths[:-1]:
+            keys.append(_get_thumbnail_key(
+                location, image_file, metadata, width=width
+            ))
+            candidates.append('%s %dw' % (_get_thumbnail_src_from_file(
+                location, image_file, metadata=metadata, defer=True,
+                width=width, inline=False
+            ), width))
+        if candidates:
+            candidates.append(
+                '%s %dw' % (entry['src'], entry['thumbnail_width'])
+            )
+            entry['srcset'] = ', '.join(candidates)
+    return entry, keys
 
+@_timed((0, 1))
 def _get_image_from_file(dir_path, image_file):
     """
     Get an instance of PIL.Image from the given file.
@@ -236,12 +3031,14 @@ def _get_image_from_file(dir_path, image_file):
     # Return image or None
     return img
 
-def _get_image_link_target_from_file(dir_path, image_file, force_no_processing=False):
+def _get_image_link_target_from_file(
+        dir_path, image_file, force_no_processing=False, metadata=None):
     """
     Get the value to be used as the href for links from thumbnail images. For
     most image formats this will simply be the image file name itself. However,
     some image formats (tif) are not natively displayable by many browsers and
-    therefore we must link to image data in another format.
+    therefore we must link to a conversion in another format. This is served
+    by URL, generated when it's first requested and cached from then on.
 
     @param {String} dir_path - The directory containing the image file
 
@@ -251,108 +3048,340 @@ def _get_image_link_target_from_file(dir_path, image_file, force_no_processing=F
         actually process a thumbnail, PIL image or anything. Simply return the
         image filename as src.
 
+    @param {ImageMetadata=None} metadata - The image's metadata, if already
+        known.
+
     @return {String} The href to use.
     """
     # If we've specified to force no processing, just return the image filename
     if force_no_processing:
         return image_file
-    # First try to get an image
-    img = _get_image_from_file(dir_path, image_file)
+    # First get the image's metadata - its format is all we need
+    if metadata is None:
+        metadata = _get_image_metadata(dir_path, image_file)
+    if metadata is None:
+        return image_file
     # If format is directly displayable in-browser, just return the filename
-    # Else, we need to return a full-sized chunk of displayable image data
-    if img.format.lower() in ['tif', 'tiff']:
-        return _get_image_src_from_file(
-            dir_path, image_file, force_no_processing
-        )
-    return image_file
+    # Else, we need to return the URL of a full-sized displayable conversion
+    if not _has_derivative(metadata, 0):
+        return image_file
+    key = _get_thumbnail_key(dir_path, image_file, metadata, width=0)
+    thumbnail_id = _get_thumbnail_id(key)
+    IMAGE_CACHE.put_source(thumbnail_id, *key)
+    return '%s%s.%s' % (
+        FULL_SIZE_URL_PREFIX, thumbnail_id,
+        _get_display_format(metadata.format).lower()
+    )
 
-def _get_image_src_from_file(dir_path, image_file, force_no_processing=False):
+def _get_image_metadata(dir_path, image_file, stat=None):
     """
-    Get base-64 encoded data as a string for the given image file's full image,
-    for use directly in HTML <img> tags, or a path to the original if image
-    scaling is not supported.
-
-    This is a full-sized version of _get_thumbnail_src_from_file, for use in
-    image formats which cannot be displayed directly in-browser, and therefore
-    need processed versions even at full size.
+    Get the metadata of the given image file. This is read from IMAGE_CACHE if
+    known for the file's current version, otherwise the image is opened to read
+    its header and the metadata is cached for next time.
 
     @param {String} dir_path - The directory containing the image file
 
     @param {String} image_file - The filename of the image file within dir_path
 
-    @param {Boolean=False} force_no_processing - If True, do not attempt to
-        actually process a thumbnail, PIL image or anything. Simply return the
-        image filename as src.
+    @param {(Float, Integer)=None} stat - The file's mtime and size, if already
+        known (from an ImageTree scan, say). Saves reading them again.
 
-    @return {String} The base-64 encoded image data string, or path to the file
-        itself if not supported.
+    @return {ImageMetadata} The image's metadata, or None if it can't be read.
     """
-    # If we've specified to force no processing, just return the image filename
-    if force_no_processing:
-        if image_file.endswith('tif') or image_file.endswith('tiff'):
-            return UNSUPPORTED_IMAGE_TYPE_DATA
-        return image_file
-    # First try to get an image
+    path = os.path.abspath(os.path.join(dir_path, image_file))
+    if stat is None:
+        try:
+            stat = os.stat(path)
+        except OSError as exptn:
+            print('Error reading image file %s: %s' % (path, exptn))
+            return None
+        stat = (stat.st_mtime, stat.st_size)
+    mtime, size = stat
+    cache = IMAGE_CACHE
+    if cache is not None:
+        cached = cache.get_metadata(path, mtime, size)
+        if cached is not None:
+            return ImageMetadata(
+                path, mtime, size, cached[0], cached[1], cached[2], None
+            )
     img = _get_image_from_file(dir_path, image_file)
-    return _get_src_from_image(img, image_file)
+    if img is None:
+        return None
+    metadata = ImageMetadata(
+        path, mtime, size, img.format, img.size[0], img.size[1], img
+    )
+    if cache is not None:
+        cache.put_metadata(*metadata[:6])
+    return metadata
+
+def _get_image_stat(location, image_file):
+    """
+    Get an image file's mtime and size, from IMAGE_TREE's last scan of its
+    directory if there's been one, otherwise from the filesystem.
+
+    @param {String} location - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within location
+
+    @return {(Float, Integer)} The image's mtime and size, or None if they
+        can't be read.
+    """
+    if IMAGE_TREE is not None:
+        stat = IMAGE_TREE.get_stat(location, image_file)
+        if stat is not None:
+            return stat
+    try:
+        stat = os.stat(os.path.join(location, image_file))
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+def _get_index_file_name(page=1):
+    """
+    Get the filename of the given page of an index. The first page is
+    INDEX_FILE_NAME, later pages are numbered, as in imageme-2.html.
+
+    @param {Integer=1} page - The page number, counting from 1
+
+    @return {String} The index file's filename.
+    """
+    if page == 1:
+        return INDEX_FILE_NAME
+    name, extension = os.path.splitext(INDEX_FILE_NAME)
+    return '%s-%d%s' % (name, page, extension)
 
-def _get_index_file_path(location):
+def _get_index_file_path(location, page=1):
     """
     Get the full file path to be used for an index file in the given location.
-    Yields location plus the constant INDEX_FILE_NAME.
+    Yields location plus the constant INDEX_FILE_NAME, numbered for pages after
+    the first.
 
     @param {String} location - A directory location in which we want to create
         a new index file.
 
+    @param {Integer=1} page - The page of the index, counting from 1
+
     @return {String} A file path for usage with a new index file.
     """
-    return os.path.join(location, INDEX_FILE_NAME)
+    return os.path.join(location, _get_index_file_name(page))
 
-def _get_server_port():
+def _get_index_page_number(file_name):
     """
-    Get the port specified for the server to run on. If given as the first
-    command line argument, we'll use that. Else we'll default to 8000.
+    Get the page number of the index page with the given filename. The
+    opposite of _get_index_file_name.
 
-    @return {Integer} The port to run the server on. Default 8000, overridden
-        by first command line argument.
+    @param {String} file_name - A filename, which may or may not be that of an
+        index page
+
+    @return {Integer} The page number, or None if the filename isn't that of an
+        index page.
     """
-    return int(sys.argv[1]) if len(sys.argv) >= 2 else 8000
+    if file_name == INDEX_FILE_NAME:
+        return 1
+    name, extension = os.path.splitext(INDEX_FILE_NAME)
+    match = re.match(
+        '^%s-([0-9]+)%s$' % (re.escape(name), re.escape(extension)), file_name
+    )
+    if match is None or int(match.group(1)) < 2:
+        return None
+    return int(match.group(1))
 
-def _get_src_from_image(img, fallback_image_file):
+def _get_manifest(root_dir, location, image_files, dirs):
     """
-    Get base-64 encoded data as a string for the given image. Fallback to return
-    fallback_image_file if cannot get the image data or img is None.
+    Get a directory's manifest: a compact JSON listing of its images and
+    subdirectories, for rendering the gallery in the browser (see
+    _get_client_page) and for other tools to read. Images are described as in
+    the index pages (see _get_image_entry), with thumbnails always referenced
+    by URL and never waited for.
+
+    @param {String} root_dir - The root directory of the entire crawl
 
-    @param {Image} img - The PIL Image to get src data for
+    @param {String} location - The directory the manifest is for
 
-    @param {String} fallback_image_file - The filename of the image file,
-        to be used when image data capture fails
+    @param {[String]} image_files - The image file names in the directory
 
-    @return {String} The base-64 encoded image data string, or path to the file
-        itself if not supported.
+    @param {[String]} dirs - The subdirectories of the directory
+
+    @return {String} The manifest JSON.
     """
-    # If the image is None, then we can't process, so we should return the
-    # path to the file itself
-    if img is None:
-        return fallback_image_file
-    # Target format should be the same as the original image format, unless it's
-    # a TIF/TIFF, which can't be displayed by most browsers; we convert these
-    # to jpeg
-    target_format = img.format
-    if target_format.lower() in ['tif', 'tiff']:
-        target_format = 'JPEG'
-    # If we have an actual Image, great - put together the base64 image string
-    try:
-        bytesio = io.BytesIO()
-        img.save(bytesio, target_format)
-        byte_value = bytesio.getvalue()
-        b64 = base64.b64encode(byte_value)
-        return 'data:image/%s;base64,%s' % (target_format.lower(), b64)
-    except IOError as exptn:
-        print('IOError while saving image bytes: %s' % exptn)
-        return fallback_image_file
+    path = os.path.relpath(location, root_dir)
+    images = []
+    for image_file in image_files:
+        entry = _get_image_entry(
+            location, image_file, force_no_processing=not PIL_ENABLED,
+            defer_thumbnails=True, inline=False
+        )[0]
+        # Originals are linked to by their name's bytes, which needn't be text
+        for attribute in ['href', 'src']:
+            if entry[attribute] == image_file:
+                entry[attribute] = urllib.quote(image_file, safe='')
+        entry['name'] = _get_display_name(image_file)
+        images.append(entry)
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'path': '' if path == os.curdir else \
+            _get_display_name(path.replace(os.sep, '/')),
+        'dirs': [_get_display_name(directory) for directory in dirs],
+        'dir_hrefs': [urllib.quote(directory, safe='') for directory in dirs],
+        'images': images
+    }
+    return json.dumps(manifest, separators=(',', ':'), sort_keys=True)
+
+def _get_metrics_label(value):
+    """
+    Escape a value for use as a label value in Prometheus text format.
+
+    @param {String} value - The label value
+
+    @return {String} The escaped label value.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n'
+    )
+
+def _get_page_count(image_count):
+    """
+    Get the number of pages a directory's index is split into.
+
+    @param {Integer} image_count - The number of images in the directory
+
+    @return {Integer} The number of pages. Even a directory with no images gets
+        a page, for its subdirectories.
+    """
+    if IMAGES_PER_PAGE <= 0:
+        return 1
+    return max(1, (image_count + IMAGES_PER_PAGE - 1) // IMAGES_PER_PAGE)
+
+def _get_server_port(args):
+    """
+    Get the port specified for the server to run on. If given with --port,
+    we'll use that, else the first command line argument. Else we'll default
+    to SERVER_PORT.
+
+    @param {Namespace} args - The parsed command line arguments, see
+        _get_arguments
+
+    @return {Integer} The port to run the server on.
+    """
+    return args.port if args.port_option is None else args.port_option
+
+@_timed()
+def _get_src_from_data(image_format, data):
+    """
+    Get a base-64 encoded data URI for the given encoded image bytes.
+
+    @param {String} image_format - The PIL format name of the image data
+
+    @param {String} data - The encoded image bytes
+
+    @return {String} The base-64 encoded image data string.
+    """
+    return 'data:image/%s;base64,%s' % (
+        image_format.lower(), base64.b64encode(data)
+    )
+
+def _get_stored_index(root_dir, location, image_files, dirs):
+    """
+    Get the index stored in IMAGE_CACHE for the given directory, if it was
+    generated from the directory's current contents. Stored indexes reference
+    thumbnails by URL, so none are kept when INLINE_THUMBNAILS is True.
+
+    @param {String} root_dir - The root directory of the entire crawl
+
+    @param {String} location - The directory
+
+    @param {[String]} image_files - The image file names in the directory
+
+    @param {[String]} dirs - The subdirectories of the directory
+
+    @return {(String, Tuple)} The directory's current signature and its stored
+        (pages, thumbnail keys) index, either of which may be None. See
+        ImageCache.get_directory.
+    """
+    if IMAGE_CACHE is None or INLINE_THUMBNAILS:
+        return None, None
+    signature = _get_directory_signature(root_dir, location, image_files, dirs)
+    if signature is None:
+        return None, None
+    return signature, IMAGE_CACHE.get_directory(location, signature)
+
+def _get_thumbnail_data_from_file(
+        dir_path, image_file, metadata=None, width=None):
+    """
+    Get the encoded bytes of the given image file's thumbnail. These are read
+    from IMAGE_CACHE if present there, otherwise the thumbnail is generated and
+    stored in the cache for next time.
+
+    @param {String} dir_path - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within dir_path
+
+    @param {ImageMetadata=None} metadata - The image's metadata, if already
+        known.
+
+    @param {Integer=None} width - The thumbnail width, if not THUMBNAIL_WIDTH.
+        0 gets a full-size conversion to a format browsers can display.
+
+    @return {(String, String)} A (format, data) tuple of the thumbnail's format
+        name and encoded bytes, or None if no thumbnail could be generated.
+    """
+    if width is None:
+        width = THUMBNAIL_WIDTH
+    if metadata is None:
+        metadata = _get_image_metadata(dir_path, image_file)
+    # Images shown as they are don't need opening to find that out
+    if metadata is None or not _has_derivative(metadata, width):
+        return None
+    cache = IMAGE_CACHE
+    if cache is not None:
+        # Look the thumbnail up before going anywhere near the image's pixels
+        cached = cache.get(*_get_thumbnail_key(
+            dir_path, image_file, metadata, width=width
+        ))
+        if cached is not None:
+            return cached
+    # The image's other thumbnails come along too, so cache them all
+    thumbnails = _generate_thumbnail_data(
+        dir_path, image_file, metadata.image, width
+    )
+    if thumbnails is None:
+        return None
+    if cache is not None:
+        for thumbnail_width, encoded in thumbnails.items():
+            cache.put(*(_get_thumbnail_key(
+                dir_path, image_file, metadata, width=thumbnail_width
+            ) + encoded))
+    return thumbnails.get(width)
+
+def _get_thumbnail_format(image_format):
+    """
+    Get the format thumbnails of images of the given format are encoded as.
 
-def _get_thumbnail_image_from_file(dir_path, image_file):
+    @param {String} image_format - The PIL format name of the original image
+
+    @return {String} The PIL format name of its thumbnails.
+    """
+    display_format = _get_display_format(image_format)
+    # GIFs keep their animation, and PNGs their transparency (and sharp edges,
+    # which JPEG blurs)
+    if display_format == 'GIF' or \
+            (display_format == 'PNG' and THUMBNAIL_FORMAT == 'JPEG'):
+        return display_format
+    return THUMBNAIL_FORMAT
+
+def _get_thumbnail_id(key):
+    """
+    Get the ID identifying a thumbnail in its URL. This is a hash of the
+    thumbnail's cache key, so changes whenever the thumbnail would.
+
+    @param {Tuple} key - The thumbnail cache key. See _get_thumbnail_key.
+
+    @return {String} The thumbnail ID.
+    """
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+@_timed((0, 1))
+def _get_thumbnail_image_from_file(dir_path, image_file, img=None):
     """
     Get a PIL.Image from the given image file which has been scaled down to
     THUMBNAIL_WIDTH wide.
@@ -361,17 +3390,19 @@ def _get_thumbnail_image_from_file(dir_path, image_file):
 
     @param {String} image_file - The filename of the image file within dir_path
 
+    @param {PIL.Image=None} img - The image file, if already opened. This is
+        modified in place.
+
     @return {PIL.Image} An instance of the thumbnail as a PIL Image, or None
         if the functionality is not available. See _get_image_from_file for
         details.
     """
-    # Get image
-    img = _get_image_from_file(dir_path, image_file)
+    # Get image, unless we've been given it already
+    if img is None:
+        img = _get_image_from_file(dir_path, image_file)
     # If it's not supported, exit now
     if img is None:
         return None
-    if img.format.lower() == 'gif':
-        return None
     # Get image dimensions
     img_width, img_height = img.size
     # We need to perform a resize - first, work out the scale ratio to take the
@@ -379,18 +3410,95 @@ def _get_thumbnail_image_from_file(dir_path, image_file):
     scale_ratio = THUMBNAIL_WIDTH / float(img_width)
     # Work out target image height based on the scale ratio
     target_height = int(scale_ratio * img_height)
+    # If the JPEG has a big enough thumbnail embedded in its EXIF data, we can
+    # use that and skip decoding the image itself entirely
+    exif_thumbnail = _get_exif_thumbnail(img)
+    if exif_thumbnail is not None and \
+            exif_thumbnail.size[0] >= THUMBNAIL_WIDTH and \
+            abs(exif_thumbnail.size[0] / float(exif_thumbnail.size[1]) - \
+                img_width / float(img_height)) < 0.01:
+        img = exif_thumbnail
+    elif THUMBNAIL_DRAFT and img.format == 'JPEG':
+        # Otherwise, have the JPEG decoder scale down by a power of 2 as it
+        # decodes, to no smaller than the thumbnail. Scaling in the decoder
+        # averages pixels, so leaves a good image to resample from
+        img.draft(None, (THUMBNAIL_WIDTH, target_height))
     # Perform the resize
     try:
-        img.thumbnail((THUMBNAIL_WIDTH, target_height), resample=RESAMPLE)
-    except IOError as exptn:
-        print('WARNING: IOError when thumbnailing %s/%s: %s' % (
+        img = _get_8_bit_image(img)
+        try:
+            img.thumbnail(
+                (THUMBNAIL_WIDTH, target_height), resample=RESAMPLE,
+                reducing_gap=THUMBNAIL_REDUCING_GAP
+            )
+        except TypeError:
+            # Pillow before 7.0 has no reducing_gap, so other formats are
+            # resampled from full size
+            img.thumbnail((THUMBNAIL_WIDTH, target_height), resample=RESAMPLE)
+    except (IOError, ValueError) as exptn:
+        print('WARNING: Error thumbnailing %s/%s: %s' % (
             dir_path, image_file, exptn
         ))
         return None
     # Return the resized image
     return img
 
-def _get_thumbnail_src_from_file(dir_path, image_file, force_no_processing=False):
+def _get_thumbnail_key(
+        dir_path, image_file, metadata=None, stat=None, width=None):
+    """
+    Get the key the given image file's thumbnail is stored under in the
+    thumbnail cache.
+
+    @param {String} dir_path - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within dir_path
+
+    @param {ImageMetadata=None} metadata - The image's metadata, if already
+        known. Saves reading the file's stats again.
+
+    @param {(Float, Integer)=None} stat - The file's mtime and size, if already
+        known and metadata isn't.
+
+    @param {Integer=None} width - The thumbnail width, if not THUMBNAIL_WIDTH.
+        0 is the key of the image's full-size conversion.
+
+    @return {Tuple} The (path, mtime, size, width, resample) cache key, or None
+        if the file can't be read.
+    """
+    if width is None:
+        width = THUMBNAIL_WIDTH
+    if metadata is not None:
+        return (
+            metadata.path, metadata.mtime, metadata.size, width, RESAMPLE
+        )
+    path = os.path.abspath(os.path.join(dir_path, image_file))
+    if stat is None:
+        try:
+            stat = os.stat(path)
+        except OSError as exptn:
+            print('Error reading image file %s: %s' % (path, exptn))
+            return None
+        stat = (stat.st_mtime, stat.st_size)
+    return (path,) + tuple(stat) + (width, RESAMPLE)
+
+def _get_thumbnail_size(metadata):
+    """
+    Get the dimensions of the given image's thumbnail, as it's displayed in the
+    gallery. Images are only ever scaled down, never up.
+
+    @param {ImageMetadata} metadata - The image's metadata
+
+    @return {(Integer, Integer)} The thumbnail's width and height.
+    """
+    if metadata.width <= THUMBNAIL_WIDTH:
+        return metadata.width, metadata.height
+    return THUMBNAIL_WIDTH, max(1, int(
+        THUMBNAIL_WIDTH / float(metadata.width) * metadata.height
+    ))
+
+def _get_thumbnail_src_from_file(
+        dir_path, image_file, force_no_processing=False, metadata=None,
+        defer=False, width=None, inline=None):
     """
     Get base-64 encoded data as a string for the given image file's thumbnail,
     for use directly in HTML <img> tags, or a path to the original if image
@@ -404,85 +3512,610 @@ def _get_thumbnail_src_from_file(dir_path, image_file, force_no_processing=False
         actually process a thumbnail, PIL image or anything. Simply return the
         image filename as src.
 
-    @return {String} The base-64 encoded image data string, or path to the file
-        itself if not supported.
+    @param {ImageMetadata=None} metadata - The image's metadata, if already
+        known.
+
+    @param {Boolean=False} defer - If True and not inlining, return the
+        thumbnail's URL without generating it first. The request handler
+        generates it when it's first fetched instead.
+
+    @param {Integer=None} width - The thumbnail width, if not THUMBNAIL_WIDTH.
+        One of the image's _get_thumbnail_widths.
+
+    @param {Boolean=None} inline - Whether to return the thumbnail's data
+        rather than its URL. Defaults to INLINE_THUMBNAILS.
+
+    @return {String} The base-64 encoded image data string, or the URL to fetch
+        the thumbnail from if not inlining, or path to the file itself if not
+        supported.
     """
+    if inline is None:
+        inline = INLINE_THUMBNAILS
     # If we've specified to force no processing, just return the image filename
     if force_no_processing:
-        if image_file.endswith('tif') or image_file.endswith('tiff'):
+        if image_file.lower().endswith(('.tif', '.tiff')):
             return UNSUPPORTED_IMAGE_TYPE_DATA
         return image_file
-    # First try to get a thumbnail image
-    img = _get_thumbnail_image_from_file(dir_path, image_file)
-    return _get_src_from_image(img, image_file)
+    if metadata is None:
+        metadata = _get_image_metadata(dir_path, image_file)
+    if metadata is None:
+        return image_file
+    key = _get_thumbnail_key(dir_path, image_file, metadata, width=width)
+    if defer and not inline:
+        # Small GIFs aren't thumbnailed, they're shown as they are
+        if not _has_derivative(metadata, width):
+            return image_file
+        thumbnail_format = _get_thumbnail_format(metadata.format)
+    else:
+        # First try to get the thumbnail data, from the cache if possible. When
+        # not inlining, this makes sure the thumbnail is ready before it's
+        # requested
+        encoded = _get_thumbnail_data_from_file(
+            dir_path, image_file, metadata, width
+        )
+        if encoded is None:
+            return image_file
+        if inline:
+            return _get_src_from_data(*encoded)
+        thumbnail_format = encoded[0]
+    # Remember where the thumbnail came from, so the request handler can serve
+    # it even after it's been evicted from the cache
+    thumbnail_id = _get_thumbnail_id(key)
+    IMAGE_CACHE.put_source(thumbnail_id, *key)
+    return '%s%s.%s' % (
+        THUMBNAIL_URL_PREFIX, thumbnail_id, thumbnail_format.lower()
+    )
 
-def _run_server():
+def _get_thumbnail_widths(image_format, image_width):
     """
-    Run the image server. This is blocking. Will handle user KeyboardInterrupt
-    and other exceptions appropriately and return control once the server is
-    stopped.
+    Get the widths of the thumbnails generated of an image. That's
+    THUMBNAIL_WIDTH and whichever THUMBNAIL_EXTRA_WIDTHS are narrower than both
+    it and the image (which is never scaled up). GIFs only get the one
+    thumbnail, and only if they're wider than THUMBNAIL_WIDTH - otherwise
+    they're shown as they are.
 
-    @return {None}
+    @param {String} image_format - The PIL format name of the image
+
+    @param {Integer} image_width - The width of the image in pixels
+
+    @return {[Integer]} The thumbnail widths, in ascending order, as used in
+        their cache keys. The THUMBNAIL_WIDTH thumbnail is only as wide as the
+        image if that's narrower.
+    """
+    if image_format.lower() == 'gif':
+        return [THUMBNAIL_WIDTH] if image_width > THUMBNAIL_WIDTH else []
+    return sorted(
+        width for width in THUMBNAIL_EXTRA_WIDTHS
+        if width < min(THUMBNAIL_WIDTH, image_width)
+    ) + [THUMBNAIL_WIDTH]
+
+def _has_derivative(metadata, width):
+    """
+    Check whether an image is shown as a version generated from it at the given
+    width, rather than as it is. Full-size conversions are only made of images
+    browsers can't display. See _get_thumbnail_widths for thumbnails.
+
+    @param {ImageMetadata} metadata - The image's metadata
+
+    @param {Integer} width - The thumbnail width, or 0 for a full-size
+        conversion. None means THUMBNAIL_WIDTH.
+
+    @return {Boolean} True if the image has a generated version at the width.
     """
-    # Get the port to run on
-    port = _get_server_port()
-    # Configure allow_reuse_address to make re-runs of the script less painful -
-    # if this is not True then waiting for the address to be freed after the
-    # last run can block a subsequent run
-    SocketServer.TCPServer.allow_reuse_address = True
-    # Create the server instance
-    server = SocketServer.TCPServer(
-        ('', port),
-        SimpleHTTPServer.SimpleHTTPRequestHandler
+    if width == 0:
+        return _get_display_format(metadata.format) != metadata.format
+    return (width or THUMBNAIL_WIDTH) in _get_thumbnail_widths(
+        metadata.format, metadata.width
     )
-    # Print out before actually running the server (cheeky / optimistic, however
-    # you want to look at it)
-    print('Your images are at http://127.0.0.1:%d/%s' % (
-        port,
-        INDEX_FILE_NAME
-    ))
+
+def _init_thumbnail_worker(
+        thumbnail_width, resample, thumbnail_format, timed=False):
+    """
+    Initialise a thumbnail worker process, giving it the same thumbnailing
+    configuration as the parent process.
+
+    @param {Integer} thumbnail_width - The parent's THUMBNAIL_WIDTH
+
+    @param {Integer} resample - The parent's RESAMPLE
+
+    @param {String} thumbnail_format - The parent's THUMBNAIL_FORMAT
+
+    @param {Boolean=False} timed - Whether the parent is recording METRICS,
+        in which case the worker's timings are sent back to it
+
+    @return {None}
+    """
+    global IMAGE_CACHE, METRICS, RESAMPLE, THUMBNAIL_FORMAT, THUMBNAIL_WIDTH
+    THUMBNAIL_WIDTH = thumbnail_width
+    RESAMPLE = resample
+    THUMBNAIL_FORMAT = thumbnail_format
+    # The parent owns the cache, workers just hand thumbnails back to it
+    IMAGE_CACHE = None
+    METRICS = Metrics(forward=True) if timed else None
+    # Leave handling Ctrl+C to the parent
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _is_image_file(file_name):
+    """
+    Check whether a file is one of the images to index, going by its extension
+    (see IMAGE_FILE_EXTENSIONS).
+
+    @param {String} file_name - The file's name
+
+    @return {Boolean} True if the file is an image, otherwise False.
+    """
+    return os.path.splitext(file_name)[1].lower() in IMAGE_FILE_EXTENSIONS
+
+def _list_image_dir(location):
+    """
+    List a single directory's image files and subdirectories, as
+    _walk_image_dirs does for a whole tree. The directory is scanned afresh,
+    and its record in IMAGE_TREE updated.
+
+    @param {String} location - The directory to list
+
+    @return {([String], [String])} The subdirectories and image files, each
+        sorted by name.
+    """
+    tree = IMAGE_TREE if IMAGE_TREE is not None else ImageTree()
+    directory = tree.scan_directory(location)
+    return list(directory.dirs), list(directory.image_files)
+
+def _make_thumbnail(dir_path, image_file):
+    """
+    Generate the encoded thumbnails of the given image file, without consulting
+    the cache. Run in thumbnail worker processes.
+
+    @param {String} dir_path - The directory containing the image file
+
+    @param {String} image_file - The filename of the image file within dir_path
+
+    @return {(Dict, ImageMetadata, [Tuple])} The thumbnails' (format, data)
+        tuples by width, or None if no thumbnails could be generated, alongside
+        the image's metadata, or None if the image couldn't be read, and the
+        timings to merge into the parent's METRICS, if any.
+    """
+    thumbnails = None
+    metadata = _get_image_metadata(dir_path, image_file)
+    if metadata is not None:
+        if _has_derivative(metadata, THUMBNAIL_WIDTH):
+            thumbnails = _generate_thumbnail_data(
+                dir_path, image_file, metadata.image
+            )
+        # The open image can't be sent back to the parent process
+        metadata = metadata._replace(image=None)
+    return thumbnails, metadata, METRICS.drain() if METRICS is not None else None
+
+def _profiled(function, *args):
+    """
+    Call a function, profiling the call with cProfile if PROFILE_PATH is set.
+    Profiles are added into PROFILE_STATS, to be written out when the server
+    stops.
+
+    @param {Function} function - The function to call
+
+    @param {*} args - The arguments to call it with
+
+    @return {*} The function's return value.
+    """
+    global PROFILE_STATS
+    if PROFILE_PATH is None:
+        return function(*args)
+    # cProfile only sees the thread it's enabled in, so each thread profiles
+    # its own work
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        return function(*args)
+    finally:
+        profile.disable()
+        with PROFILE_STATS_LOCK:
+            if PROFILE_STATS is None:
+                PROFILE_STATS = pstats.Stats(profile)
+            else:
+                PROFILE_STATS.add(profile)
+
+def _replace_file(part_file_path, file_path):
+    """
+    Move a completely written temporary file into place, replacing any
+    previous version of the file.
+
+    @param {String} part_file_path - The temporary file
+
+    @param {String} file_path - The path to move it to
+    """
+    try:
+        os.rename(part_file_path, file_path)
+    except OSError:
+        # Windows won't rename over an existing file
+        os.unlink(file_path)
+        os.rename(part_file_path, file_path)
+
+def _run_server(port=SERVER_PORT, bind_address='', threads=SERVER_THREADS):
+    """
+    Run the image server. This is blocking. Will handle user KeyboardInterrupt,
+    SIGTERM and other exceptions appropriately and return control once the
+    server is stopped.
+
+    @param {Integer=SERVER_PORT} port - The port to run on.
+
+    @param {String=''} bind_address - The address to listen on. Defaults to
+        all interfaces.
+
+    @param {Integer=SERVER_THREADS} threads - The number of threads to handle
+        requests with.
+
+    @return {None}
+    """
     # Try to run the server
+    server = None
     try:
+        # Create the server instance
+        server = ImageMeServer(
+            (bind_address, port), ImageMeRequestHandler, threads
+        )
+        # Stop as gracefully on SIGTERM as we do for Ctrl+C. Signal handlers
+        # can only be installed from the main thread, so if we're not in it
+        # whoever started us will have to stop us
+        try:
+            signal.signal(signal.SIGTERM, _stop_server)
+        except ValueError:
+            pass
+        # Print out before actually running the server (cheeky / optimistic,
+        # however you want to look at it)
+        print('Your images are at http://%s:%d/%s' % (
+            bind_address or '127.0.0.1',
+            port,
+            INDEX_FILE_NAME
+        ))
         # Run it - this call blocks until the server is killed
         server.serve_forever()
     except KeyboardInterrupt:
         # This is the expected way of the server being killed, since imageMe is
         # intended for ad-hoc running from command line
         print('User interrupted, stopping')
+    except SystemExit:
+        print('Terminated, stopping')
     except Exception as exptn:
-        # Catch everything else - this will handle shutdowns via other signals
-        # and faults actually starting the server in the first place
+        # Catch everything else - this will handle faults actually starting the
+        # server in the first place
         print(exptn)
         print('Unhandled exception in server, stopping')
+    finally:
+        if server is not None:
+            server.server_close()
+
+def _scan_image_dir(location):
+    """
+    Scan a single directory for image files and subdirectories. imageMe's own
+    cache directory is skipped. Uses scandir if available, so the entries' file
+    types come from the directory listing and only the images are statted.
+
+    @param {String} location - The directory to scan
+
+    @return {ImageDirectory} What was found.
+    """
+    # Taken before listing, so a change made while listing shows up as a
+    # changed mtime next time round
+    mtime = os.stat(location).st_mtime
+    dirs, linked_dirs, image_stats = [], set(), {}
+    if SCANDIR_ENABLED:
+        entries = (
+            (entry.name, entry.is_dir, entry.is_symlink, entry.stat)
+            for entry in scandir(location)
+        )
+    else:
+        # Much the same, but each check is another stat
+        entries = []
+        for name in os.listdir(location):
+            path = os.path.join(location, name)
+            entries.append((
+                name, functools.partial(os.path.isdir, path),
+                functools.partial(os.path.islink, path),
+                functools.partial(os.stat, path)
+            ))
+    for name, is_dir, is_symlink, stat in entries:
+        if is_dir():
+            if name != CACHE_DIR_NAME:
+                dirs.append(name)
+                if is_symlink():
+                    linked_dirs.add(name)
+        elif _is_image_file(name):
+            # Images whose stats can't be read (broken links, say) are still
+            # listed, they're reported on when their thumbnails are made
+            try:
+                stat_result = stat()
+                image_stats[name] = (stat_result.st_mtime, stat_result.st_size)
+            except OSError:
+                image_stats[name] = None
+    return ImageDirectory(
+        location, mtime, sorted(dirs), sorted(image_stats), image_stats,
+        frozenset(linked_dirs)
+    )
+
+def _stop_server(signum, frame):
+    """
+    Signal handler stopping the server, by raising SystemExit out of its
+    serve_forever loop.
+
+    @return {None}
+    """
+    raise SystemExit(signum)
+
+def _walk_image_dirs(root_dir, rescan=False):
+    """
+    Crawl the root directory downwards, yielding each directory's image files
+    and subdirectories. imageMe's own cache directory is skipped.
+
+    The tree is walked in IMAGE_TREE, scanning it first if it hasn't been
+    already, so crawling the same tree again doesn't mean listing every
+    directory again. Without IMAGE_TREE, the tree is scanned afresh.
+
+    @param {String} root_dir - The top level directory to crawl down from.
+
+    @param {Boolean=False} rescan - If True, scan the tree afresh even if it's
+        been scanned before.
+
+    @return {Generator} Yields a (location, subdirectories, image files) tuple
+        for each directory, with the subdirectories and image files sorted by
+        name.
+    """
+    tree = IMAGE_TREE
+    if tree is None:
+        tree = ImageTree()
+    elif rescan:
+        tree.scan(root_dir)
+    return tree.walk(root_dir)
+
+def _write_index_file(location, html, page=1, written=None):
+    """
+    Write an index file into the given location.
+
+    @param {String} location - The directory to write the index file into
+
+    @param {Iterable} html - The index file's HTML content, in chunks. Each is
+        written out as soon as it's available
+
+    @param {Integer=1} page - The page of the index the HTML is for
+
+    @param {[String]=None} written - If given, each chunk is appended to this
+        list as it's written, for callers keeping hold of the page
+
+    @return {String} The full path of the index file. Its precompressed copies
+        are alongside, see _get_compressed_file_paths.
+    """
+    index_file_path = _get_index_file_path(location, page)
+    print('Creating index file %s' % index_file_path)
+    # Write to temporary files first, so the previous version of the index is
+    # served until this one is complete. Its precompressed copies are written
+    # at the same time, so it's compressed once here rather than for every
+    # request, and each chunk is compressed as it's written. Pages with
+    # thumbnails inlined are mostly base64 image data, which won't compress
+    # enough to be worth it
+    encodings = [] if INLINE_THUMBNAILS else COMPRESSION_ENCODINGS
+    file_paths = [index_file_path] + [
+        index_file_path + COMPRESSED_FILE_SUFFIXES[encoding]
+        for encoding in encodings
+    ]
+    index_file = open(index_file_path + '.part', 'w')
+    compressed_files = [
+        open(file_path + '.part', 'wb') for file_path in file_paths[1:]
+    ]
+    compressors = [
+        _get_compressor(encoding, compressed_file)
+        for encoding, compressed_file in zip(encodings, compressed_files)
+    ]
+    try:
+        for chunk in html:
+            index_file.write(chunk)
+            if written is not None:
+                written.append(chunk)
+            for compress, _ in compressors:
+                compress(chunk)
+        for _, finish in compressors:
+            finish()
+    except Exception:
+        for part_file in [index_file] + compressed_files:
+            part_file.close()
+            os.unlink(part_file.name)
+        raise
+    for part_file in [index_file] + compressed_files:
+        part_file.close()
+    for file_path in file_paths:
+        _replace_file(file_path + '.part', file_path)
+    # Don't leave copies of an earlier version around to be served instead
+    if not encodings:
+        for compressed_file_path in _get_compressed_file_paths(
+                index_file_path):
+            os.unlink(compressed_file_path)
+    return index_file_path
+
+def prune_cache(dir_path, cache_dir=None):
+    """
+    Remove entries from the thumbnail cache of the given directory whose source
+    images have since been deleted or changed.
+
+    @param {String} dir_path - The directory path (absolute, or relative to CWD)
+
+    @param {String=None} cache_dir - The cache directory, if not the default
+        one within dir_path.
+
+    @return {Integer} The number of cache entries removed.
+    """
+    cache = ImageCache(_get_cache_dir(dir_path, cache_dir))
+    removed = cache.prune()
+    cache.close()
+    print('Pruned %d stale thumbnail(s) from the cache' % removed)
+    return removed
 
-def serve_dir(dir_path):
+def serve_dir(
+        dir_path, cache_dir=None, cache_max_bytes=CACHE_MAX_BYTES,
+        use_cache=True, inline_thumbnails=False, workers=None,
+        quality=THUMBNAIL_QUALITY, port=SERVER_PORT, bind_address='',
+        server_threads=SERVER_THREADS, watch=False,
+        page_size=IMAGES_PER_PAGE, dynamic=False, profile_path=None,
+        metrics=False):
     """
     Generate indexes and run server from the given directory downwards.
 
     @param {String} dir_path - The directory path (absolute, or relative to CWD)
 
+    @param {String=None} cache_dir - The directory to keep the thumbnail cache
+        in, if not the default one within dir_path. In dynamic mode the cache
+        is only kept on disk if this is given.
+
+    @param {Integer=CACHE_MAX_BYTES} cache_max_bytes - The maximum size of the
+        thumbnail cache in bytes.
+
+    @param {Boolean=True} use_cache - If False, don't read or write the
+        on-disk thumbnail cache.
+
+    @param {Boolean=False} inline_thumbnails - If True, embed thumbnails in the
+        index files as base64 data rather than serving them separately.
+
+    @param {Integer=None} workers - The number of processes to generate
+        thumbnails with. Defaults to one per CPU.
+
+    @param {String=THUMBNAIL_QUALITY} quality - The thumbnail quality setting,
+        one of the keys of THUMBNAIL_QUALITY_FILTERS and
+        THUMBNAIL_QUALITY_FORMATS.
+
+    @param {Integer=SERVER_PORT} port - The port to serve on.
+
+    @param {String=''} bind_address - The address to listen on. Defaults to
+        all interfaces.
+
+    @param {Integer=SERVER_THREADS} server_threads - The number of threads to
+        handle requests with.
+
+    @param {Boolean=False} watch - If True, keep index files up to date as
+        images are added, removed and changed while the server runs.
+
+    @param {Integer=IMAGES_PER_PAGE} page_size - The number of images per page
+        of the gallery, or 0 to put all of a directory's images on one page.
+
+    @param {Boolean=False} dynamic - If True, render index pages as they're
+        requested rather than writing index files into every directory up
+        front. Thumbnails are then generated as they're first requested too.
+
+    @param {String=None} profile_path - If given, profile the background
+        indexer and request handling with cProfile, and write the stats to this
+        file when the server stops.
+
+    @param {Boolean=False} metrics - If True, serve METRICS at
+        METRICS_URL_PATH. They aren't protected in any way, so are off unless
+        asked for.
+
     @return {None}
     """
-    # Create index files, and store the list of their paths for cleanup later
-    # This time, force no processing - this gives us a fast first-pass in terms
-    # of page generation, but potentially slow serving for large image files
-    print('Performing first pass index file generation')
-    created_files = _create_index_files(dir_path, True)
-    if (PIL_ENABLED):
+    global BACKGROUND_INDEXER, DIRECTORY_LISTINGS, IMAGE_CACHE, IMAGE_TREE
+    global IMAGES_PER_PAGE, INLINE_THUMBNAILS, MANIFESTS, METRICS, PROFILE_PATH
+    global PROFILE_STATS, RESAMPLE, THUMBNAIL_FORMAT
+    METRICS = Metrics(dir_path) if metrics else None
+    # Shared by the first pass, the background indexer and the watcher, so the
+    # tree is only crawled once
+    IMAGE_TREE = ImageTree()
+    PROFILE_PATH = profile_path
+    PROFILE_STATS = None
+    IMAGES_PER_PAGE = page_size
+    INLINE_THUMBNAILS = inline_thumbnails
+    RESAMPLE = THUMBNAIL_QUALITY_FILTERS.get(quality)
+    THUMBNAIL_FORMAT = THUMBNAIL_QUALITY_FORMATS.get(quality, 'JPEG')
+    # Open the thumbnail cache, if we're going to be making any thumbnails. A
+    # failure here (read-only directory, say) just means running without one.
+    # Dynamic mode doesn't write to the served directory, so only keeps its
+    # cache on disk if it's been told where
+    if PIL_ENABLED and use_cache and (cache_dir is not None or not dynamic):
+        try:
+            IMAGE_CACHE = ImageCache(
+                _get_cache_dir(dir_path, cache_dir), cache_max_bytes
+            )
+        except (OSError, sqlite3.Error) as exptn:
+            print('WARNING: Couldn\'t open thumbnail cache: %s' % exptn)
+    # Thumbnails served by URL or generated by worker processes need somewhere
+    # to go, so fall back to keeping them in memory
+    if PIL_ENABLED and IMAGE_CACHE is None:
+        IMAGE_CACHE = ImageCache(None, cache_max_bytes)
+    # Every directory's manifest and lightweight gallery page are served from
+    # memory, however its index pages are
+    MANIFESTS = ManifestCache(dir_path)
+    created_files = []
+    background_indexer = None
+    if dynamic:
+        # Nothing to do up front - directories are listed and their index pages
+        # rendered as they're requested, and nothing is written to them
+        print('Rendering index pages on request')
+        DIRECTORY_LISTINGS = DirectoryListingCache(dir_path)
+    else:
+        # Create index files, and store the list of their paths for cleanup
+        # later. This time, force no processing - this gives us a fast
+        # first-pass in terms of page generation, but potentially slow serving
+        # for large image files
+        print('Performing first pass index file generation')
+        created_files = _create_index_files(dir_path, True)
+    if PIL_ENABLED and not dynamic:
         # If PIL is enabled, we'd like to process the HTML indexes to include
         # generated thumbnails - this slows down generation so we don't do it
         # first time around, but now we're serving it's good to do in the
         # background
         print('Performing PIL-enchanced optimised index file generation in background')
-        background_indexer = BackgroundIndexFileGenerator(dir_path)
+        background_indexer = BackgroundIndexFileGenerator(dir_path, workers)
+        # Requests tell it which directories to get to first
+        BACKGROUND_INDEXER = background_indexer
         background_indexer.run()
+    if watch:
+        print('Watching for changes using %s' % (
+            'inotify' if INOTIFY_ENABLED else 'mtime polling'
+        ))
+        watcher = DirectoryWatcher(
+            dir_path, created_files,
+            background_indexer.thread if background_indexer else None
+        )
+        watcher.run()
     # Run the server in the current location - this blocks until it's stopped
-    _run_server()
-    # Clean up the index files created earlier so we don't make a mess of
-    # the image directories
-    _clean_up(created_files)
+    try:
+        _run_server(port, bind_address, server_threads)
+    finally:
+        # Clean up the index files created earlier so we don't make a mess of
+        # the image directories
+        _clean_up(created_files)
+        BACKGROUND_INDEXER = None
+        DIRECTORY_LISTINGS = None
+        IMAGE_TREE = None
+        MANIFESTS = None
+        if IMAGE_CACHE is not None:
+            IMAGE_CACHE.close()
+            IMAGE_CACHE = None
+        # Only work which has finished is in the profile - a background indexer
+        # still running is left out
+        with PROFILE_STATS_LOCK:
+            if PROFILE_STATS is not None:
+                print('Writing profile to %s' % PROFILE_PATH)
+                PROFILE_STATS.dump_stats(PROFILE_PATH)
+            PROFILE_PATH = None
+            PROFILE_STATS = None
 
 if __name__ == '__main__':
     # Generate indices and serve from the current directory downwards when run
     # as the entry point
-    serve_dir('.')
+    args = _get_arguments()
+    if args.prune_cache:
+        prune_cache('.', args.cache_dir)
+    else:
+        serve_dir(
+            '.',
+            cache_dir=args.cache_dir,
+            cache_max_bytes=args.cache_size * 1024 * 1024,
+            use_cache=not args.no_cache,
+            inline_thumbnails=args.inline_thumbnails,
+            workers=args.workers,
+            quality=args.quality,
+            port=_get_server_port(args),
+            bind_address=args.bind,
+            server_threads=args.threads,
+            watch=args.watch,
+            page_size=args.page_size,
+            dynamic=args.dynamic,
+            profile_path=args.profile,
+            metrics=args.metrics
+        )
@@ -0,0 +1,149 @@
+#!/usr/bin/python
+"""
+Tests for imageMe's hand-written parsers.
+
+Run from the top level of the repository:
+
+    python -m unittest test_imageme
+"""
+
+# Dependencies
+import io, struct, unittest
+import imageme
+if imageme.PIL_ENABLED:
+    from PIL import Image
+
+# Constants / configuration
+## Size of the thumbnail embedded in the test EXIF data
+EXIF_THUMBNAIL_SIZE = (16, 12)
+
+class FakeImage:
+    """
+    Stands in for a PIL Image with the given info, which is all that
+    _get_exif_thumbnail looks at.
+    """
+
+    def __init__(self, info):
+        self.info = info
+
+class GetByteRangeTest(unittest.TestCase):
+    """
+    Tests for _get_byte_range, which parses HTTP Range headers.
+    """
+
+    # (description, Range header, file size, expected byte range) cases
+    CASES = [
+        ('no header', None, 1000, None),
+        ('closed range', 'bytes=0-99', 1000, (0, 99)),
+        ('single byte', 'bytes=0-0', 1000, (0, 0)),
+        ('surrounding whitespace', ' bytes=10-19 ', 1000, (10, 19)),
+        ('open-ended range', 'bytes=500-', 1000, (500, 999)),
+        ('last byte past the end', 'bytes=900-5000', 1000, (900, 999)),
+        ('first byte past the end', 'bytes=2000-', 1000, (2000, 999)),
+        ('first byte at the end', 'bytes=1000-1999', 1000, (1000, 999)),
+        ('suffix range', 'bytes=-100', 1000, (900, 999)),
+        ('suffix longer than the file', 'bytes=-2000', 1000, (0, 999)),
+        ('empty suffix', 'bytes=-0', 1000, (1000, 999)),
+        ('empty suffix of an empty file', 'bytes=-0', 0, (0, -1)),
+        ('reversed range', 'bytes=5-1', 1000, None),
+        ('no first or last byte', 'bytes=-', 1000, None),
+        ('multiple ranges', 'bytes=0-1,5-6', 1000, None),
+        ('multiple ranges with spaces', 'bytes=0-1, 5-6', 1000, None),
+        ('other unit', 'items=0-1', 1000, None),
+        ('negative first byte', 'bytes=-5-10', 1000, None),
+        ('not a number', 'bytes=a-b', 1000, None),
+        ('empty header', '', 1000, None),
+    ]
+
+    def test_cases(self):
+        for description, header, size, expected in self.CASES:
+            self.assertEqual(
+                imageme._get_byte_range(header, size), expected, description
+            )
+
+@unittest.skipUnless(imageme.PIL_ENABLED, 'needs PIL')
+class GetExifThumbnailTest(unittest.TestCase):
+    """
+    Tests for _get_exif_thumbnail, which finds the thumbnail in EXIF data.
+    """
+
+    def test_found(self):
+        # (description, EXIF data) cases with a thumbnail to find
+        cases = [
+            ('little-endian', _get_exif('<')),
+            ('big-endian', _get_exif('>')),
+            ('little-endian SHORT length', _get_exif('<', length_type=3)),
+            ('big-endian SHORT length', _get_exif('>', length_type=3)),
+        ]
+        for description, exif in cases:
+            thumbnail = imageme._get_exif_thumbnail(FakeImage({'exif': exif}))
+            self.assertIsNotNone(thumbnail, description)
+            self.assertEqual(thumbnail.size, EXIF_THUMBNAIL_SIZE, description)
+
+    def test_not_found(self):
+        exif = _get_exif('<')
+        # (description, image info) cases without a usable thumbnail
+        cases = [
+            ('no EXIF data', {}),
+            ('empty EXIF data', {'exif': b''}),
+            ('no Exif header', {'exif': exif[6:]}),
+            ('unknown byte order', {'exif': exif[:6] + b'XX' + exif[8:]}),
+            ('no IFD1', {'exif': _get_exif('<', ifd1=False)}),
+            ('big-endian, no IFD1', {'exif': _get_exif('>', ifd1=False)}),
+            ('truncated in the header', {'exif': exif[:10]}),
+            ('truncated in IFD0', {'exif': exif[:20]}),
+            ('truncated in IFD1', {'exif': exif[:6 + 26 + 8]}),
+            ('truncated thumbnail', {'exif': exif[:6 + 26 + 30 + 10]}),
+            ('thumbnail not a JPEG', {
+                'exif': _get_exif('<', thumbnail=b'not an image')
+            }),
+        ]
+        for description, info in cases:
+            self.assertIsNone(
+                imageme._get_exif_thumbnail(FakeImage(info)), description
+            )
+
+def _get_exif(endian='<', thumbnail=None, ifd1=True, length_type=4):
+    """
+    Build the EXIF data of an image with an embedded JPEG thumbnail, as a
+    camera would write it.
+
+    @param {String='<'} endian - The byte order, '<' or '>'
+
+    @param {String=None} thumbnail - The thumbnail's encoded bytes. Defaults
+        to a JPEG of EXIF_THUMBNAIL_SIZE.
+
+    @param {Boolean=True} ifd1 - If False, leave out the IFD describing the
+        thumbnail
+
+    @param {Integer=4} length_type - The TIFF field type of the thumbnail
+        length tag, 4 (LONG) or 3 (SHORT)
+
+    @return {String} The EXIF data, as found in a PIL Image's info.
+    """
+    if thumbnail is None:
+        bytesio = io.BytesIO()
+        Image.new('RGB', EXIF_THUMBNAIL_SIZE, (255, 0, 0)).save(
+            bytesio, 'JPEG'
+        )
+        thumbnail = bytesio.getvalue()
+    def _entry(tag, field_type, value):
+        if field_type == 3:
+            return struct.pack(endian + 'HHIHH', tag, 3, 1, value, 0)
+        return struct.pack(endian + 'HHII', tag, field_type, 1, value)
+    # Header, then IFD0 with a single Orientation entry
+    tiff = {'<': b'II', '>': b'MM'}[endian] + struct.pack(endian + 'HI', 42, 8)
+    ifd1_offset = 8 + 2 + 12 + 4
+    tiff += struct.pack(endian + 'H', 1) + _entry(0x0112, 3, 1)
+    tiff += struct.pack(endian + 'I', ifd1_offset if ifd1 else 0)
+    if ifd1:
+        # IFD1 with the JPEGInterchangeFormat tags, the thumbnail after it
+        thumbnail_offset = ifd1_offset + 2 + 2 * 12 + 4
+        tiff += struct.pack(endian + 'H', 2)
+        tiff += _entry(0x0201, 4, thumbnail_offset)
+        tiff += _entry(0x0202, length_type, len(thumbnail))
+        tiff += struct.pack(endian + 'I', 0) + thumbnail
+    return b'Exif\x00\x00' + tiff
+
+if __name__ == '__main__':
+    unittest.main()